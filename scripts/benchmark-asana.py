@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Benchmark listing the tasks of an Asana workspace against a local fake Asana server.
+
+The fake server serves a recording of generated tasks over HTTP, following the behaviour of
+the GET /tasks and GET /tasks/<gid> endpoints: pagination via offset tokens and compact task
+representations unless specific fields are requested via `opt_fields`. Compares fetching the
+details of each listed task separately (the N+1 approach) to `AsanaSide.get_all_items`.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import asana
+
+from syncall.asana.asana_side import GET_TASKS_PAGE_SIZE, AsanaSide
+from syncall.asana.asana_task import AsanaTask
+
+
+def _make_task(i: int) -> dict:
+    return {
+        "gid": str(1_000_000 + i),
+        "resource_type": "task",
+        "name": f"Task number {i}",
+        "completed": i % 3 == 0,
+        "completed_at": "2024-01-02T00:00:00.000Z" if i % 3 == 0 else None,
+        "created_at": "2024-01-01T00:00:00.000Z",
+        "modified_at": "2024-01-02T00:00:00.000Z",
+        "due_at": None,
+        "due_on": "2024-02-01" if i % 2 == 0 else None,
+        "notes": f"Notes of task {i}" * 10,
+        "html_notes": f"<body>Notes of task {i}</body>" * 10,
+    }
+
+
+class _FakeAsanaHandler(BaseHTTPRequestHandler):
+    tasks: list[dict]
+    latency: float
+    num_requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        with self.lock:
+            type(self).num_requests += 1
+
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        fields = query["opt_fields"].split(",") if "opt_fields" in query else None
+        if url.path == "/tasks":
+            start = int(query.get("offset", 0))
+            end = start + int(query["limit"])
+            page = self.tasks[start:end]
+            if fields is None:
+                fields = ["name", "resource_type"]
+            response = {
+                "data": [self._project(task, fields) for task in page],
+                "next_page": {"offset": str(end)} if end < len(self.tasks) else None,
+            }
+        else:
+            gid = url.path.rsplit("/", maxsplit=1)[-1]
+            task = self.tasks[int(gid) - 1_000_000]
+            response = {"data": task if fields is None else self._project(task, fields)}
+
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    @staticmethod
+    def _project(task: dict, fields: list[str]) -> dict:
+        return {"gid": task["gid"], **{f: task[f] for f in fields}}
+
+
+def _get_all_items_n_plus_1(client: asana.Client) -> list[AsanaTask]:
+    tasks = client.tasks.find_all(assignee="me", workspace="1", page_size=GET_TASKS_PAGE_SIZE)
+    return [AsanaTask.from_raw_task(client.tasks.find_by_id(task["gid"])) for task in tasks]
+
+
+def _bench(num_tasks: int, latency: float) -> dict[str, tuple[int, float]]:
+    handler = type(
+        "Handler",
+        (_FakeAsanaHandler,),
+        {"tasks": [_make_task(i) for i in range(num_tasks)], "latency": latency},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # no authentication needed for the fake server
+    client = asana.Client()
+    client.options["base_url"] = f"http://127.0.0.1:{server.server_port}"
+    side = AsanaSide(client=client, task_gid=None, workspace_gid="1")
+
+    results = {}
+    for name, fn in (
+        ("N+1", lambda: _get_all_items_n_plus_1(client)),
+        ("opt_fields", side.get_all_items),
+    ):
+        handler.num_requests = 0
+        start = time.perf_counter()
+        items = fn()
+        results[name] = (handler.num_requests, time.perf_counter() - start)
+        assert len(items) == num_tasks
+
+    server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n",
+        "--num-tasks",
+        type=int,
+        nargs="+",
+        default=[100, 1_000, 3_000],
+        help="Number of tasks assigned to the user",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated latency of each request, in seconds",
+    )
+    args = parser.parse_args()
+
+    print(f"{'approach':>10} | {'tasks':>7} | {'requests':>8} | {'time [s]':>8}")  # noqa: T201
+    for num_tasks in args.num_tasks:
+        for name, (num_requests, duration) in _bench(num_tasks, args.latency).items():
+            print(f"{name:>10} | {num_tasks:>7} | {num_requests:>8} | {duration:>8.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Benchmark the per-run cost of the available serdes backends.
+
+A "run" is modelled after what the Aggregator does on each synchronization: open the store,
+load the cached version of every item, re-dump the items that changed (1%) and close the
+store.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from syncall.serdes_store import name_to_serdes_store_type, open_serdes_store
+
+
+def _make_item(i: int) -> dict:
+    return {
+        "uuid": f"{i:08d}-0000-0000-0000-000000000000",
+        "description": f"Task number {i}",
+        "status": "pending",
+        "tags": ["remindme", "work"],
+        "annotations": [f"annotation of task {i}"],
+        "modified": "20240101T000000Z",
+    }
+
+
+def _bench(backend: str, num_items: int) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        ids = [str(i) for i in range(num_items)]
+
+        start = time.perf_counter()
+        with open_serdes_store(root, "side", backend=backend) as store:
+            for i, id_ in enumerate(ids):
+                store.dump(id_, _make_item(i))
+        initial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open_serdes_store(root, "side", backend=backend) as store:
+            for id_ in ids:
+                store.load(id_)
+            for i, id_ in enumerate(ids[: max(1, num_items // 100)]):
+                store.dump(id_, _make_item(i))
+        per_run = time.perf_counter() - start
+
+    return initial, per_run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "-n",
+        "--num-items",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Number of cached items to benchmark with",
+    )
+    args = parser.parse_args()
+
+    print(f"{'backend':>8} | {'items':>7} | {'initial [s]':>11} | {'per-run [s]':>11}")  # noqa: T201
+    for num_items in args.num_items:
+        for backend in name_to_serdes_store_type:
+            initial, per_run = _bench(backend, num_items)
+            print(f"{backend:>8} | {num_items:>7} | {initial:>11.3f} | {per_run:>11.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,37 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Self
+from typing import TYPE_CHECKING, Self, TypeVar
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Sequence
-    from pathlib import Path
+    from collections.abc import Callable, Iterable, Iterator, Sequence
 
     from item_synchronizer.types import ID, ConverterFn, Item
 
+    from syncall.serdes_store import SerdesStore
     from syncall.sync_side import SyncSide
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import partial
+from itertools import count
 from typing import Any
 
 from bidict import bidict  # pyright: ignore[reportPrivateImportUsage]
-from bubop import PrefsManager, logger, pickle_dump, pickle_load
+from bubop import CommonDir, PrefsManager, format_dict, logger
 from item_synchronizer import Synchronizer
 from item_synchronizer.helpers import SideChanges
 from item_synchronizer.resolution_strategy import AlwaysSecondRS, ResolutionStrategy
 
 from syncall.app_utils import app_name
+from syncall.serdes_store import open_serdes_store
 from syncall.side_helper import SideHelper
+from syncall.write_pool import WritePool
+
+T = TypeVar("T")
+
+# Prefix of the IDs temporarily assigned to items whose insertion has been deferred by the side
+_PLACEHOLDER_ID_PREFIX = "syncall-pending-insert-"
 
 
 class Aggregator:
@@ -41,6 +52,8 @@ class Aggregator:
         config_fname: str | None = None,
         ignore_keys: tuple[Sequence[str], Sequence[str]] = (),
         catch_exceptions: bool = True,
+        serdes_backend: str = "pickle",
+        write_workers: tuple[int, int] = (1, 1),
     ):
         # Preferences manager
         # Sample config path: ~/.config/syncall/taskwarrior_gcal_sync.yaml
@@ -48,9 +61,20 @@ class Aggregator:
         #
         # The stem of the filename can be overridden by the user if they provide `config_fname`.
         #
-        # Serdes dirs are shared across multiple different syncrhonizers
-        # Sample serdes dirs: ~/.config/syncall/serdes/gcal/
-        #                     ~/.config/syncall/serdes/tw/
+        # Serdes stores are shared across multiple different syncrhonizers
+        # Sample serdes stores: ~/.config/syncall/serdes/gcal/
+        #                       ~/.config/syncall/serdes/tw.sqlite3
+        #
+        # `write_workers` is the number of threads that may write to each side concurrently.
+        # Sides that don't support it (see SyncSide.concurrent_writes_safe) are written to
+        # sequentially regardless.
+        #
+        # The format of the serdes stores is determined by `serdes_backend`. See
+        # syncall.serdes_store.name_to_serdes_store_type for the available backends.
+        #
+        # Each side also gets its own cache store, specific to this synchronization, for
+        # persisting whatever data the side needs across runs.
+        # Sample cache stores: ~/.cache/syncall/taskwarrior_gcal_sync/tw.sqlite3
         if config_fname is None:
             config_fname = f"{side_B.name}_{side_A.name}_sync".lower()
         else:
@@ -78,16 +102,31 @@ class Aggregator:
             self._helper_A.ignore_keys = ignore_keys[0]
             self._helper_B.ignore_keys = ignore_keys[1]
 
-        # serdes directories for storing cached versions of items for each side ---------------
+        # serdes stores for storing cached versions of items for each side -------------------
         self.serdes_dirs = self.prefs_manager.config_directory / "serdes"
-        serdes_A = self.serdes_dirs / self._side_A.name.lower()
-        serdes_B = self.serdes_dirs / self._side_B.name.lower()
-        serdes_A.mkdir(exist_ok=True, parents=True)
-        serdes_B.mkdir(exist_ok=True)
+        serdes_A = open_serdes_store(
+            self.serdes_dirs,
+            self._side_A.name.lower(),
+            backend=serdes_backend,
+        )
+        serdes_B = open_serdes_store(
+            self.serdes_dirs,
+            self._side_B.name.lower(),
+            backend=serdes_backend,
+        )
 
         self.config[f"{self._helper_A}_serdes"] = serdes_A
         self.config[f"{self._helper_B}_serdes"] = serdes_B
 
+        # per-side caches ---------------------------------------------------------------------
+        self.cache_dir = CommonDir.cache() / app_name() / config_fname
+        self._caches = tuple(
+            open_serdes_store(self.cache_dir, side.name.lower(), backend=serdes_backend)
+            for side in (self._side_A, self._side_B)
+        )
+        self._side_A.attach_cache(self._caches[0])
+        self._side_B.attach_cache(self._caches[1])
+
         # Correspondences between the two sides -----------------------------------------------
         # For finding the matches between IDs of the two sides
         # e.g., for Taskwarrior <-> GCal: tw_gcal_ids
@@ -127,6 +166,27 @@ class Aggregator:
             side_names=(side_A.fullname, side_B.fullname),
         )
 
+        self._catch_exceptions = catch_exceptions
+
+        # Where to queue the write operations of each side - either the side itself or, if
+        # more than one worker is requested, a pool of threads that write to the side
+        # concurrently. The results are still processed sequentially, in `_flush_writes`.
+        self._writer_A = self._make_writer(self._side_A, write_workers[0])
+        self._writer_B = self._make_writer(self._side_B, write_workers[1])
+
+        # placeholder IDs of the deferred inserts -> helper of the side they're inserted at
+        self._pending_inserts: dict[ID, SideHelper] = {}
+        self._placeholder_ids = count()
+
+        # Items fetched from each side during `sync`, by the side helper name
+        self._fetched_items: dict[str, dict[ID, Item]] = {
+            str(self._helper_A): {},
+            str(self._helper_B): {},
+        }
+
+        # Wall time of each phase of the synchronization [s] - see `timed`
+        self.timings: dict[str, float] = {}
+
         self.cleaned_up = False
 
     def __enter__(self) -> Self:
@@ -144,7 +204,7 @@ class Aggregator:
         Given a fresh list of items from the SyncSide, determine which of them are new,
         modified, or have been deleted since the last run.
         """
-        serdes_dir, _ = self._get_serdes_dirs(helper)
+        serdes_store, _ = self._get_serdes_stores(helper)
         logger.info(f"Detecting changes from {helper}...")
         item_ids = set(items.keys())
         # New items exist in the sync side but don't yet exist in my IDs correspndences.
@@ -163,15 +223,34 @@ class Aggregator:
         # Potentially modified items are all the items that exist in the sync side minus the
         # ones already determined as deleted or new
         #
-        # For these items, load the cached version and check whether they are the same or not
-        # to actually determine the ones that are changed.
+        # For these items, first compare the fingerprint of the fresh item against the stored
+        # fingerprint of the cached version. Only if these differ (or there's no stored
+        # fingerprint) load the cached version and check whether they are the same or not to
+        # actually determine the ones that are changed.
         modified = set()
         potentially_modified_ids = item_ids.difference(new.union(deleted))
+        cached_fingerprints = serdes_store.fingerprints()
+        num_loaded = 0
         for item_id in potentially_modified_ids:
             item = items[item_id]
-            cached_item = pickle_load(serdes_dir / item_id)
+            fingerprint = self._fingerprint_of(item, helper=helper)
+            if fingerprint is not None and fingerprint == cached_fingerprints.get(item_id):
+                continue
+
+            cached_item = serdes_store.load(item_id)
+            num_loaded += 1
             if self._item_has_update(prev_item=cached_item, new_item=item, helper=helper):
                 modified.add(item_id)
+            elif fingerprint is not None:
+                # identical, store the fingerprint of the cached version for the next run
+                cached_fingerprint = self._fingerprint_of(cached_item, helper=helper)
+                if cached_fingerprint is not None:
+                    serdes_store.set_fingerprint(item_id, cached_fingerprint)
+
+        logger.debug(
+            f"Loaded {num_loaded}/{len(potentially_modified_ids)} cached items of {helper} for"
+            " a full comparison",
+        )
 
         side_changes = SideChanges(new=new, modified=modified, deleted=deleted)
         logger.debug(f"\n\n{side_changes}")
@@ -180,95 +259,244 @@ class Aggregator:
 
     def sync(self) -> None:
         """Entrypoint method."""
-        items_A = {
-            str(item[self._helper_A.id_key]): item for item in self._side_A.get_all_items()
-        }
-        items_B = {
-            str(item[self._helper_B.id_key]): item for item in self._side_B.get_all_items()
-        }
+        # fetch the items of both sides concurrently - usually one of them is local and the
+        # other one remote
+        all_items_A, all_items_B = self._run_on_both_sides(
+            "fetch",
+            lambda side: side.get_all_items(),
+        )
+        items_A = {str(item[self._helper_A.id_key]): item for item in all_items_A}
+        items_B = {str(item[self._helper_B.id_key]): item for item in all_items_B}
+        self._fetched_items = {str(self._helper_A): items_A, str(self._helper_B): items_B}
 
         # find what's changed in each side
-        changes_A = self.detect_changes(self._helper_A, items_A)
-        changes_B = self.detect_changes(self._helper_B, items_B)
-
-        # pickle items that are new or updated
-        side_A_serdes_dir, side_B_serdes_dir = self._get_serdes_dirs(self._helper_A)
-        side_A, side_B = self._get_side_instances(self._helper_A)
-        for item_id in changes_B.new.union(changes_B.modified):
-            item = side_B.get_item(item_id)
-            if item is None:
-                raise RuntimeError(f"Failed to retrieve serialized version of Item {item_id}")
-            pickle_dump(item, side_B_serdes_dir / item_id)
-        for item_id in changes_A.new.union(changes_A.modified):
-            item = side_A.get_item(item_id)
-            if item is None:
-                raise RuntimeError(f"Failed to retrieve serialized version of Item {item_id}")
-            pickle_dump(item, side_A_serdes_dir / item_id)
-
-        # remove deleted pickled items
-        self._remove_serdes_files(helper=self._helper_B, ids=changes_B.deleted)
-        self._remove_serdes_files(helper=self._helper_A, ids=changes_A.deleted)
-
-        # synchronize
-        self._synchronizer.sync(changes_A=changes_A, changes_B=changes_B)
+        with self.timed("detect changes"):
+            changes_A = self.detect_changes(self._helper_A, items_A)
+            changes_B = self.detect_changes(self._helper_B, items_B)
+
+        # cache items that are new or updated - reuse the items fetched above
+        side_A_serdes_store, side_B_serdes_store = self._get_serdes_stores(self._helper_A)
+        for serdes_store, helper, items, changes in (
+            (side_B_serdes_store, self._helper_B, items_B, changes_B),
+            (side_A_serdes_store, self._helper_A, items_A, changes_A),
+        ):
+            for item_id in changes.new.union(changes.modified):
+                item = items[item_id]
+                serdes_store.dump(
+                    item_id,
+                    item,
+                    fingerprint=self._fingerprint_of(item, helper=helper),
+                )
+
+        # remove deleted cached items
+        self._remove_serdes_items(helper=self._helper_B, ids=changes_B.deleted)
+        self._remove_serdes_items(helper=self._helper_A, ids=changes_A.deleted)
+
+        # synchronize - the placeholder IDs of the deferred inserts must never outlive the
+        # run, otherwise they'd be persisted along with the rest of the correspondences
+        with self.timed("write"):
+            try:
+                self._synchronizer.sync(changes_A=changes_A, changes_B=changes_B)
+                self._flush_writes()
+            finally:
+                self._forget_pending_inserts()
+
+        side_A_serdes_store.flush()
+        side_B_serdes_store.flush()
+
+        logger.info(
+            format_dict(
+                header="Timings",
+                items={phase: f"{secs:.2f}s" for phase, secs in self.timings.items()},
+                prefix="\n\n",
+                suffix="\n",
+            ),
+        )
 
     def start(self) -> None:
-        """Initialize the aggregator."""
-        self._side_A.start()
-        self._side_B.start()
+        """Initialize the aggregator - both sides are initialized concurrently."""
+        self._run_on_both_sides("start", lambda side: side.start())
 
     def finish(self) -> None:
         """Finalize the aggregator."""
         self._side_A.finish()
         self._side_B.finish()
 
+        for writer in (self._writer_A, self._writer_B):
+            if isinstance(writer, WritePool):
+                writer.shutdown()
+
+        for store in (*self._get_serdes_stores(self._helper_A), *self._caches):
+            store.close()
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """Record the wall time of the code in the context under the given phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = time.perf_counter() - start
+
+    def _run_on_both_sides(self, phase: str, fn: Callable[[SyncSide], T]) -> tuple[T, T]:
+        """Run the given function for each side, concurrently, timing each side separately.
+
+        Any exception raised for either side is propagated once both sides are done.
+        """
+
+        def timed_fn(side: SyncSide) -> T:
+            with self.timed(f"{phase} [{side}]"):
+                return fn(side)
+
+        with (
+            self.timed(phase),
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="syncall") as executor,
+        ):
+            future_A = executor.submit(timed_fn, self._side_A)
+            future_B = executor.submit(timed_fn, self._side_B)
+            return future_A.result(), future_B.result()
+
     def inserter_to(self, item: Item, helper: SideHelper) -> ID:
         """Insert an item using the given side helper.
 
         Other side already has the item, and I'm also inserting it at this side.
+
+        If the side defers the insertion, a placeholder ID is returned instead and it's
+        replaced by the actual ID of the item in `_flush_writes`.
         """
-        item_side, _ = self._get_side_instances(helper)
-        serdes_dir, _ = self._get_serdes_dirs(helper)
+        serdes_store, _ = self._get_serdes_stores(helper)
         logger.info(
             f"[{helper.other}] Inserting item [{self._summary_of(item, helper):10}] at"
             f" {helper}...",
         )
 
-        item_created = item_side.add_item(item)
-        item_created_id = str(item_created[helper.id_key])
+        placeholder_id = f"{_PLACEHOLDER_ID_PREFIX}{next(self._placeholder_ids)}"
+        item_created_id: ID | None = None
+
+        def on_inserted(item_created: Item | None, exc: Exception | None):
+            nonlocal item_created_id
+            if exc is not None or item_created is None:
+                self._forget_pending_insert(placeholder_id, helper=helper)
+                self._handle_write_error(exc, f"Failed to insert {helper} item")
+                return
+
+            item_created_id = str(item_created[helper.id_key])
 
-        # Cache both sides with pickle - f=id_
-        logger.debug(f'Pickling newly created {helper} item -> "{item_created_id}"')
-        pickle_dump(item_created, serdes_dir / item_created_id)
+            # Cache the newly created item
+            logger.debug(f'Caching newly created {helper} item -> "{item_created_id}"')
+            serdes_store.dump(
+                item_created_id,
+                item_created,
+                fingerprint=self._fingerprint_of(item_created, helper=helper),
+            )
 
-        return item_created_id
+            if self._pending_inserts.pop(placeholder_id, None) is not None:
+                ids_map = self._get_ids_map(helper=helper)
+                ids_map[item_created_id] = ids_map.pop(placeholder_id)
+
+        self._get_writer(helper).queue_add_item(item, callback=on_inserted)
+        if item_created_id is not None:
+            return item_created_id
+
+        self._pending_inserts[placeholder_id] = helper
+        return placeholder_id
 
     def updater_to(self, item_id: ID, item: Item, helper: SideHelper):
         """Update an item using the given side helper."""
-        side, _ = self._get_side_instances(helper)
-        serdes_dir, _ = self._get_serdes_dirs(helper)
+        serdes_store, _ = self._get_serdes_stores(helper)
         logger.info(
             f"[{helper.other}] Updating item [{self._summary_of(item, helper):10}] at"
             f" {helper}...",
         )
 
-        side.update_item(item_id, **item)
-        pickle_dump(item, serdes_dir / item_id)
+        def on_updated(_: Item | None, exc: Exception | None):
+            if exc is not None:
+                self._handle_write_error(exc, f"Failed to update {helper} item -> {item_id}")
+                return
+
+            serdes_store.dump(
+                item_id,
+                item,
+                fingerprint=self._fingerprint_of(item, helper=helper),
+            )
+
+        self._get_writer(helper).queue_update_item(item_id, callback=on_updated, **item)
 
     def deleter_to(self, item_id: ID, helper: SideHelper):
         """Delete an item using the given side helper."""
         logger.info(f"[{helper}] Synchronising deleted item, id -> {item_id}...")
-        side, _ = self._get_side_instances(helper)
-        side.delete_single_item(item_id)
+        other_id = self._get_ids_map(helper=helper).get(item_id)
+
+        def on_deleted(_: Item | None, exc: Exception | None):
+            if exc is not None:
+                # The Synchronizer has already dropped the correspondence - restore it so that
+                # the deletion is retried on the next run
+                if other_id is not None:
+                    self._get_ids_map(helper=helper)[item_id] = other_id
+                self._handle_write_error(exc, f"Failed to delete {helper} item -> {item_id}")
+                return
+
+            self._remove_serdes_items(helper=helper, ids=(item_id,))
 
-        self._remove_serdes_files(helper=helper, ids=(item_id,))
+        self._get_writer(helper).queue_delete_single_item(item_id, callback=on_deleted)
 
     def item_getter_for(self, item_id: ID, helper: SideHelper) -> Item:
-        """Item Getter."""
+        """Item Getter.
+
+        Prefer the items already fetched in this run, only ask the side for the rest.
+        """
+        item = self._fetched_items[str(helper)].get(item_id)
+        if item is not None:
+            return item
+
         logger.debug(f"Fetching {helper} item for id -> {item_id}")
         side, _ = self._get_side_instances(helper)
         return side.get_item(item_id)
 
+    def _flush_writes(self) -> None:
+        """Execute the write operations that have been deferred, by the sides or the pools."""
+        for writer in (self._writer_A, self._writer_B):
+            writer.flush_writes()
+
+    @staticmethod
+    def _make_writer(side: SyncSide, num_workers: int) -> SyncSide | WritePool:
+        if num_workers <= 1:
+            return side
+
+        if not side.concurrent_writes_safe:
+            logger.warning(f"{side} doesn't support concurrent writes, writing sequentially")
+            return side
+
+        logger.debug(f"Writing to {side} using {num_workers} workers")
+        return WritePool(side, max_workers=num_workers)
+
+    def _forget_pending_insert(self, placeholder_id: ID, helper: SideHelper) -> None:
+        """Drop the correspondence of a deferred insert that didn't go through.
+
+        The item of the other side is then considered new again on the next run.
+        """
+        if self._pending_inserts.pop(placeholder_id, None) is not None:
+            self._get_ids_map(helper=helper).pop(placeholder_id, None)
+
+    def _forget_pending_inserts(self) -> None:
+        """Drop the correspondences of the deferred inserts that haven't been reported back.
+
+        Either the side never reported back or the writes were never flushed, e.g., because
+        the synchronization raised before that.
+        """
+        for placeholder_id, helper in list(self._pending_inserts.items()):
+            logger.error(f"No result for item inserted at {helper}, it will be retried")
+            self._forget_pending_insert(placeholder_id, helper=helper)
+
+    def _handle_write_error(self, exc: Exception | None, msg: str) -> None:
+        """Handle the failure of a deferred write operation, like the Synchronizer would."""
+        if not self._catch_exceptions and exc is not None:
+            raise exc
+
+        logger.error(msg)
+        if exc is not None:
+            logger.opt(exception=exc).debug(msg)
+
     def _item_has_update(self, prev_item: Item, new_item: Item, helper: SideHelper) -> bool:
         """Determine whether the item has been updated."""
         side, _ = self._get_side_instances(helper)
@@ -279,14 +507,23 @@ class Aggregator:
             ignore_keys=[helper.id_key, *helper.ignore_keys],
         )
 
+    def _fingerprint_of(self, item: Item, helper: SideHelper) -> str | None:
+        """Compute the fingerprint of the item, ignoring the same keys as `_item_has_update`."""
+        side, _ = self._get_side_instances(helper)
+
+        return side.fingerprint(item, ignore_keys=[helper.id_key, *helper.ignore_keys])
+
     def _get_ids_map(self, helper: SideHelper):
         return self._B_to_A_map if helper is self._helper_B else self._B_to_A_map.inverse
 
-    def _get_serdes_dirs(self, helper: SideHelper) -> tuple[Path, Path]:
-        serdes_dir = self.config[f"{helper}_serdes"]
-        other_serdes_dir = self.config[f"{helper.other}_serdes"]
+    def _get_serdes_stores(self, helper: SideHelper) -> tuple[SerdesStore, SerdesStore]:
+        serdes_store = self.config[f"{helper}_serdes"]
+        other_serdes_store = self.config[f"{helper.other}_serdes"]
+
+        return serdes_store, other_serdes_store
 
-        return serdes_dir, other_serdes_dir
+    def _get_writer(self, helper: SideHelper) -> SyncSide | WritePool:
+        return self._writer_B if helper is self._helper_B else self._writer_A
 
     def _get_side_instances(self, helper: SideHelper) -> tuple[SyncSide, SyncSide]:
         side = self._side_B if helper is self._helper_B else self._side_A
@@ -294,20 +531,19 @@ class Aggregator:
 
         return side, other_side
 
-    def _remove_serdes_files(self, helper: SideHelper, *, ids: Iterable[ID]):
-        serdes_dir, _ = self._get_serdes_dirs(helper)
-
-        def full_path(id_: ID) -> Path:
-            return serdes_dir / str(id_)
+    def _remove_serdes_items(self, helper: SideHelper, *, ids: Iterable[ID]):
+        serdes_store, _ = self._get_serdes_stores(helper)
 
         for id_ in ids:
-            p = full_path(id_)
             try:
-                p.unlink()
-            except FileNotFoundError:
-                logger.warning(f"File doesn't exist, this may indicate an error -> {p}")
+                serdes_store.remove(id_)
+            except KeyError:
+                logger.warning(
+                    f"Cached item doesn't exist, this may indicate an error -> {id_}"
+                    f" [{serdes_store.path}]",
+                )
                 logger.opt(exception=True).debug(
-                    f"File doesn't exist, this may indicate an error -> {p}",
+                    f"Cached item doesn't exist, this may indicate an error -> {id_}",
                 )
 
     def _summary_of(self, item: Item, helper: SideHelper, short=True) -> str:
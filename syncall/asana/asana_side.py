@@ -1,8 +1,12 @@
+import datetime as dt
 from collections.abc import Sequence
 
 import asana
+from bubop import format_dict, logger
 
 from syncall.asana.asana_task import AsanaTask
+from syncall.asana.utils import RateLimitedAdapter
+from syncall.rate_limiter import RateLimiter
 from syncall.sync_side import SyncSide
 from syncall.types import AsanaGID
 
@@ -10,52 +14,161 @@ from syncall.types import AsanaGID
 # The API doesn't allow page sizes larger than 100.
 GET_TASKS_PAGE_SIZE = 100
 
+# Fields to ask for in all the task queries - exactly those needed by AsanaTask.from_raw_task.
+# Without these, listing the tasks only returns their compact representation (gid, name).
+TASK_FIELDS = sorted(AsanaTask._key_names)
+
+# Requests per second allowed on average - Asana allows 1500 requests per minute on paid
+# plans. Further throttling is up to the Retry-After header of its 429 responses.
+REQUESTS_PER_SECOND = 25.0
+
+# How often the incremental sync lists all the tasks, to find out the ones that have been
+# deleted or assigned to someone else in the meantime
+FULL_LISTING_INTERVAL = dt.timedelta(hours=6)
+
+# Key under which the state of the incremental sync is persisted in the side's cache
+_INCREMENTAL_STATE_KEY = "incremental_state"
+
 
 class AsanaSide(SyncSide):
     """Wrapper class to add/modify/delete asana tasks, etc."""
 
-    def __init__(self, client: asana.Client, task_gid: AsanaGID, workspace_gid: AsanaGID):
-        """Initialize the Asana side."""
+    concurrent_writes_safe = True
+
+    def __init__(
+        self,
+        client: asana.Client,
+        task_gid: AsanaGID,
+        workspace_gid: AsanaGID,
+        incremental: bool = False,
+        max_in_flight: int = 15,
+        full_listing_interval: dt.timedelta = FULL_LISTING_INTERVAL,
+    ):
+        """Initialize the Asana side.
+
+        :param incremental: Only fetch the tasks that were modified since the previous run
+                            and merge them with the mirror of the tasks persisted in the
+                            side's cache.
+        :param max_in_flight: Maximum number of concurrent requests to Asana
+        :param full_listing_interval: When incremental, how often to list all the tasks
+                            instead, so that deleted tasks are eventually dropped
+        """
         self._client = client
         self._task_gid = task_gid
         self._workspace_gid = workspace_gid
+        self._incremental = incremental
+        self._max_in_flight = max_in_flight
+        self._full_listing_interval = full_listing_interval
+        self._rate_limiter = RateLimiter(
+            rate=REQUESTS_PER_SECOND,
+            max_in_flight=max_in_flight,
+        )
+
+        # remote version of the tasks, to base the updates on
+        self._items_cache: dict[AsanaGID, AsanaTask] = {}
 
         super().__init__(name="Asana", fullname="Asana")
 
     def start(self):
-        pass
+        # all the requests to Asana, from any thread, go through the rate limiter
+        self._client.session.mount(
+            self._client.options["base_url"],
+            RateLimitedAdapter(self._rate_limiter, pool_maxsize=self._max_in_flight),
+        )
 
     def finish(self):
-        pass
+        logger.debug(
+            format_dict(header="Asana rate limiting", items=self._rate_limiter.metrics()),
+        )
 
     def get_all_items(self, **kwargs) -> Sequence[AsanaTask]:
         del kwargs
         results = []
 
         if self._task_gid is None:
-            tasks = self._client.tasks.find_all(
-                assignee="me",
-                workspace=self._workspace_gid,
-                page_size=GET_TASKS_PAGE_SIZE,
-            )
-
-            for task in tasks:
-                detailed_task = self.get_item(task["gid"])
-                results.append(detailed_task)
+            if self._incremental and self._cache is not None:
+                results = self._get_all_items_incremental()
+            else:
+                results.extend(map(AsanaTask.from_raw_task, self._find_all_tasks()))
         else:
             task = self.get_item(self._task_gid)
             if task is not None:
                 results.append(task)
 
+        self._items_cache = {task.gid: task for task in results}
         return results
 
+    def _find_all_tasks(self, fields: Sequence[str] = TASK_FIELDS, **params):
+        """Iterate over the raw tasks assigned to the user, with the given fields only."""
+        return self._client.tasks.find_all(
+            assignee="me",
+            workspace=self._workspace_gid,
+            page_size=GET_TASKS_PAGE_SIZE,
+            fields=fields,
+            **params,
+        )
+
+    def _get_all_items_incremental(self) -> list[AsanaTask]:
+        """Get the tasks assigned to the user, only listing the tasks that changed.
+
+        The tasks modified since the most recent modification in the mirror of the previous
+        run are listed and merged into it, usually with a single request. Asana doesn't
+        report deleted tasks or tasks that were assigned to someone else though, so all the
+        tasks are listed every `full_listing_interval` to drop those from the mirror.
+        """
+        now = dt.datetime.now(dt.UTC)
+        state = self._incremental_state()
+        if state is None or now - state["listed_all_at"] >= self._full_listing_interval:
+            mirror = {t.gid: t for t in map(AsanaTask.from_raw_task, self._find_all_tasks())}
+            listed_all_at = now
+        else:
+            mirror = state["items"]
+            params = {}
+            if state["modified_since"] is not None:
+                params["modified_since"] = state["modified_since"].isoformat()
+            changed = [AsanaTask.from_raw_task(t) for t in self._find_all_tasks(**params)]
+            mirror.update((task.gid, task) for task in changed)
+            listed_all_at = state["listed_all_at"]
+            logger.debug(f"Fetched {len(changed)} changed tasks, {len(mirror)} tasks in total")
+
+        self._cache.dump(
+            _INCREMENTAL_STATE_KEY,
+            {
+                "workspace_gid": self._workspace_gid,
+                "listed_all_at": listed_all_at,
+                "modified_since": max(
+                    (t.modified_at for t in mirror.values()),
+                    default=None,
+                ),
+                "items": mirror,
+            },
+        )
+
+        return list(mirror.values())
+
+    def _incremental_state(self) -> dict | None:
+        """Get the persisted state of the previous run, if it's usable for this workspace."""
+        try:
+            state = self._cache.load(_INCREMENTAL_STATE_KEY)
+        except KeyError:
+            logger.info("No mirror of the tasks from a previous run, fetching all tasks...")
+            return None
+
+        if state["workspace_gid"] != self._workspace_gid:
+            logger.info("Workspace has changed since the previous run, fetching all tasks...")
+            return None
+
+        return state
+
     def get_item(self, item_id: AsanaGID) -> AsanaTask | None:
         """Get a single item (task) based on the given ID.
 
         :returns: None if not found, the item (task) in dict representation otherwise
         """
         try:
-            return AsanaTask.from_raw_task(self._client.tasks.find_by_id(item_id))
+            task = AsanaTask.from_raw_task(
+                self._client.tasks.find_by_id(item_id, fields=TASK_FIELDS),
+            )
         except asana.error.ForbiddenError:
             # We can get a ForbiddenError when we try to get a task that was
             # permanently deleted on the Asana side.
@@ -63,9 +176,13 @@ class AsanaSide(SyncSide):
         except asana.error.NotFoundError:
             return None
 
+        self._items_cache[item_id] = task
+        return task
+
     def delete_single_item(self, item_id: AsanaGID):
         """Delete an item (task) based on the given ID."""
         self._client.tasks.delete_task(item_id)
+        self._items_cache.pop(item_id, None)
 
     def update_item(self, item_id: AsanaGID, **changes):
         """Update with the given item (task).
@@ -86,7 +203,8 @@ class AsanaSide(SyncSide):
         # - If the remote Asana task 'due_on' field is empty, update 'due_at'.
         # - If the remote Asana task 'due_on' field is not empty and the
         #   'due_at' field is empty, update 'due_on'.
-        remote_task = self.get_item(item_id)
+        # The version fetched in this run is recent enough for that.
+        remote_task = self._items_cache.get(item_id) or self.get_item(item_id)
         if remote_task.get("due_on", None) is None:
             raw_task.pop("due_on", None)
         elif remote_task.get("due_at", None) is None:
@@ -94,7 +212,9 @@ class AsanaSide(SyncSide):
         else:
             raw_task.pop("due_on", None)
 
-        self._client.tasks.update_task(item_id, raw_task)
+        self._items_cache[item_id] = AsanaTask.from_raw_task(
+            self._client.tasks.update_task(item_id, raw_task, fields=TASK_FIELDS),
+        )
 
     def add_item(self, item: AsanaTask) -> AsanaTask:
         """Add a new item (task).
@@ -117,7 +237,11 @@ class AsanaSide(SyncSide):
         # Delete 'due_on' key, rely on 'due_at' instead.
         raw_task.pop("due_on", None)
 
-        return AsanaTask.from_raw_task(self._client.tasks.create_task(raw_task))
+        task = AsanaTask.from_raw_task(
+            self._client.tasks.create_task(raw_task, fields=TASK_FIELDS),
+        )
+        self._items_cache[task.gid] = task
+        return task
 
     @classmethod
     def id_key(cls) -> str:
@@ -161,3 +285,15 @@ class AsanaSide(SyncSide):
             compare_keys.remove("due_at")
 
         return SyncSide._items_are_identical(item1, item2, compare_keys)
+
+    @classmethod
+    def fingerprint(cls, item: AsanaTask, ignore_keys: Sequence[str] = []) -> str:
+        """Compute the fingerprint of the item (task).
+
+        Contrary to `items_are_identical`, both the 'due_at' and 'due_on' keys are always taken
+        into account, since whether one of them is ignored depends on the other item at hand.
+        """
+        return SyncSide._fingerprint(
+            item,
+            keys=[k for k in AsanaTask._key_names if k not in ignore_keys],
+        )
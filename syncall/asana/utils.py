@@ -1,5 +1,21 @@
-import asana
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
 from bubop import format_dict, logger
+from requests.adapters import HTTPAdapter
+
+from syncall.rate_limiter import parse_retry_after
+
+if TYPE_CHECKING:
+    import asana
+    from requests import PreparedRequest, Response
+
+    from syncall.rate_limiter import RateLimiter
+
+# Seconds to wait on a 429 response without a valid Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
 
 
 def list_asana_workspaces(client: asana.Client) -> None:
@@ -16,3 +32,31 @@ def list_asana_workspaces(client: asana.Client) -> None:
             items=items,
         ),
     )
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Transport adapter sending all the requests of a session through a RateLimiter.
+
+    On 429 responses, pauses all the requests going through the limiter for as long as the
+    `Retry-After` header asks. Retrying the throttled request is left to the asana client,
+    which already does so up to its `max_retries` option. Since the client only understands
+    a number of seconds in that header, the header is rewritten to the seconds to wait.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, **kargs):
+        super().__init__(**kargs)
+        self._rate_limiter = rate_limiter
+
+    def send(self, request: PreparedRequest, **kargs) -> Response:  # type: ignore[override]
+        with self._rate_limiter.request():
+            response = super().send(request, **kargs)
+
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = DEFAULT_RETRY_AFTER
+            response.headers["Retry-After"] = str(retry_after)
+            logger.debug(f"Asana is throttling requests, pausing for {retry_after}s...")
+            self._rate_limiter.pause(retry_after)
+
+        return response
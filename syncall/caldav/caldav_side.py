@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+from contextlib import suppress
 from typing import TYPE_CHECKING, Any
+from urllib.parse import unquote
 
 from bubop import logger
-from caldav.lib.error import NotFoundError
+from caldav.elements import dav
+from caldav.lib.error import DAVError, NotFoundError
 from icalendar.prop import vCategory, vDatetime, vText
 
 from syncall.tw_caldav_utils import SYNCALL_TW_UUID, SYNCALL_TW_WAITING
@@ -15,9 +19,19 @@ if TYPE_CHECKING:
     from item_synchronizer.types import ID
 
 from syncall.app_utils import error_and_exit
-from syncall.caldav.caldav_utils import calendar_todos, icalendar_component, map_ics_to_item
+from syncall.caldav.caldav_utils import (
+    GetCTag,
+    calendar_todos,
+    icalendar_component,
+    map_ics_to_item,
+)
 from syncall.sync_side import ItemType, SyncSide
 
+# Key under which the state of the incremental sync is persisted in the side's cache
+_INCREMENTAL_STATE_KEY = "incremental_state"
+# Key under which the parsed todos are persisted in the side's cache
+_PARSED_TODOS_KEY = "parsed_todos"
+
 
 class CaldavSide(SyncSide):
     """Wrapper to add/modify/delete todo entries from a caldav server."""
@@ -36,7 +50,18 @@ class CaldavSide(SyncSide):
 
     _date_keys: tuple[str] = ("end", "start", "last-modified")
 
-    def __init__(self, client: caldav.DAVClient, calendar_name: str) -> None:
+    def __init__(
+        self,
+        client: caldav.DAVClient,
+        calendar_name: str,
+        incremental: bool = False,
+    ) -> None:
+        """Init.
+
+        :param incremental: Use the sync token of the previous run to only fetch the todos
+                            that changed since then (RFC 6578) and merge them with the
+                            snapshot of the todos persisted in the side's cache.
+        """
         super().__init__(name="caldav", fullname="Caldav")
 
         self._client = client.principal()
@@ -44,6 +69,15 @@ class CaldavSide(SyncSide):
         self._calendar: caldav.Calendar
         self._items_cache: dict[str, dict] = {}
 
+        # UID -> calendar object resource (href + contents) of each todo, so that subsequent
+        # operations don't have to go through all the todos of the calendar to find it
+        self._resources: dict[str, caldav.CalendarObjectResource] = {}
+        self._incremental = incremental
+
+        # href -> (etag or digest of the contents, mapped item) of each parsed todo, so that
+        # every version of a todo is only parsed once
+        self._parsed: dict[str, tuple[str, dict]] = {}
+
     def start(self):
         logger.info(f"Initializing {self.fullname}...")
         self._calendar = self._get_calendar()
@@ -70,38 +104,211 @@ class CaldavSide(SyncSide):
 
     def get_all_items(self, **kargs):
         del kargs
+        if self._incremental and self._cache is not None:
+            todos = self._get_all_items_incremental()
+            if todos is not None:
+                return todos
+
         todos = []
         raw_todos = calendar_todos(self._calendar)
+        if self._cache is not None:
+            with suppress(KeyError):
+                self._parsed = self._cache.load(_PARSED_TODOS_KEY)
 
         # Format & cache items from ics files
+        self._resources = {}
+        hrefs = set()
         for t in raw_todos:
-            data = icalendar_component(t)
-            item = map_ics_to_item(data)
+            item = self._parse_todo(t)
             todos.append(item)
             self._items_cache[item["id"]] = item
+            self._resources[item["id"]] = t
+            hrefs.add(_href(t))
+
+        self._parsed = {href: self._parsed[href] for href in hrefs}
+        if self._cache is not None:
+            self._cache.dump(_PARSED_TODOS_KEY, self._parsed)
 
         return todos
 
+    def _get_all_items_incremental(self) -> list[dict] | None:
+        """Fetch only the todos that changed since the previous run.
+
+        Skip fetching altogether if the ctag (or the sync token) of the calendar hasn't
+        changed. Otherwise, ask for the hrefs and etags of the objects that changed since the
+        sync token of the previous run via a sync-collection REPORT, and download just the ones
+        with a new etag via a calendar-multiget REPORT.
+
+        :returns: All the todos of the calendar or None if the server doesn't support
+                  sync-collection reports.
+        """
+        state = self._incremental_state()
+        ctag = self._get_ctag()
+        if state is not None and ctag is not None and ctag == state["ctag"]:
+            logger.debug("Calendar hasn't changed since the previous run")
+            self._items_cache = state["items"]
+            self._resources = {}
+            return list(self._items_cache.values())
+
+        if state is None:
+            etags, uids, items = {}, {}, {}
+        else:
+            etags, uids, items = state["etags"], state["uids"], state["items"]
+
+        # without a sync token, the server lists all the objects of the calendar
+        full_listing = state is None
+        try:
+            collection = self._calendar.objects_by_sync_token(
+                sync_token=None if full_listing else state["sync_token"],
+            )
+        except DAVError:
+            if full_listing:
+                logger.warning(
+                    "Server doesn't support sync-collection reports, fetching all todos...",
+                )
+                return None
+
+            logger.info("Sync token has expired, listing all todos...")
+            collection = self._calendar.objects_by_sync_token()
+            full_listing = True
+
+        # objects without an etag are the deleted ones
+        changed = {_href(obj): obj.props.get(dav.GetEtag.tag) for obj in collection}
+        gone = {
+            href for href, etag in changed.items() if etag is None or etag != etags.get(href)
+        }
+        if full_listing:
+            gone |= set(etags) - set(changed)
+        for href in gone:
+            etags.pop(href, None)
+            items.pop(uids.pop(href, None), None)
+
+        to_fetch = [
+            obj.url for obj in collection if _href(obj) not in etags and changed[_href(obj)]
+        ]
+        self._resources = {}
+        if to_fetch:
+            for obj in self._calendar.calendar_multiget(to_fetch):
+                href = _href(obj)
+                etags[href] = changed.get(href)
+                item = self._parse_todo(obj, etag=etags[href])
+                if item is None:
+                    continue
+
+                uids[href] = item["id"]
+                items[item["id"]] = item
+                self._resources[item["id"]] = obj
+        logger.debug(
+            f"Fetched {len(to_fetch)} changed objects, {len(items)} todos in total",
+        )
+
+        self._items_cache = items
+        self._cache.dump(
+            _INCREMENTAL_STATE_KEY,
+            {
+                "calendar_url": str(self._calendar.url),
+                "sync_token": collection.sync_token,
+                "ctag": ctag,
+                "etags": etags,
+                "uids": uids,
+                "items": items,
+            },
+        )
+
+        return list(items.values())
+
+    def _parse_todo(
+        self,
+        obj: caldav.CalendarObjectResource,
+        etag: str | None = None,
+    ) -> dict | None:
+        """Map the given calendar object to an item, unless it isn't a todo.
+
+        Reuse the result of a previous parse if the object hasn't changed since, as indicated
+        by its etag or, if that's not known, by a digest of its contents.
+        """
+        href = _href(obj)
+        version = etag or hashlib.blake2b(obj.data.encode(), digest_size=16).hexdigest()
+        parsed = self._parsed.get(href)
+        if parsed is not None and parsed[0] == version:
+            return dict(parsed[1])
+
+        data = icalendar_component(obj)
+        if data.name != "VTODO":
+            return None
+
+        item = map_ics_to_item(data)
+        self._parsed[href] = (version, item)
+        return dict(item)
+
+    def _incremental_state(self) -> dict | None:
+        """Get the persisted state of the previous run, if it's usable for this calendar."""
+        try:
+            state = self._cache.load(_INCREMENTAL_STATE_KEY)
+        except KeyError:
+            logger.info("No sync token from a previous run, fetching all todos...")
+            return None
+
+        if state["calendar_url"] != str(self._calendar.url):
+            logger.info("Calendar has changed since the previous run, fetching all todos...")
+            return None
+
+        return state
+
+    def _get_ctag(self) -> str | None:
+        """Get a token that changes whenever any of the objects of the calendar changes.
+
+        That's the ctag of the calendar if the server supports the CalendarServer extension,
+        otherwise its sync token.
+        """
+        try:
+            props = self._calendar.get_properties([GetCTag(), dav.SyncToken()])
+        except DAVError:
+            return None
+
+        return props.get(GetCTag.tag) or props.get(dav.SyncToken.tag)
+
     def get_item(self, item_id: ID, use_cached: bool = False):
         item = self._items_cache.get(item_id)
         if not use_cached or item is None:
             item = self._find_todo_by_id(item_id=item_id)
         return item
 
-    def _find_todo_by_id_raw(self, item_id: ID) -> caldav.CalendarObjectResource | None:
-        return next(
-            (
-                item
-                for item in calendar_todos(self._calendar)
-                if icalendar_component(item).get("uid") == item_id
-            ),
-            None,
-        )
+    def _find_todo_by_id_raw(
+        self,
+        item_id: ID,
+        refresh: bool = False,
+    ) -> caldav.CalendarObjectResource | None:
+        """Find the calendar object resource of the todo with the given UID.
+
+        Use the index built by `get_all_items` and, failing that, query the server for the
+        given UID.
+
+        :param refresh: Fetch the latest contents of the todo, even if it's already indexed
+        """
+        todo = self._resources.get(item_id)
+        if todo is not None:
+            if not refresh:
+                return todo
+
+            try:
+                return todo.load()
+            except NotFoundError:
+                self._resources.pop(item_id, None)
+                return None
+
+        try:
+            todo = self._calendar.todo_by_uid(item_id)
+        except NotFoundError:
+            return None
+
+        self._resources[item_id] = todo
+        return todo
 
     def _find_todo_by_id(self, item_id: ID) -> dict | None:
-        raw_item = self._find_todo_by_id_raw(item_id=item_id)
+        raw_item = self._find_todo_by_id_raw(item_id=item_id, refresh=True)
         if raw_item:
-            return map_ics_to_item(icalendar_component(raw_item))
+            return self._parse_todo(raw_item)
 
         return None
 
@@ -109,6 +316,7 @@ class CaldavSide(SyncSide):
         todo = self._find_todo_by_id_raw(item_id=item_id)
         if todo is not None:
             todo.delete()
+            self._resources.pop(item_id, None)
 
     def update_item(self, item_id: ID, **changes):
         todo = self._find_todo_by_id_raw(item_id=item_id)
@@ -152,7 +360,10 @@ class CaldavSide(SyncSide):
             x_syncall_tw_uuid=item.get(SYNCALL_TW_UUID),
             x_syncall_tw_waiting=item.get(SYNCALL_TW_WAITING),
         )
-        return map_ics_to_item(icalendar_component(todo))
+        item = map_ics_to_item(icalendar_component(todo))
+        self._resources[item["id"]] = todo
+
+        return item
 
     @classmethod
     def id_key(cls) -> str:
@@ -173,3 +384,15 @@ class CaldavSide(SyncSide):
             item2,
             keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
         )
+
+    @classmethod
+    def fingerprint(cls, item, ignore_keys: Sequence[str] = []) -> str:
+        return SyncSide._fingerprint(
+            item,
+            keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
+        )
+
+
+def _href(obj: caldav.CalendarObjectResource) -> str:
+    """Path of the given object, regardless of how the server quotes it."""
+    return unquote(obj.url.path)
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 from uuid import UUID
 
 from bubop import logger
+from caldav.elements.base import ValuedBaseElement
 
 if TYPE_CHECKING:
     import caldav
@@ -15,6 +16,12 @@ if TYPE_CHECKING:
     from item_synchronizer.resolution_strategy import Item
 
 
+class GetCTag(ValuedBaseElement):
+    """The ctag of a calendar - CalendarServer extension, changes along with its contents."""
+
+    tag = "{http://calendarserver.org/ns/}getctag"
+
+
 def icalendar_component(obj: caldav.CalendarObjectResource):
     """Get the .icalendar_component isn't picked up by linters
 
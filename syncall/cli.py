@@ -20,6 +20,7 @@ from syncall.app_utils import (
 )
 from syncall.constants import COMBINATION_FLAGS
 from syncall.pdb_cli_utils import run_pdb_on_error as _run_pdb_on_error
+from syncall.serdes_store import name_to_serdes_store_type
 
 
 def _set_own_excepthook(ctx, param, value):
@@ -53,6 +54,7 @@ def opts_asana(hidden_gid: bool):
                 _opt_asana_workspace_gid,
                 _opt_asana_workspace_name,
                 _opt_list_asana_workspaces,
+                _opt_asana_max_in_flight,
             ],
         ):
             f = d()(f)
@@ -138,6 +140,19 @@ def _opt_list_asana_workspaces():
     )
 
 
+def _opt_asana_max_in_flight():
+    return click.option(
+        "--asana-max-in-flight",
+        "asana_max_in_flight",
+        default=15,
+        type=click.IntRange(min=1),
+        help=(
+            "Maximum number of concurrent requests to Asana - Asana allows up to 15 concurrent"
+            " write requests. Use along with --write-workers"
+        ),
+    )
+
+
 # taskwarrior options -------------------------------------------------------------------------
 def opts_tw_filtering():
     def decorator(f):
@@ -249,6 +264,18 @@ def opt_notion_page_id():
     )
 
 
+def opt_notion_nested_todos():
+    return click.option(
+        "--notion-nested-todos",
+        "notion_nested_todos",
+        is_flag=True,
+        help=(
+            "Also synchronize the todo blocks nested in other blocks of the page, e.g., in"
+            " toggles or columns. New todos are still added at the end of the page."
+        ),
+    )
+
+
 def opt_notion_token_pass_path():
     return click.option(
         "--token",
@@ -467,6 +494,9 @@ def opts_miscellaneous(side_A_name: str, side_B_name: str):
             [
                 (_opt_list_resolution_strategies,),
                 (_opt_resolution_strategy,),
+                (_opt_serdes_backend,),
+                (_opt_incremental,),
+                (_opt_write_workers,),
                 (_opt_confirm,),
                 (
                     click.version_option,
@@ -550,6 +580,44 @@ def _opt_resolution_strategy():
     )
 
 
+def _opt_serdes_backend():
+    return click.option(
+        "--serdes-backend",
+        default="pickle",
+        type=click.Choice(list(name_to_serdes_store_type.keys())),
+        help=(
+            "Storage format for the cached versions of the synchronized items. Existing"
+            " caches are migrated automatically when switching away from the default."
+        ),
+    )
+
+
+def _opt_incremental():
+    return click.option(
+        "--incremental",
+        "incremental",
+        is_flag=True,
+        default=False,
+        help=(
+            "Only fetch the items that were modified since the last run, for the sides that"
+            " support it. The rest of the items are read from a local snapshot."
+        ),
+    )
+
+
+def _opt_write_workers():
+    return click.option(
+        "--write-workers",
+        "write_workers",
+        default=1,
+        type=click.IntRange(min=1),
+        help=(
+            "Number of concurrent write operations (insert/update/delete) per side, for the"
+            " sides that support it. Taskwarrior is always written to sequentially."
+        ),
+    )
+
+
 def _opt_list_resolution_strategies():
     def _list_resolution_strategies(ctx, param, value):
         del ctx, param
@@ -9,6 +9,11 @@ from bubop.time import is_same_datetime
 from item_synchronizer.types import ID
 from loguru import logger
 
+from syncall.fingerprint import fingerprint_of
+
+# Tolerance when comparing the datetime keys of two items
+_DATETIME_TOLERANCE = datetime.timedelta(minutes=10)
+
 
 class KeyType(Enum):
     """Possible types of keys in an item."""
@@ -69,26 +74,14 @@ class ConcreteItem(_ConcreteItemMeta):
 
         By default go through and check all the registerd keys.
         """
-        if ignore_keys is None:
-            ignore_keys = []
-
-        # the ignore_keys should be given as a Sequence[ItemKey] but until then, whatever keys
-        # come in, we convert them to ItemKey.
-        ignore_keys_ = []
-        for key in ignore_keys:
-            if isinstance(key, str):
-                ignore_keys_.append(self._str_to_key[key])
-            else:
-                ignore_keys_.append(key)
-
-        keys_to_check = self._keys - set(ignore_keys_)
+        keys_to_check = self._keys_to_check(ignore_keys)
 
         for key in keys_to_check:
             if key.type is KeyType.Date:
                 if not is_same_datetime(
                     self[key.name],
                     other[key.name],
-                    tol=datetime.timedelta(minutes=10),
+                    tol=_DATETIME_TOLERANCE,
                 ):
                     logger.opt(lazy=True).trace(
                         f"\n\nItems differ\n\nItem1\n\n{self}\n\nItem2\n\n{other}\n\nKey"
@@ -103,3 +96,30 @@ class ConcreteItem(_ConcreteItemMeta):
                 return False
 
         return True
+
+    def fingerprint(self, ignore_keys: Sequence[ItemKey | str] | None = None) -> str:
+        """Compute a canonical fingerprint of the item over the keys that `compare` checks.
+
+        Items with the same fingerprint are also considered equal by `compare`.
+        """
+        values = {key.name: self[key.name] for key in self._keys_to_check(ignore_keys)}
+        return fingerprint_of(
+            values,
+            values.keys(),
+            datetime_tolerance=_DATETIME_TOLERANCE,
+        )
+
+    def _keys_to_check(self, ignore_keys: Sequence[ItemKey | str] | None) -> set[ItemKey]:
+        if ignore_keys is None:
+            ignore_keys = []
+
+        # the ignore_keys should be given as a Sequence[ItemKey] but until then, whatever keys
+        # come in, we convert them to ItemKey.
+        ignore_keys_ = []
+        for key in ignore_keys:
+            if isinstance(key, str):
+                ignore_keys_.append(self._str_to_key[key])
+            else:
+                ignore_keys_.append(key)
+
+        return self._keys - set(ignore_keys_)
@@ -97,6 +97,10 @@ class FilesystemFile(ConcreteItem):
     def __repr__(self) -> str:
         return f"FilesystemFile(path={self._path}, filetype={self._filetype})"
 
+    @property
+    def path(self) -> Path:
+        return self._path
+
     @property
     def root(self):
         return self._path.parent
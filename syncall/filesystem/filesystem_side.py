@@ -1,18 +1,27 @@
+import os
 from collections.abc import MutableMapping, Sequence
+from contextlib import suppress
 from pathlib import Path
 
 from item_synchronizer.types import ID
 from loguru import logger
 
 from syncall.concrete_item import ConcreteItem
+from syncall.exceptions import AttributeNotSetError
 from syncall.filesystem.filesystem_file import FilesystemFile
 from syncall.sync_side import SyncSide
 
+# Key under which the index of the files is persisted in the side's cache
+_FILES_INDEX_KEY = "files_index"
+
 
 class FilesystemSide(SyncSide):
     """Integration for managing files in a local filesystem.
 
     - Embed the UUID as an extended attribute of each file.
+    - Keep an index of the ID of each file, along with the inode and modification time of the
+      file at the time, so that looking up a file by its ID doesn't require reading all the
+      files - only the ones that changed since they were indexed.
     """
 
     @classmethod
@@ -35,32 +44,41 @@ class FilesystemSide(SyncSide):
             filename_extension = f".{filename_extension}"
 
         self._filename_extension = filename_extension
+        self._items_cache: MutableMapping[ID, FilesystemFile] = {}
 
-        all_items = self.get_all_items()
-        self._items_cache: MutableMapping[ID, FilesystemFile] = {
-            item.id: item for item in all_items
-        }
+        # file name -> (inode, modification time [ns], ID) of each file, at the time its ID
+        # was read, and ID -> file name
+        self._files_index: dict[str, tuple[int, int, ID]] = {}
+        self._names: dict[ID, str] = {}
 
     @property
     def filesystem_root(self) -> Path:
         return self._filesystem_root
 
     def start(self):
-        pass
+        if self._cache is not None:
+            with suppress(KeyError):
+                self._files_index = self._cache.load(_FILES_INDEX_KEY)
+                self._names = {id_: name for name, (_, _, id_) in self._files_index.items()}
 
     def finish(self):
         for item in self._items_cache.values():
             item.flush()
 
+        if self._cache is not None:
+            self._cache.dump(_FILES_INDEX_KEY, self._files_index)
+
     def get_all_items(self, **kargs) -> Sequence[FilesystemFile]:
         """Read all items again from storage."""
         del kargs
 
-        all_items = tuple(
-            FilesystemFile(path=p)
-            for p in self._filesystem_root.iterdir()
-            if p.is_file() and p.suffix == self._filename_extension
-        )
+        all_items = tuple(FilesystemFile(path=entry.path) for entry in self._scan())
+
+        self._files_index = {}
+        self._names = {}
+        for item in all_items:
+            self._index(item)
+        self._items_cache = {item.id: item for item in all_items}
 
         logger.opt(lazy=True).debug(
             f"Found {len(all_items)} matching files under {self._filesystem_root} using"
@@ -78,23 +96,87 @@ class FilesystemSide(SyncSide):
         return item
 
     def _get_item_refresh(self, item_id: ID) -> FilesystemFile | None:
-        """Search for the FilesystemFile in the root directory given its ID."""
-        fs_files = self.get_all_items()
-
-        matching_fs_files = [fs_file for fs_file in fs_files if fs_file.id == item_id]
-        if len(matching_fs_files) > 1:
-            logger.warning(
-                f"Found {len(matching_fs_files)} paths with the item ID [{item_id}]."
-                "Arbitrarily returning the first item.",
-            )
-        elif len(matching_fs_files) == 0:
-            return None
+        """Read the FilesystemFile with the given ID from the root directory."""
+        name = self._names.get(item_id)
+        if name is None or not self._is_indexed(self._filesystem_root / name):
+            self._refresh_index()
+            name = self._names.get(item_id)
+            if name is None:
+                return None
 
         # update the cache & return
-        item = matching_fs_files[0]
+        item = FilesystemFile(path=self._filesystem_root / name)
         self._items_cache[item_id] = item
         return item
 
+    def _scan(self) -> list[os.DirEntry]:
+        """List the matching files under the root directory with a single pass."""
+        with os.scandir(self._filesystem_root) as it:
+            return sorted(
+                (
+                    entry
+                    for entry in it
+                    if entry.is_file() and Path(entry.name).suffix == self._filename_extension
+                ),
+                key=lambda entry: entry.name,
+            )
+
+    def _index(self, item: FilesystemFile) -> None:
+        """Add the given file to the index, as it is on disk right now."""
+        name = self._names.pop(item.id, None)
+        if name is not None:
+            self._files_index.pop(name, None)
+
+        try:
+            stat = item.path.stat()
+        except FileNotFoundError:
+            return
+
+        self._files_index[item.path.name] = (stat.st_ino, stat.st_mtime_ns, item.id)
+        self._names[item.id] = item.path.name
+
+    def _is_indexed(self, path: Path) -> bool:
+        """Return true if the file under the given path hasn't changed since indexed."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+
+        indexed = self._files_index.get(path.name)
+        return indexed is not None and indexed[:2] == (stat.st_ino, stat.st_mtime_ns)
+
+    def _refresh_index(self) -> None:
+        """Bring the index up-to-date, only reading the IDs of the files that changed."""
+        files_index = {}
+        names: dict[ID, str] = {}
+        num_read = 0
+        for entry in self._scan():
+            stat = entry.stat()
+            indexed = self._files_index.get(entry.name)
+            if indexed is not None and indexed[:2] == (stat.st_ino, stat.st_mtime_ns):
+                id_ = indexed[2]
+            else:
+                num_read += 1
+                try:
+                    id_ = FilesystemFile.get_id_of_path(Path(entry.path))
+                except AttributeNotSetError:
+                    # not assigned an ID yet, there's nothing to look it up by
+                    continue
+
+            if id_ in names:
+                logger.warning(
+                    f"Found more than one paths with the item ID [{id_}]. Arbitrarily using"
+                    f" the first one - {names[id_]}",
+                )
+                continue
+
+            files_index[entry.name] = (stat.st_ino, stat.st_mtime_ns, id_)
+            names[id_] = entry.name
+
+        logger.trace(f"Refreshed the index of files, read the IDs of {num_read} files")
+        self._files_index = files_index
+        self._names = names
+
     def delete_single_item(self, item_id: ID):
         item = self.get_item(item_id)
         if item is None:
@@ -103,6 +185,7 @@ class FilesystemSide(SyncSide):
 
         item.delete()
         item.flush()
+        self._files_index.pop(self._names.pop(item_id, ""), None)
 
     def update_item(self, item_id: ID, **changes):
         item = self.get_item(item_id)
@@ -117,10 +200,12 @@ class FilesystemSide(SyncSide):
         item.title = changes["title"]
         item.contents = changes["contents"]
         item.flush()
+        self._index(item)
 
     def add_item(self, item: FilesystemFile) -> FilesystemFile:
         item.root = self.filesystem_root
         item.flush()
+        self._index(item)
         return item
 
     @classmethod
@@ -133,3 +218,9 @@ class FilesystemSide(SyncSide):
         ignore_keys_ = [cls.last_modification_key()]
         ignore_keys_.extend(ignore_keys)
         return item1.compare(item2, ignore_keys=ignore_keys_)
+
+    @classmethod
+    def fingerprint(cls, item: ConcreteItem, ignore_keys: Sequence[str] = []) -> str:
+        ignore_keys_ = [cls.last_modification_key()]
+        ignore_keys_.extend(ignore_keys)
+        return item.fingerprint(ignore_keys=ignore_keys_)
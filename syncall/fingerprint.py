@@ -0,0 +1,107 @@
+"""Canonical fingerprints of synchronization items.
+
+A fingerprint is a hash over the values that a SyncSide takes into account when determining
+whether two items are identical. Datetimes are truncated to the comparison tolerance so that,
+if two items share the same fingerprint, they are also identical according to the tolerant
+comparison. The opposite doesn't necessarily hold (e.g., two datetimes within the tolerance
+but on different sides of a truncation boundary) - in that case the caller should fall back to
+comparing the full items.
+
+A fingerprint covers all of the compared keys, including those the item doesn't have, and it's
+namespaced by the set of these keys. Thus, a missing key isn't confused with an ignored one and
+fingerprints computed over different keys, e.g., by synchronizations that ignore different
+keys but share the same serdes store, never match.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import math
+from collections.abc import Iterable, Mapping
+from collections.abc import Set as AbstractSet
+from typing import Any
+
+from bubop import assume_local_tz_if_none
+
+
+class _Missing:
+    """Placeholder for the value of a compared key that the item doesn't have."""
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+def _canonical(value: Any) -> Any:  # noqa: ANN401
+    """Canonical, hashable representation of the given value - compares exactly."""
+    if isinstance(value, dt.datetime):
+        return ("datetime", value.tzinfo is None, assume_local_tz_if_none(value).timestamp())
+
+    if isinstance(value, dt.date):
+        return ("date", value.isoformat())
+
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(k), _canonical(v)) for k, v in value.items()))
+
+    if isinstance(value, AbstractSet):
+        return ("set", tuple(sorted(repr(_canonical(v)) for v in value)))
+
+    if isinstance(value, list | tuple):
+        return tuple(_canonical(v) for v in value)
+
+    return value
+
+
+def _canonical_top_level(value: Any, tol_secs: float) -> Any:  # noqa: ANN401
+    """Canonical representation of a top-level value - datetimes are compared with tolerance.
+
+    This mimics the item comparison functions, which only take the tolerance into account when
+    the value of a key is itself a datetime.
+    """
+    if isinstance(value, dt.datetime) and tol_secs:
+        ts = assume_local_tz_if_none(value).timestamp()
+        return ("datetime", math.floor(ts / tol_secs))
+
+    return _canonical(value)
+
+
+def fingerprint_of(
+    item: Mapping[str, Any],
+    keys: Iterable[str],
+    datetime_tolerance: dt.timedelta,
+) -> str:
+    """Compute the fingerprint of the given keys of the item.
+
+    >>> due = dt.datetime(2024, 1, 1, 10, 0, 5, tzinfo=dt.timezone.utc)
+    >>> tol = dt.timedelta(minutes=1)
+    >>> keys = ["summary", "due"]
+    >>> a = fingerprint_of({"summary": "kalimera", "due": due}, keys, tol)
+    >>> a == fingerprint_of(
+    ...     {"due": due + dt.timedelta(seconds=30), "summary": "kalimera"}, keys, tol
+    ... )
+    True
+    >>> a == fingerprint_of(
+    ...     {"summary": "kalimera", "due": due + dt.timedelta(minutes=2)}, keys, tol
+    ... )
+    False
+    >>> b = fingerprint_of({"summary": "kalimera"}, keys, tol)
+    >>> a == b
+    False
+    >>> b == fingerprint_of({"summary": "kalimera", "due": None}, keys, tol)
+    False
+    >>> b == fingerprint_of({"summary": "kalimera"}, ["summary"], tol)
+    False
+    """
+    keys_ = sorted({str(k) for k in keys})
+    tol_secs = datetime_tolerance.total_seconds()
+    canonical = tuple(
+        (k, _canonical_top_level(item[k], tol_secs) if k in item else _MISSING) for k in keys_
+    )
+    return f"{_digest(keys_, digest_size=4)}:{_digest(canonical, digest_size=16)}"
+
+
+def _digest(value: Any, digest_size: int) -> str:  # noqa: ANN401
+    return hashlib.blake2b(repr(value).encode("utf-8"), digest_size=digest_size).hexdigest()
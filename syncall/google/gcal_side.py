@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import datetime
 import importlib.resources
+from http import HTTPStatus
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal, cast
 
@@ -16,10 +17,17 @@ from syncall.sync_side import SyncSide
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from googleapiclient.http import HttpRequest
+
+    from syncall.sync_side import WriteCallback
+
 DEFAULT_CLIENT_SECRET = str(
     importlib.resources.files("syncall") / "res/gcal_client_secret.json"
 )
 
+# Key under which the state of the incremental sync is persisted in the side's cache
+_INCREMENTAL_STATE_KEY = "incremental_state"
+
 
 class GCalSide(GoogleSide):
     """GCalSide interacts with the Google Calendar API.
@@ -45,8 +53,15 @@ class GCalSide(GoogleSide):
         *,
         calendar_summary="TaskWarrior Reminders",
         client_secret: str | None,
+        incremental: bool = False,
         **kargs,
     ):
+        """Init.
+
+        :param incremental: Use the sync token of the previous run to only fetch the events
+                            that changed since then and merge them with the snapshot of the
+                            events persisted in the side's cache.
+        """
         if client_secret is None:
             client_secret = DEFAULT_CLIENT_SECRET
 
@@ -61,7 +76,7 @@ class GCalSide(GoogleSide):
 
         self._calendar_summary = calendar_summary
         self._calendar_id: str
-        self._items_cache: dict[str, dict] = {}
+        self._incremental = incremental
 
     def start(self):
         logger.debug("Connecting to Google Calendar...")
@@ -112,27 +127,86 @@ class GCalSide(GoogleSide):
         """
         del kargs
 
-        # Get the ID of the calendar of interest
+        state = self._incremental_state()
+        if state is None:
+            events, sync_token = self._list_events()
+            self._items_cache = {e["id"]: e for e in events if e["status"] != "cancelled"}
+        else:
+            try:
+                events, sync_token = self._list_events(syncToken=state["sync_token"])
+            except HttpError as err:
+                if err.resp.status != HTTPStatus.GONE:
+                    raise
+
+                logger.info("Sync token has expired, fetching all events...")
+                events, sync_token = self._list_events()
+                self._items_cache = {}
+            else:
+                self._items_cache = state["items"]
+
+            # changed events - cancelled ones are the deleted events
+            for e in events:
+                if e["status"] == "cancelled":
+                    self._items_cache.pop(e["id"], None)
+                else:
+                    self._items_cache[e["id"]] = e
+            logger.debug(
+                f"Merged {len(events)} changed events, {len(self._items_cache)} events in total",
+            )
+
+        if self._incremental and self._cache is not None and sync_token is not None:
+            self._cache.dump(
+                _INCREMENTAL_STATE_KEY,
+                {
+                    "calendar_id": self._calendar_id,
+                    "sync_token": sync_token,
+                    "items": self._items_cache,
+                },
+            )
+
+        return list(self._items_cache.values())
+
+    def _incremental_state(self) -> dict | None:
+        """Get the persisted state of the previous run, if it's usable for this calendar."""
+        if not self._incremental or self._cache is None:
+            return None
+
+        try:
+            state = self._cache.load(_INCREMENTAL_STATE_KEY)
+        except KeyError:
+            logger.info("No sync token from a previous run, fetching all events...")
+            return None
+
+        if state["calendar_id"] != self._calendar_id:
+            logger.info("Calendar has changed since the previous run, fetching all events...")
+            return None
+
+        return state
+
+    def _list_events(self, **kargs) -> tuple[list[dict], str | None]:
+        """List the events of the calendar, going through all the result pages.
+
+        :param kargs: Extra parameters for the `events().list` call, e.g., `syncToken`
+        :returns: The events and the sync token for fetching the subsequent changes
+        """
         events = []
-        request = self._service.events().list(calendarId=self._calendar_id)
+        request = self._service.events().list(calendarId=self._calendar_id, **kargs)
 
         # Loop until all pages have been processed.
+        response = {}
         while request is not None:
             # Get the next page.
             response = request.execute()
             # Accessing the response like a dict object with an 'items' key
             # returns a list of item objects (events).
-            events.extend([e for e in response.get("items", []) if e["status"] != "cancelled"])
+            events.extend(response.get("items", []))
 
             # Get the next request object by passing the previous request
             # object to the list_next method.
             request = self._service.events().list_next(request, response)
 
-        # cache them
-        for e in events:
-            self._items_cache[e["id"]] = e
-
-        return events
+        # only the last page contains the sync token
+        return events, response.get("nextSyncToken")
 
     def get_item(self, item_id: str, use_cached: bool = True) -> dict | None:
         item = self._items_cache.get(item_id)
@@ -159,28 +233,42 @@ class GCalSide(GoogleSide):
 
         return ret
 
-    def update_item(self, item_id, **changes):
-        # Check if item is there
-        event = (
-            self._service.events().get(calendarId=self._calendar_id, eventId=item_id).execute()
-        )
-        event.update(changes)
-        self._service.events().update(
+    def _update_request(self, item_id, *, refresh: bool = False, **changes) -> HttpRequest:
+        event = None if refresh else self._items_cache.get(item_id)
+        if event is None:
+            event = (
+                self._service.events()
+                .get(calendarId=self._calendar_id, eventId=item_id)
+                .execute()
+            )
+
+        request = self._service.events().update(
             calendarId=self._calendar_id,
-            eventId=event["id"],
-            body=event,
-        ).execute()
+            eventId=item_id,
+            body={**event, **changes},
+        )
+        return self._if_match(request, event)
 
     def add_item(self, item) -> dict:
-        event = (
-            self._service.events().insert(calendarId=self._calendar_id, body=item).execute()
-        )
+        event = self._add_request(item).execute()
         logger.debug(f"Event created -> {event.get('htmlLink')}")
 
         return event
 
+    def queue_add_item(self, item, callback: WriteCallback) -> None:
+        self._queue_request(self._add_request(item), callback)
+
+    def _add_request(self, item) -> HttpRequest:
+        return self._service.events().insert(calendarId=self._calendar_id, body=item)
+
     def delete_single_item(self, item_id) -> None:
-        self._service.events().delete(calendarId=self._calendar_id, eventId=item_id).execute()
+        self._delete_request(item_id).execute()
+
+    def queue_delete_single_item(self, item_id, callback: WriteCallback) -> None:
+        self._queue_request(self._delete_request(item_id), callback)
+
+    def _delete_request(self, item_id) -> HttpRequest:
+        return self._service.events().delete(calendarId=self._calendar_id, eventId=item_id)
 
     @classmethod
     def id_key(cls) -> str:
@@ -219,6 +307,8 @@ class GCalSide(GoogleSide):
 
     @classmethod
     def items_are_identical(cls, item1, item2, ignore_keys: Sequence[str] = []) -> bool:
+        # don't modify the given items, they may be used as the basis for updates
+        item1, item2 = dict(item1), dict(item2)
         for item in [item1, item2]:
             for key in cls._date_keys:
                 if key not in item:
@@ -231,3 +321,17 @@ class GCalSide(GoogleSide):
             item2,
             keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
         )
+
+    @classmethod
+    def fingerprint(cls, item, ignore_keys: Sequence[str] = []) -> str:
+        item = dict(item)
+        for key in cls._date_keys:
+            if key not in item:
+                continue
+
+            item[key] = parse_google_datetime(item[key])
+
+        return SyncSide._fingerprint(
+            item,
+            keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
+        )
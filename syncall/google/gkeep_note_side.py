@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from typing import TYPE_CHECKING
 
 from gkeepapi.node import Label, Note, TopLevelNode
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterable, Sequence
 
     from item_synchronizer.types import ID
 
@@ -16,6 +17,9 @@ from loguru import logger
 from syncall.google.gkeep_note import GKeepNote
 from syncall.google.gkeep_side import GKeepSide
 
+# Key of the label index among the indexes persisted along with the Keep state
+_NOTES_BY_LABEL_KEY = "notes_by_label"
+
 
 class GKeepNoteSide(GKeepSide):
     """Create, update, delete notes on the Google Keep side."""
@@ -44,6 +48,15 @@ class GKeepNoteSide(GKeepSide):
         self._gkeep_ignore_labels_strs = gkeep_ignore_labels or []
         self._gkeep_ignore_labels: set[Label] = set()
 
+        # note ID -> note, for all the notes selected by the last `get_all_items` call, so that
+        # operations on a single note don't have to go through all the notes of the account
+        self._notes: dict[ID, GKeepNote] = {}
+
+        # label ID -> IDs of the notes with that label, so that selecting the notes to
+        # synchronize only touches the notes with the given labels. Persisted along with the
+        # Keep state and updated with the notes that each sync changes.
+        self._notes_by_label: defaultdict[str, set[ID]] = defaultdict(set)
+
     def start(self):
         super().start()
 
@@ -62,41 +75,90 @@ class GKeepNoteSide(GKeepSide):
                     container.add(self._keep.createLabel(label_str))
                 else:
                     logger.debug(f"Using existing label -> {label_str}...")
-                    self._gkeep_labels.add(label)
+                    container.add(label)
+
+        notes_by_label = self._persisted_indexes.get(_NOTES_BY_LABEL_KEY)
+        if notes_by_label is None:
+            logger.debug("Indexing the labels of all the Google Keep notes...")
+            self._notes_by_label = defaultdict(set)
+            self._keep.pop_changed_node_ids()
+            self._index_notes(node.id for node in self._keep.all())
+        else:
+            self._notes_by_label = defaultdict(set, notes_by_label)
+            self._update_label_index()
+
+    def _indexes_to_persist(self) -> dict:
+        self._update_label_index()
+        return {_NOTES_BY_LABEL_KEY: dict(self._notes_by_label)}
+
+    def _update_label_index(self) -> None:
+        """Re-index the labels of the notes changed by the syncs since the last update."""
+        changed = self._keep.pop_changed_node_ids()
+        if not changed:
+            return
+
+        for note_ids in self._notes_by_label.values():
+            note_ids.difference_update(changed)
+        self._index_notes(changed)
+
+    def _index_notes(self, note_ids: Iterable[ID]) -> None:
+        for note_id in note_ids:
+            # None for the deleted notes and for the nodes that aren't notes, e.g., list items
+            node = self._keep.get(note_id)
+            if node is None:
+                continue
+
+            for label in node.labels.all():
+                self._notes_by_label[label.id].add(node.id)
 
     def get_all_items(self, **kargs) -> Sequence[GKeepNote]:
         del kargs
 
-        def note_contains_labels(node: TopLevelNode, labels: set[Label]) -> bool:
-            return labels.issubset(node.labels.all())
-
-        def note_does_not_contain_labels(node: TopLevelNode, labels: set[Label]) -> bool:
-            return labels.isdisjoint(node.labels.all())
-
-        def node_is_of_type_note(node: TopLevelNode) -> bool:
-            return isinstance(node, Note)
-
-        matching: Sequence[Note] = list(
-            self._keep.find(
-                func=lambda node: (
-                    note_contains_labels(node, self._gkeep_labels)
-                    and note_does_not_contain_labels(node, self._gkeep_ignore_labels)
-                    and node_is_of_type_note(node)
-                    and not node.deleted
-                    and not node.archived
-                ),
-            ),
-        )
+        # resolve the label query via the label index, check the rest of the criteria only for
+        # the notes that match it. Without labels to look for, all the notes are candidates.
+        if self._gkeep_labels:
+            candidates = set.intersection(
+                *(self._notes_by_label.get(label.id, set()) for label in self._gkeep_labels),
+            )
+        else:
+            candidates = {node.id for node in self._keep.all()}
+        for label in self._gkeep_ignore_labels:
+            candidates -= self._notes_by_label.get(label.id, set())
+
+        matching: Sequence[Note] = [
+            node
+            for node in map(self._keep.get, sorted(candidates))
+            if node is not None and self._is_selected(node)
+        ]
+        self._notes = {m.id: GKeepNote.from_gkeep_note(m) for m in matching}
 
-        return tuple(GKeepNote.from_gkeep_note(m) for m in matching)
+        return tuple(self._notes.values())
 
     def get_item(self, item_id: str, use_cached: bool = True) -> GKeepNote | None:
         del use_cached
-        for item in self.get_all_items():
-            if item.id == item_id:
-                return item
+        item = self._notes.get(item_id)
+        if item is not None:
+            return item
 
-        return None
+        # not indexed - look it up directly in the Keep state
+        node = self._keep.get(item_id)
+        if node is None or not self._is_selected(node):
+            return None
+
+        item = GKeepNote.from_gkeep_note(node)
+        self._notes[item.id] = item
+        return item
+
+    def _is_selected(self, node: TopLevelNode) -> bool:
+        """Return true if the given node is one of the notes to synchronize."""
+        node_labels = node.labels.all()
+        return (
+            isinstance(node, Note)
+            and self._gkeep_labels.issubset(node_labels)
+            and self._gkeep_ignore_labels.isdisjoint(node_labels)
+            and not node.deleted
+            and not node.archived
+        )
 
     def _get_item_by_id(self, item_id: ID) -> GKeepNote:
         item = self.get_item(item_id=item_id)
@@ -107,6 +169,7 @@ class GKeepNoteSide(GKeepSide):
     def delete_single_item(self, item_id: ID) -> None:
         item = self._get_item_by_id(item_id=item_id)
         item.delete()
+        self._notes.pop(item_id, None)
 
     def update_item(self, item_id: ID, **updated_properties):
         if not {"plaintext", "title"}.issubset(updated_properties.keys()):
@@ -125,7 +188,11 @@ class GKeepNoteSide(GKeepSide):
         new_item = self._keep.createNote(item.title, text=item.plaintext)
         for label in self._gkeep_labels:
             new_item.labels.add(label)
-        return GKeepNote.from_gkeep_note(new_item)
+            self._notes_by_label[label.id].add(new_item.id)
+
+        item = GKeepNote.from_gkeep_note(new_item)
+        self._notes[item.id] = item
+        return item
 
     @classmethod
     def items_are_identical(
@@ -137,3 +204,9 @@ class GKeepNoteSide(GKeepSide):
         ignore_keys_ = [cls.last_modification_key()]
         ignore_keys_.extend(ignore_keys)
         return item1.compare(item2, ignore_keys=ignore_keys_)
+
+    @classmethod
+    def fingerprint(cls, item: ConcreteItem, ignore_keys: Sequence[str] = []) -> str:
+        ignore_keys_ = [cls.last_modification_key()]
+        ignore_keys_.extend(ignore_keys)
+        return item.fingerprint(ignore_keys=ignore_keys_)
@@ -1,11 +1,31 @@
 from bubop import logger
 from gkeepapi import Keep
-from gkeepapi.exception import LoginException
+from gkeepapi.exception import LoginException, ResyncRequiredException
 from gkeepapi.node import Label, TopLevelNode
 from gkeepapi.node import List as GKeepList
 
 from syncall.sync_side import SyncSide
 
+# Key under which the state of the Keep client is persisted in the side's cache
+_KEEP_STATE_KEY = "keep_state"
+
+
+class _Keep(Keep):
+    """Keep client that records the IDs of the nodes that its syncs add, update or delete."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._changed_node_ids: set[str] = set()
+
+    def pop_changed_node_ids(self) -> set[str]:
+        """Return the IDs of the nodes changed since the previous call."""
+        changed, self._changed_node_ids = self._changed_node_ids, set()
+        return changed
+
+    def _parseNodes(self, raw: list[dict]) -> None:
+        self._changed_node_ids.update(raw_node["id"] for raw_node in raw)
+        super()._parseNodes(raw)
+
 
 class GKeepSide(SyncSide):
     """Wrapper class to add/modify/delete todo entries from Google Keep."""
@@ -23,6 +43,10 @@ class GKeepSide(SyncSide):
         self._gkeep_passwd = gkeep_passwd
         self._gkeep_token = gkeep_token
 
+        # indexes over the notes, persisted along with the Keep state they were built from -
+        # see `_indexes_to_persist`. Empty if the Keep state wasn't restored.
+        self._persisted_indexes: dict = {}
+
         super().__init__(**kargs)
 
     def get_master_token(self) -> str | None:
@@ -34,25 +58,78 @@ class GKeepSide(SyncSide):
     def start(self):
         super().start()
         logger.debug("Connecting to Google Keep...")
-        self._keep = Keep()
+        self._keep = _Keep()
 
         try:
-            self._keep.resume(self._gkeep_user, self._gkeep_token, state=None, sync=True)
+            self._keep.resume(self._gkeep_user, self._gkeep_token, state=None, sync=False)
             logger.info("Logged in using token")
         except LoginException:
             # We have a token and we couldn't log in using this token, thus it's invalid.
             if self._gkeep_token is not None:
                 logger.debug("Invalid token, attempting login via username/password...")
-            self._keep.login(self._gkeep_user, self._gkeep_passwd)
+            self._keep.login(self._gkeep_user, self._gkeep_passwd, state=None, sync=False)
             logger.info("Logged in using username/password")
 
         # we're logged in, cache the token
         self._gkeep_token = self._keep.getMasterToken()
 
+        # only fetch the changes since the previous run, if we know its state
+        self._restore_keep_state()
+        try:
+            self._keep.sync()
+        except ResyncRequiredException:
+            logger.info("Google Keep asked for a full resync, fetching all notes...")
+            self._persisted_indexes = {}
+            self._keep.pop_changed_node_ids()
+            self._keep.sync(resync=True)
+
     def finish(self):
         logger.info("Flushing data to remote Google Keep...")
         self._keep.sync()
 
+        if self._cache is not None:
+            self._cache.dump(
+                _KEEP_STATE_KEY,
+                {
+                    "user": self._gkeep_user,
+                    "state": self._keep.dump(),
+                    "indexes": self._indexes_to_persist(),
+                },
+            )
+
+    def _indexes_to_persist(self) -> dict:
+        """Return the indexes over the notes to persist along with the Keep state.
+
+        They are available as `_persisted_indexes` on the next run, after the sync in `start()`
+        and as long as the Keep state is restored. The nodes changed by that sync are then
+        available via `self._keep.pop_changed_node_ids()`.
+        """
+        return {}
+
+    def _restore_keep_state(self) -> None:
+        """Load the notes and the version of the Keep state as of the end of the previous run.
+
+        Subsequent syncs then only transfer the changes made on the server since then.
+        """
+        if self._cache is None:
+            return
+
+        try:
+            state = self._cache.load(_KEEP_STATE_KEY)
+        except KeyError:
+            logger.info("No Google Keep state from a previous run, fetching all notes...")
+            return
+
+        if state["user"] != self._gkeep_user:
+            logger.info(
+                "Google Keep account has changed since the previous run, fetching all notes..."
+            )
+            return
+
+        self._keep.restore(state["state"])
+        self._keep.pop_changed_node_ids()
+        self._persisted_indexes = state.get("indexes", {})
+
     def _note_has_label(self, note: TopLevelNode, label: Label) -> bool:
         """Return true if the Google Keep note has the said label."""
         return any(label == la for la in note.labels.all())
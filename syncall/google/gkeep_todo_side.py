@@ -1,12 +1,17 @@
 from collections.abc import Sequence
 
-from bubop import logger
+from bubop import format_dict, logger
 from gkeepapi.node import Label, TopLevelNode
 from gkeepapi.node import List as GKeepList
 from item_synchronizer.types import ID
 
 from syncall.google.gkeep_side import GKeepSide
 from syncall.google.gkeep_todo_item import GKeepTodoItem
+from syncall.sync_side import WriteCallback
+
+# Outcome of a queued write operation - its callback, the resulting item and the exception that
+# occurred, if any
+_WriteResult = tuple[WriteCallback, GKeepTodoItem | None, Exception | None]
 
 
 class GKeepTodoSide(GKeepSide):
@@ -14,6 +19,10 @@ class GKeepTodoSide(GKeepSide):
 
     Currently not using the official Google API since it's enterprise only, but using
     https://github.com/kiwiz/gkeepapi instead
+
+    Write operations queued via the `queue_*` methods are applied to the note and sent to
+    Google Keep in a single sync, see `flush_writes`. Successive updates and deletions of the
+    same item are coalesced into a single mutation.
     """
 
     ID_KEY = "id"
@@ -40,6 +49,19 @@ class GKeepTodoSide(GKeepSide):
 
         self._pending_items: Sequence[GKeepTodoItem] = []
 
+        # ID -> item, for all the items of the note, so that operations on a single item don't
+        # have to look it up in the note and wrap it again
+        self._items: dict[ID, GKeepTodoItem] = {}
+
+        # write operations waiting to be applied on the next flush_writes - per item ID, the
+        # changes to apply, or None for deleting it, and the callbacks of all the queued
+        # operations on that item
+        self._queued_additions: list[tuple[GKeepTodoItem, WriteCallback]] = []
+        self._queued_mutations: dict[ID, tuple[dict | None, list[WriteCallback]]] = {}
+        self._num_queued = 0
+        self._num_coalesced = 0
+        self._num_syncs = 0
+
     def start(self):
         super().start()
 
@@ -118,20 +140,34 @@ class GKeepTodoSide(GKeepSide):
             )
             self._note = self._create_list(self._note_title, label=self._notes_label)
 
+    def finish(self):
+        super().finish()
+        logger.debug(
+            format_dict(
+                header="Google Keep writes",
+                items={
+                    "Queued operations": str(self._num_queued),
+                    "Coalesced operations": str(self._num_coalesced),
+                    "Syncs": str(self._num_syncs),
+                },
+            ),
+        )
+
     def get_all_items(self, **kargs) -> Sequence[GKeepTodoItem]:
         del kargs
         """Get all the todo entries of the Note in use."""
-        return tuple(
-            GKeepTodoItem.from_gkeep_list_item(child) for child in self._note.children
-        )
+        self._items = {
+            child.id: GKeepTodoItem.from_gkeep_list_item(child)
+            for child in self._note.children
+        }
+        return tuple(self._items.values())
 
     def get_item(self, item_id: str, use_cached: bool = True) -> GKeepTodoItem | None:
         del use_cached
-        item = self._note.get(item_id)
+        item = self._find_item(item_id)
         if item is None:
             logger.warning(f"Couldn't fetch Google Keep item with id {item_id}.")
-            return None
-        return GKeepTodoItem.from_gkeep_list_item(item)
+        return item
 
     def update_item(self, item_id: ID, **updated_properties):
         if not {"plaintext", "is_checked"}.issubset(updated_properties.keys()):
@@ -148,18 +184,150 @@ class GKeepTodoSide(GKeepSide):
 
     def add_item(self, item: GKeepTodoItem) -> GKeepTodoItem:
         new_item = self._note.add(text=item.plaintext, checked=item.is_checked)
-        return GKeepTodoItem.from_gkeep_list_item(new_item)
+        out = GKeepTodoItem.from_gkeep_list_item(new_item)
+        self._items[out.id] = out
+        return out
 
     def delete_single_item(self, item_id: ID) -> None:
         item = self._get_item_by_id(item_id=item_id)
         item.delete()
+        self._items.pop(item_id, None)
+
+    def queue_add_item(self, item: GKeepTodoItem, callback: WriteCallback) -> None:
+        self._num_queued += 1
+        self._queued_additions.append((item, callback))
+
+    def queue_update_item(self, item_id: ID, callback: WriteCallback, **changes) -> None:
+        self._num_queued += 1
+        queued = self._queued_mutations.get(item_id)
+        if queued is None:
+            self._queued_mutations[item_id] = (changes, [callback])
+            return
+
+        # on top of a pending update, the latest values win - a pending deletion stays as is
+        self._num_coalesced += 1
+        queued_changes, callbacks = queued
+        if queued_changes is not None:
+            queued_changes.update(changes)
+        callbacks.append(callback)
+
+    def queue_delete_single_item(self, item_id: ID, callback: WriteCallback) -> None:
+        self._num_queued += 1
+        queued = self._queued_mutations.get(item_id)
+        if queued is None:
+            self._queued_mutations[item_id] = (None, [callback])
+            return
+
+        # no point in updating an item that's about to be deleted
+        self._num_coalesced += 1
+        self._queued_mutations[item_id] = (None, [*queued[1], callback])
+
+    def flush_writes(self) -> None:
+        """Apply the queued operations to the note and send them with a single sync.
+
+        The callback of each operation is called once the sync has completed, with the newly
+        added item in case of additions, or with the exception that occurred while applying
+        the operation to the note. If the sync itself fails, the operations stay applied to the
+        note and are sent with the sync of `finish()`, so they're still reported as successful.
+        """
+        if not self._queued_additions and not self._queued_mutations:
+            return
+
+        additions, self._queued_additions = self._queued_additions, []
+        mutations, self._queued_mutations = self._queued_mutations, {}
+        logger.debug(
+            f"Applying {len(additions) + len(mutations)} queued operations to"
+            f" {self.fullname}...",
+        )
+
+        results, applied_ids = self._apply_mutations(mutations)
+        addition_results, added_ids = self._apply_additions(additions)
+        results.extend(addition_results)
+
+        try:
+            self._keep.sync()
+        except Exception:  # noqa: BLE001
+            # gkeepapi no longer considers the changes that failed to go through as dirty -
+            # mark them again so that they're sent on finish
+            logger.opt(exception=True).warning(
+                f"Failed to sync the changes to {self.fullname}, retrying when finishing...",
+            )
+            self._note.touch()
+            for item_id in (*applied_ids, *added_ids):
+                list_item = self._note.get(item_id)
+                if list_item is not None:
+                    list_item.touch()
+        else:
+            self._num_syncs += 1
+
+        for callback, item, exc in results:
+            callback(item, exc)
+
+    def _apply_mutations(
+        self,
+        mutations: dict[ID, tuple[dict | None, list[WriteCallback]]],
+    ) -> tuple[list[_WriteResult], list[ID]]:
+        """Apply the given updates/deletions to the note.
+
+        :returns: The outcome of each queued operation and the IDs of the items changed
+        """
+        results: list[_WriteResult] = []
+        applied_ids: list[ID] = []
+        for item_id, (changes, callbacks) in mutations.items():
+            try:
+                if changes is None:
+                    self.delete_single_item(item_id)
+                else:
+                    self.update_item(item_id, **changes)
+            except Exception as err:  # noqa: BLE001
+                results.extend((callback, None, err) for callback in callbacks)
+            else:
+                applied_ids.append(item_id)
+                results.extend((callback, None, None) for callback in callbacks)
+
+        return results, applied_ids
+
+    def _apply_additions(
+        self,
+        additions: list[tuple[GKeepTodoItem, WriteCallback]],
+    ) -> tuple[list[_WriteResult], list[ID]]:
+        """Add the given items to the note.
+
+        :returns: The outcome of each queued operation and the IDs of the items added
+        """
+        results: list[_WriteResult] = []
+        added_ids: list[ID] = []
+        for item, callback in additions:
+            try:
+                new_item = self.add_item(item)
+            except Exception as err:  # noqa: BLE001
+                results.append((callback, None, err))
+            else:
+                added_ids.append(new_item.id)
+                results.append((callback, new_item, None))
+
+        return results, added_ids
+
+    def _find_item(self, item_id: ID) -> GKeepTodoItem | None:
+        """Find the item with the given ID, in the index or, failing that, in the note."""
+        item = self._items.get(item_id)
+        if item is not None:
+            return item
+
+        list_item = self._note.get(item_id)
+        if list_item is None:
+            return None
+
+        item = GKeepTodoItem.from_gkeep_list_item(list_item)
+        self._items[item_id] = item
+        return item
 
     def _get_item_by_id(self, item_id: ID) -> GKeepTodoItem:
-        item = self._note.get(item_id)
+        item = self._find_item(item_id)
         if item is None:
             raise RuntimeError(f"Requested item {item_id} but that item cannot be found")
 
-        return GKeepTodoItem.from_gkeep_list_item(item)
+        return item
 
     @classmethod
     def id_key(cls) -> str:
@@ -183,3 +351,9 @@ class GKeepTodoSide(GKeepSide):
         ignore_keys_ = [cls.last_modification_key()]
         ignore_keys_.extend(ignore_keys)
         return item1.compare(item2, ignore_keys=ignore_keys_)
+
+    @classmethod
+    def fingerprint(cls, item: GKeepTodoItem, ignore_keys: Sequence[str] = []) -> str:
+        ignore_keys_ = [cls.last_modification_key()]
+        ignore_keys_.extend(ignore_keys)
+        return item.fingerprint(ignore_keys=ignore_keys_)
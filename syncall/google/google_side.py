@@ -1,16 +1,48 @@
+from __future__ import annotations
+
+import abc
 import pickle
-from collections.abc import Sequence
-from pathlib import Path
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
 
+import httplib2
 from bubop import logger
+from google.auth.exceptions import GoogleAuthError
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.errors import BatchError
+from googleapiclient.http import HttpError
 
 from syncall.sync_side import SyncSide
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from pathlib import Path
+
+    from googleapiclient.http import HttpRequest
+
+    from syncall.sync_side import WriteCallback
+
+# Errors of a batch request as a whole, as opposed to those of its individual requests, which
+# are reported to the callback of each request
+_BATCH_ERRORS = (HttpError, BatchError, httplib2.HttpLib2Error, GoogleAuthError, OSError)
+
 
 class GoogleSide(SyncSide):
-    """Abstract parent for integrations that consume Google services."""
+    """Abstract parent for integrations that consume Google services.
+
+    Write operations queued via the `queue_*` methods are sent in batches of up to
+    `BATCH_SIZE` requests each, see `flush_writes`.
+
+    Updates are based on the version of the item that was last fetched, instead of fetching
+    the item again right before updating it. The update only goes through if the item hasn't
+    been modified in the meantime (ETag / If-Match) - otherwise the item is fetched and the
+    update is retried.
+    """
+
+    # Maximum number of requests in a single batch request - 50 is the limit for Google
+    # Calendar, the other APIs allow more
+    BATCH_SIZE = 50
 
     def __init__(
         self,
@@ -28,7 +60,13 @@ class GoogleSide(SyncSide):
         self._credentials_cache = credentials_cache
 
         # If you modify this, delete your previously saved credentials
-        self._service = None
+        self._service: Any = None
+
+        # Last fetched version of each item
+        self._items_cache: dict[str, dict] = {}
+
+        # write requests waiting to be sent in a batch, see flush_writes
+        self._queued_requests: list[tuple[HttpRequest, WriteCallback]] = []
 
     def _get_credentials(self):
         """Get valid user credentials from storage.
@@ -68,3 +106,114 @@ class GoogleSide(SyncSide):
             logger.info("Using already cached credentials...")
 
         return creds
+
+    def update_item(self, item_id, **changes):
+        try:
+            item = self._update_request(item_id, **changes).execute()
+        except HttpError as err:
+            if not _is_precondition_failed(err):
+                raise
+
+            logger.debug(
+                f"{self.fullname} item modified in the meantime, retrying -> {item_id}",
+            )
+            item = self._update_request(item_id, refresh=True, **changes).execute()
+
+        self._items_cache[item_id] = item
+
+    def queue_update_item(self, item_id, callback: WriteCallback, **changes) -> None:
+        def on_updated(item: Any, exc: Exception | None):  # noqa: ANN401
+            if _is_precondition_failed(exc):
+                logger.debug(
+                    f"{self.fullname} item modified in the meantime, retrying -> {item_id}",
+                )
+                try:
+                    item = self._update_request(item_id, refresh=True, **changes).execute()
+                except HttpError as err:
+                    callback(None, err)
+                    return
+
+                exc = None
+
+            if item is not None:
+                self._items_cache[item_id] = item
+            callback(item, exc)
+
+        self._queue_request(self._update_request(item_id, **changes), on_updated)
+
+    @abc.abstractmethod
+    def _update_request(self, item_id, *, refresh: bool = False, **changes) -> HttpRequest:
+        """Create the request for updating the given item with the given changes.
+
+        :param refresh: Fetch the latest version of the item instead of using the cached one
+        """
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @staticmethod
+    def _if_match(request: HttpRequest, item: dict) -> HttpRequest:
+        """Only let the request go through if the item hasn't been modified since fetched."""
+        if "etag" in item:
+            request.headers["If-Match"] = item["etag"]
+
+        return request
+
+    def _queue_request(self, request: HttpRequest, callback: WriteCallback) -> None:
+        """Queue a write request, to be executed on the next `flush_writes()`."""
+        self._queued_requests.append((request, callback))
+
+    def flush_writes(self) -> None:
+        """Execute all the queued write requests, `BATCH_SIZE` requests at a time.
+
+        The callback of each request is called with the response, or with the exception that
+        occurred, as soon as the batch that contains it has been executed.
+        """
+        if not self._queued_requests:
+            return
+
+        queued, self._queued_requests = self._queued_requests, []
+        logger.debug(f"Sending {len(queued)} queued requests to {self.fullname}...")
+        for i in range(0, len(queued), self.BATCH_SIZE):
+            self._execute_batch(queued[i : i + self.BATCH_SIZE])
+
+    def _execute_batch(self, queued: list[tuple[HttpRequest, WriteCallback]]) -> None:
+        """Execute the given write requests with a single batch request.
+
+        If the batch request as a whole fails (e.g., connection or authentication error), the
+        callbacks of the requests that didn't get a response are called with that exception.
+
+        An exception raised by one of the callbacks doesn't affect the rest of the requests,
+        which may have been applied already - it's raised once all the responses are handled.
+        """
+        # request ID -> callback, for the requests that haven't got a response yet
+        pending = {
+            str(request_id): callback for request_id, (_, callback) in enumerate(queued)
+        }
+        callback_error: Exception | None = None
+
+        def on_response(request_id: str, response: Any, exception: Exception | None) -> None:  # noqa: ANN401
+            nonlocal callback_error
+            try:
+                pending.pop(request_id)(response or None, exception)
+            except Exception as err:  # noqa: BLE001
+                callback_error = callback_error or err
+
+        batch = self._service.new_batch_http_request()
+        for request_id, (request, _) in enumerate(queued):
+            batch.add(request, callback=on_response, request_id=str(request_id))
+
+        try:
+            batch.execute()
+        except _BATCH_ERRORS as err:
+            logger.error(
+                f"Failed to send a batch of {len(queued)} requests to {self.fullname}"
+            )
+            for callback in list(pending.values()):
+                callback(None, err)
+
+        if callback_error is not None:
+            raise callback_error
+
+
+def _is_precondition_failed(exc: Exception | None) -> bool:
+    return isinstance(exc, HttpError) and exc.resp.status == HTTPStatus.PRECONDITION_FAILED
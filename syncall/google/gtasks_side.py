@@ -17,12 +17,18 @@ from .common import parse_google_datetime
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+    from googleapiclient.http import HttpRequest
+
+    from syncall.sync_side import WriteCallback
     from syncall.types import GTasksItem, GTasksList
 
 DEFAULT_CLIENT_SECRET = str(
     importlib.resources.files("syncall") / "res/gtasks_client_secret.json"
 )
 
+# Key under which the state of the incremental fetching is persisted in the side's cache
+_INCREMENTAL_STATE_KEY = "incremental_state"
+
 # API Reference: https://googleapis.github.io/google-api-python-client/docs/dyn/tasks_v1.html
 
 # NOTE(kisseliov): type hints supplied by google client library are
@@ -53,8 +59,16 @@ class GTasksSide(GoogleSide):
         *,
         task_list_title="TaskWarrior Reminders",
         client_secret: str | None,
+        incremental: bool = False,
         **kargs,
     ):
+        """Init.
+
+        :param incremental: Only fetch the tasks updated since the most recent update seen in
+                            the previous run and merge them with the snapshot of the tasks
+                            persisted in the side's cache. Deleted tasks are also fetched so
+                            that they can be removed from the snapshot.
+        """
         if client_secret is None:
             client_secret = DEFAULT_CLIENT_SECRET
 
@@ -69,7 +83,7 @@ class GTasksSide(GoogleSide):
 
         self._task_list_title = task_list_title
         self._task_list_id: str | None = None
-        self._items_cache: dict[str, dict] = {}
+        self._incremental = incremental
 
     def start(self):
         logger.debug("Connecting to Google Tasks...")
@@ -125,27 +139,86 @@ class GTasksSide(GoogleSide):
         """
         del kargs
 
-        # Get the ID of the task list of interest
-        tasks = []
+        if self._task_list_id is None:
+            raise RuntimeError("You have to provide valid task list ID")
 
-        if self._task_list_id is not None:
-            request = self._service.tasks().list(
-                tasklist=self._task_list_id,
-                # TL;DR Set showCompleted=True AND showHidden=True if you want to also get the
-                # items that the user has ticked from the app.
-                #
-                # From the ref: https://developers.google.com/tasks/reference/rest/v1/tasks/list
-                #
-                # Flag indicating whether completed tasks are returned in the result. Optional.
-                # The default is True. Note that showHidden must also be True to show tasks
-                # completed in first party clients, such as the web UI and Google's mobile
-                # apps.
-                showCompleted=True,
-                showDeleted=False,
-                showHidden=True,
-            )  # type: ignore
+        state = self._incremental_state()
+        if state is None:
+            tasks = self._list_tasks(showDeleted=False)
+            self._items_cache = {t["id"]: t for t in tasks if self._is_valid_task(t)}
         else:
-            raise RuntimeError("You have to provide valid task list ID")
+            # the lower bound is inclusive - the most recently updated tasks of the previous
+            # run are fetched again but that's harmless
+            tasks = self._list_tasks(showDeleted=True, updatedMin=state["updated_min"])
+            self._items_cache = state["items"]
+            for t in tasks:
+                if self._is_valid_task(t):
+                    self._items_cache[t["id"]] = t
+                else:
+                    self._items_cache.pop(t["id"], None)
+            logger.debug(
+                f"Merged {len(tasks)} updated tasks, {len(self._items_cache)} tasks in total",
+            )
+
+        if self._incremental and self._cache is not None:
+            # use the timestamps of the server rather than the local clock, so that clock
+            # differences don't cause updates to be missed
+            updated = [t["updated"] for t in tasks if "updated" in t]
+            updated_min = max(
+                updated,
+                key=parse_google_datetime,
+                default=state["updated_min"] if state is not None else None,
+            )
+            if updated_min is not None:
+                self._cache.dump(
+                    _INCREMENTAL_STATE_KEY,
+                    {
+                        "task_list_id": self._task_list_id,
+                        "updated_min": updated_min,
+                        "items": self._items_cache,
+                    },
+                )
+
+        return list(self._items_cache.values())
+
+    def _incremental_state(self) -> dict | None:
+        """Get the persisted state of the previous run, if it's usable for this task list."""
+        if not self._incremental or self._cache is None:
+            return None
+
+        try:
+            state = self._cache.load(_INCREMENTAL_STATE_KEY)
+        except KeyError:
+            logger.info("No snapshot of tasks from a previous run, fetching all tasks...")
+            return None
+
+        if state["task_list_id"] != self._task_list_id:
+            logger.info("Task list has changed since the previous run, fetching all tasks...")
+            return None
+
+        return state
+
+    def _list_tasks(self, **kargs) -> list[GTasksItem]:
+        """List the tasks of the task list, going through all the result pages.
+
+        :param kargs: Extra parameters for the `tasks().list` call, e.g., `updatedMin`
+        """
+        tasks = []
+        request = self._service.tasks().list(
+            tasklist=self._task_list_id,
+            # TL;DR Set showCompleted=True AND showHidden=True if you want to also get the
+            # items that the user has ticked from the app.
+            #
+            # From the ref: https://developers.google.com/tasks/reference/rest/v1/tasks/list
+            #
+            # Flag indicating whether completed tasks are returned in the result. Optional.
+            # The default is True. Note that showHidden must also be True to show tasks
+            # completed in first party clients, such as the web UI and Google's mobile
+            # apps.
+            showCompleted=True,
+            showHidden=True,
+            **kargs,
+        )  # type: ignore
 
         # Loop until all pages have been processed.
         while request is not None:
@@ -154,24 +227,23 @@ class GTasksSide(GoogleSide):
 
             # Accessing the response like a dict object with an 'items' key
             # returns a list of item objects (tasks).
-            tasks.extend(
-                [
-                    t
-                    for t in response.get("items", [])
-                    if t["status"] != "deleted" and len(t["title"]) > 0
-                ],
-            )
+            tasks.extend(response.get("items", []))
 
             # Get the next request object by passing the previous request
             # object to the list_next method.
             request = self._service.tasks().list_next(request, response)  # type: ignore
 
-        # cache them
-        for t in tasks:
-            self._items_cache[t["id"]] = t
-
         return tasks
 
+    @staticmethod
+    def _is_valid_task(task: GTasksItem) -> bool:
+        """Whether the task should be synchronized - i.e., it's not deleted and has a title."""
+        return (
+            not task.get("deleted", False)
+            and task["status"] != "deleted"
+            and len(task.get("title", "")) > 0
+        )
+
     def get_item(self, item_id: str, use_cached: bool = True) -> dict | None:
         item = self._items_cache.get(item_id)
         if not use_cached or item is None:
@@ -195,24 +267,42 @@ class GTasksSide(GoogleSide):
 
         return ret
 
-    def update_item(self, item_id, **changes):
-        # Check if item is there
-        task = self._service.tasks().get(tasklist=self._task_list_id, task=item_id).execute()  # type: ignore
-        task.update(changes)
-        self._service.tasks().update(  # type: ignore
+    def _update_request(self, item_id, *, refresh: bool = False, **changes) -> HttpRequest:
+        task = None if refresh else self._items_cache.get(item_id)
+        if task is None:
+            task = (
+                self._service.tasks()  # type: ignore
+                .get(tasklist=self._task_list_id, task=item_id)
+                .execute()
+            )
+
+        request = self._service.tasks().update(  # type: ignore
             tasklist=self._task_list_id,
-            task=task["id"],
-            body=task,
-        ).execute()
+            task=item_id,
+            body={**task, **changes},
+        )
+        return self._if_match(request, task)
 
     def add_item(self, item) -> dict:
-        task = self._service.tasks().insert(tasklist=self._task_list_id, body=item).execute()  # type: ignore
+        task = self._add_request(item).execute()
         logger.debug(f"Task created -> {task.get('selfLink')}")
 
         return task
 
+    def queue_add_item(self, item, callback: WriteCallback) -> None:
+        self._queue_request(self._add_request(item), callback)
+
+    def _add_request(self, item) -> HttpRequest:
+        return self._service.tasks().insert(tasklist=self._task_list_id, body=item)  # type: ignore
+
     def delete_single_item(self, item_id) -> None:
-        self._service.tasks().delete(tasklist=self._task_list_id, task=item_id).execute()  # type: ignore
+        self._delete_request(item_id).execute()
+
+    def queue_delete_single_item(self, item_id, callback: WriteCallback) -> None:
+        self._queue_request(self._delete_request(item_id), callback)
+
+    def _delete_request(self, item_id) -> HttpRequest:
+        return self._service.tasks().delete(tasklist=self._task_list_id, task=item_id)  # type: ignore
 
     @classmethod
     def id_key(cls) -> str:
@@ -248,6 +338,8 @@ class GTasksSide(GoogleSide):
 
     @classmethod
     def items_are_identical(cls, item1, item2, ignore_keys: Sequence[str] = []) -> bool:
+        # don't modify the given items, they may be used as the basis for updates
+        item1, item2 = dict(item1), dict(item2)
         for item in [item1, item2]:
             for key in cls._date_keys:
                 if key not in item:
@@ -260,3 +352,17 @@ class GTasksSide(GoogleSide):
             item2,
             keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
         )
+
+    @classmethod
+    def fingerprint(cls, item, ignore_keys: Sequence[str] = []) -> str:
+        item = dict(item)
+        for key in cls._date_keys:
+            if key not in item:
+                continue
+
+            item[key] = parse_google_datetime(item[key])
+
+        return SyncSide._fingerprint(
+            item,
+            keys=[k for k in cls._identical_comparison_keys if k not in ignore_keys],
+        )
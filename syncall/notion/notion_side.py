@@ -1,32 +1,67 @@
 from __future__ import annotations
 
+import datetime as dt
+from contextlib import suppress
 from typing import TYPE_CHECKING, cast
 
-from bubop import logger
+import httpx
+from bubop import format_dict, logger
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Iterator, Sequence
 
     from notion_client import Client
 
+    from syncall.sync_side import WriteCallback
     from syncall.types import NotionID, NotionPageContents, NotionTodoBlockItem
 
 from syncall.notion.notion_todo_block import NotionTodoBlock
+from syncall.notion.utils import RateLimitedTransport
+from syncall.rate_limiter import RateLimiter
 from syncall.sync_side import SyncSide
 
+# Maximum number of blocks that Notion returns per request
+CHILDREN_PAGE_SIZE = 100
+# Maximum number of blocks that Notion accepts per append request
+APPEND_BATCH_SIZE = 100
+
+# Notion allows an average of 3 requests per second, with some bursts beyond that
+REQUESTS_PER_SECOND = 3.0
+
+# Key under which the parsed todo blocks are persisted in the side's cache
+_PARSED_BLOCKS_KEY = "parsed_blocks"
+# Notion rounds last_edited_time down to the minute, so a block fetched within a minute of its
+# last edit may be edited again without its timestamp moving. Margin for clock skew included.
+_LAST_EDITED_TIME_UNCERTAINTY = dt.timedelta(minutes=2)
+
+# Blocks whose children belong to other pages / databases - never recurse into these
+_CHILD_PAGE_BLOCK_TYPES = frozenset({"child_page", "child_database"})
+
 
 class NotionSide(SyncSide):
     """Wrapper class to add/modify/delete todo blocks from notion, create new pages, etc."""
 
     _date_keys = "last_modified_date"
+    concurrent_writes_safe = True
+
+    def __init__(self, client: Client, page_id: NotionID, nested_todos: bool = False):
+        """Init.
 
-    def __init__(self, client: Client, page_id: NotionID):
+        :param nested_todos: Also synchronize the todo blocks nested in other blocks of the
+                             page, e.g., in toggles or columns, not just its top-level ones
+        """
         self._client = client
         self._page_id = page_id
-        self._page_contents: NotionPageContents
-        self._all_todo_blocks: dict[NotionID, NotionTodoBlock]
+        self._nested_todos = nested_todos
+        self._all_todo_blocks: dict[NotionID, NotionTodoBlock] = {}
         self._is_cached = False
 
+        # block ID -> (last_edited_time, when it was fetched, parsed block), so that blocks
+        # that haven't been edited since a previous run aren't parsed again
+        self._parsed: dict[NotionID, tuple[str, dt.datetime, NotionTodoBlock]] = {}
+        self._queued_additions: list[tuple[NotionTodoBlock, WriteCallback]] = []
+        self._rate_limiter = RateLimiter(rate=REQUESTS_PER_SECOND)
+
         super().__init__(name="Notion", fullname="Notion")
 
     @classmethod
@@ -43,14 +78,76 @@ class NotionSide(SyncSide):
 
     def start(self):
         logger.info(f"Initializing {self.fullname}...")
-        self._page_contents = self._client.blocks.children.list(block_id=self._page_id)
 
-    def _get_todo_blocks(self) -> dict[NotionID, NotionTodoBlock]:
-        all_todos = self.find_todos(page_contents=self._page_contents)
-        # make sure that all IDs are valid and not None
-        assert all(todo.id is not None for todo in all_todos)
+        # all the requests to Notion, from any thread, go through the rate limiter
+        self._client.client.close()
+        self._client.client = httpx.Client(transport=RateLimitedTransport(self._rate_limiter))
+
+    def finish(self):
+        logger.debug(
+            format_dict(header="Notion rate limiting", items=self._rate_limiter.metrics()),
+        )
+
+    def iter_blocks(self, block_id: NotionID, recursive: bool = False) -> Iterator[dict]:
+        """Iterate over the children blocks of the given block, as their pages arrive.
+
+        :param recursive: Also yield the children of the children blocks, depth first, except
+                          for the contents of child pages and databases
+        """
+        kargs = {"block_id": block_id, "page_size": CHILDREN_PAGE_SIZE}
+        while True:
+            page_contents: NotionPageContents = self._client.blocks.children.list(**kargs)
+            for block in page_contents["results"]:
+                yield block
+                if (
+                    recursive
+                    and block.get("has_children")
+                    and block["type"] not in _CHILD_PAGE_BLOCK_TYPES
+                ):
+                    yield from self.iter_blocks(block["id"], recursive=True)
+
+            if not page_contents.get("has_more"):
+                return
+
+            kargs["start_cursor"] = page_contents["next_cursor"]
 
-        return {cast("NotionID", todo.id): todo for todo in all_todos}
+    def _get_todo_blocks(self) -> dict[NotionID, NotionTodoBlock]:
+        if self._cache is not None:
+            with suppress(KeyError):
+                self._parsed = self._cache.load(_PARSED_BLOCKS_KEY)
+
+        todo_blocks = {}
+        for block in self.iter_blocks(self._page_id, recursive=self._nested_todos):
+            if not NotionTodoBlock.is_todo(block):
+                continue
+
+            todo = self._parse_todo_block(cast("NotionTodoBlockItem", block))
+            # make sure that all IDs are valid and not None
+            assert todo.id is not None
+            todo_blocks[todo.id] = todo
+
+        self._parsed = {id_: self._parsed[id_] for id_ in todo_blocks}
+        if self._cache is not None:
+            self._cache.dump(_PARSED_BLOCKS_KEY, self._parsed)
+
+        return todo_blocks
+
+    def _parse_todo_block(self, block: NotionTodoBlockItem) -> NotionTodoBlock:
+        """Parse the given todo block, unless it hasn't been edited since it was last parsed."""
+        now = dt.datetime.now(dt.UTC)
+        last_edited_time = block["last_edited_time"]
+        parsed = self._parsed.get(block["id"])
+        if (
+            parsed is not None
+            and parsed[0] == last_edited_time
+            and parsed[1]
+            >= dt.datetime.fromisoformat(last_edited_time) + _LAST_EDITED_TIME_UNCERTAINTY
+        ):
+            return parsed[2]
+
+        todo = NotionTodoBlock.from_raw_item(block)
+        self._parsed[block["id"]] = (last_edited_time, now, todo)
+        return todo
 
     def get_all_items(self, **kargs) -> Sequence[NotionTodoBlock]:
         del kargs
@@ -71,7 +168,7 @@ class NotionSide(SyncSide):
         # have to fetch and cache it again
         new_todo_block_item: NotionTodoBlockItem = self._client.blocks.retrieve(item_id)
         try:
-            new_todo_block = NotionTodoBlock.from_raw_item(new_todo_block_item)
+            new_todo_block = self._parse_todo_block(new_todo_block_item)
         except RuntimeError as err:
             # the to_do section is missing when the item is archived?!
             raise KeyError from err
@@ -104,18 +201,55 @@ class NotionSide(SyncSide):
 
     def add_item(self, item: NotionTodoBlock) -> NotionTodoBlock:
         """Add a new item (block) to the page."""
+        return self._append_todo_blocks([item])[0]
+
+    def queue_add_item(self, item: NotionTodoBlock, callback: WriteCallback) -> None:
+        """Queue a new item (block), to be appended to the page on the next `flush_writes()`."""
+        self._queued_additions.append((item, callback))
+
+    def flush_writes(self) -> None:
+        """Append the queued items to the page, `APPEND_BATCH_SIZE` blocks per request.
+
+        The callback of each item is called with the newly added block, or with the exception
+        that occurred, as soon as the request that contains it has been executed.
+        """
+        if not self._queued_additions:
+            return
+
+        queued, self._queued_additions = self._queued_additions, []
+        logger.debug(f"Appending {len(queued)} queued todo blocks to {self.fullname}...")
+        for i in range(0, len(queued), APPEND_BATCH_SIZE):
+            batch = queued[i : i + APPEND_BATCH_SIZE]
+            try:
+                todo_blocks = self._append_todo_blocks([item for item, _ in batch])
+            except Exception as err:  # noqa: BLE001
+                for _, callback in batch:
+                    callback(None, err)
+                continue
+
+            for (_, callback), todo_block in zip(batch, todo_blocks, strict=True):
+                callback(todo_block, None)
+
+    def _append_todo_blocks(
+        self, items: Sequence[NotionTodoBlock]
+    ) -> Sequence[NotionTodoBlock]:
+        """Append the given items at the end of the page with a single request.
+
+        :returns: The newly added blocks, in the same order as the given items
+        """
         page_contents: NotionPageContents = self._client.blocks.children.append(
             block_id=self._page_id,
-            children=[item.serialize()],
+            children=[item.serialize() for item in items],
         )
         todo_blocks = self.find_todos(page_contents=page_contents)
-        if len(todo_blocks) != 1:
-            logger.warning(
-                "Expected to get back 1 TODO item, blocks.children.append(...) returned"
-                f" {len(todo_blocks)} items. Adding only the first",
+        if len(todo_blocks) != len(items):
+            msg = (
+                f"Expected to get back {len(items)} TODO items, blocks.children.append(...)"
+                f" returned {len(todo_blocks)} items"
             )
+            raise RuntimeError(msg)
 
-        return todo_blocks[0]
+        return todo_blocks
 
     def add_todo_block(self, title: str, checked: bool = False) -> NotionTodoBlock:
         """Create a new TODO block with the given title."""
@@ -144,6 +278,12 @@ class NotionSide(SyncSide):
         ignore_keys_.extend(ignore_keys)
         return item1.compare(item2, ignore_keys=ignore_keys_)
 
+    @classmethod
+    def fingerprint(cls, item: NotionTodoBlock, ignore_keys: Sequence[str] = []) -> str:
+        ignore_keys_ = [cls.last_modification_key()]
+        ignore_keys_.extend(ignore_keys)
+        return item.fingerprint(ignore_keys=ignore_keys_)
+
     @staticmethod
     def find_todos(page_contents: NotionPageContents) -> Sequence[NotionTodoBlock]:
         assert page_contents["object"] == "list"
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import random
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import httpx
+from bubop import logger
+
+from syncall.rate_limiter import parse_retry_after
+
+if TYPE_CHECKING:
+    from syncall.rate_limiter import RateLimiter
+
+# Responses worth retrying - the rest of the errors won't go away by themselves. A 429 means
+# that the request wasn't processed, so any request can be retried. A 502 or a 503 may come
+# after the request was applied, so only the requests that can be repeated safely are retried.
+RETRY_STATUSES = frozenset({HTTPStatus.TOO_MANY_REQUESTS})
+IDEMPOTENT_RETRY_STATUSES = frozenset({HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE})
+IDEMPOTENT_METHODS = frozenset({"GET", "PATCH", "DELETE"})
+# Initial backoff, in seconds, when the response doesn't have a valid Retry-After header. It
+# doubles on every subsequent retry of the same request.
+RETRY_BACKOFF = 0.5
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """HTTP transport sending all the requests of a client through a RateLimiter.
+
+    On 429 responses, and on 502 and 503 responses to idempotent requests, pauses all the
+    requests going through the limiter, for as long as the `Retry-After` header asks or with a
+    jittered exponential backoff, and then retries the request.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        transport: httpx.BaseTransport | None = None,
+        max_retries: int = 5,
+    ) -> None:
+        self._rate_limiter = rate_limiter
+        self._transport = transport if transport is not None else httpx.HTTPTransport()
+        self._max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        retries = 0
+        while True:
+            with self._rate_limiter.request():
+                response = self._transport.handle_request(request)
+
+            if not self._should_retry(request, response) or retries == self._max_retries:
+                return response
+
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = random.uniform(0, RETRY_BACKOFF * 2**retries)  # noqa: S311
+
+            logger.debug(
+                f"Notion responded with {response.status_code}, retrying in {delay:.2f}s...",
+            )
+            self._rate_limiter.pause(delay)
+            response.close()
+            retries += 1
+
+    @staticmethod
+    def _should_retry(request: httpx.Request, response: httpx.Response) -> bool:
+        if response.status_code in RETRY_STATUSES:
+            return True
+
+        return (
+            response.status_code in IDEMPOTENT_RETRY_STATUSES
+            and request.method in IDEMPOTENT_METHODS
+        )
+
+    def close(self) -> None:
+        self._transport.close()
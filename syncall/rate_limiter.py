@@ -0,0 +1,149 @@
+"""Client-side rate limiting of the requests to a service."""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class RateLimiter:
+    """Token bucket limiting the rate and the number of in-flight requests to a service.
+
+    Safe to share between threads - all the requests made to the same service, from any
+    thread, should go through the same limiter. On top of the configured rate, the service
+    can ask for all requests to be paused for a while, e.g., via the `Retry-After` header of a
+    429 response, see `pause()`.
+
+    Keeps track of how many requests had to wait and for how long, see `metrics()`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int | None = None,
+        max_in_flight: int | None = None,
+    ) -> None:
+        """Init.
+
+        :param rate: Requests per second allowed on average
+        :param burst: Requests allowed to go through at once after a period of inactivity,
+                      defaults to one second worth of requests
+        :param max_in_flight: Maximum number of concurrent requests, unbounded by default
+        """
+        self._rate = rate
+        self._burst = burst if burst is not None else max(1, int(rate))
+        self._in_flight = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight is not None else None
+        )
+
+        self._lock = threading.Lock()
+        self._tokens = float(self._burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+        # metrics
+        self._num_requests = 0
+        self._num_delayed = 0
+        self._num_pauses = 0
+        self._delay = 0.0
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Wait until a request can be made and keep an in-flight slot for its duration."""
+        start = time.monotonic()
+        if self._in_flight is not None:
+            self._in_flight.acquire()
+
+        try:
+            self._take_token()
+            delay = time.monotonic() - start
+            with self._lock:
+                self._num_requests += 1
+                if delay > 0.001:  # noqa: PLR2004
+                    self._num_delayed += 1
+                    self._delay += delay
+
+            yield
+        finally:
+            if self._in_flight is not None:
+                self._in_flight.release()
+
+    def pause(self, seconds: float) -> None:
+        """Don't let any requests through for the given number of seconds.
+
+        Requests resume at the configured rate afterwards, without an initial burst.
+        """
+        with self._lock:
+            self._num_pauses += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def metrics(self) -> dict[str, str]:
+        """Report how much the requests were held back."""
+        with self._lock:
+            return {
+                "Requests": str(self._num_requests),
+                "Delayed requests": str(self._num_delayed),
+                "Pauses requested by the service": str(self._num_pauses),
+                "Total delay": f"{self._delay:.3f}s",
+            }
+
+    def _take_token(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # no tokens accumulate while paused
+                elapsed = max(0.0, now - max(self._last_refill, self._paused_until))
+                self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+                self._last_refill = now
+
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse the value of a `Retry-After` header - either a number of seconds or an HTTP-date.
+
+    >>> parse_retry_after("1.5")
+    1.5
+    >>> parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT")
+    0.0
+    >>> parse_retry_after("soon") is None
+    True
+
+    .. returns:: The seconds to wait, None if the value is missing or invalid
+    """
+    if value is None:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=dt.UTC)
+        seconds = (date - dt.datetime.now(dt.UTC)).total_seconds()
+
+    if not math.isfinite(seconds):
+        return None
+
+    return max(0.0, seconds)
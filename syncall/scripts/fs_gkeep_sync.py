@@ -55,6 +55,9 @@ def main(
     gkeep_passwd_pass_path: str,
     gkeep_token_pass_path: str,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -81,6 +84,8 @@ def main(
 
     # cli validation --------------------------------------------------------------------------
     check_optional_mutually_exclusive(gkeep_labels, gkeep_ignore_labels)
+    if incremental:
+        logger.warning("None of the sides supports incremental fetching, ignoring it")
     check_optional_mutually_exclusive(combination_name, custom_combination_savename)
     combination_of_filesystem_root_and_gkeep_labels_and_gkeep_ignore_labels = any(
         [
@@ -216,6 +221,8 @@ def main(
             side_B_type=type(filesystem_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             (),
             (),
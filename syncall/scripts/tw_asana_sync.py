@@ -46,6 +46,7 @@ def main(  # noqa: PLR0915, C901, PLR0912
     asana_workspace_gid: str,
     asana_workspace_name: str,
     do_list_asana_workspaces: bool,
+    asana_max_in_flight: int,
     tw_filter: str,
     tw_tags: list[str],
     tw_project: str,
@@ -53,6 +54,9 @@ def main(  # noqa: PLR0915, C901, PLR0912
     tw_sync_all_tasks: bool,
     prefer_scheduled_date: bool,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -203,12 +207,15 @@ def main(  # noqa: PLR0915, C901, PLR0912
         tw_filter=" ".join(tw_filter_li),
         tags=tw_tags,
         project=tw_project,
+        incremental=incremental,
     )
 
     asana_side = AsanaSide(
         client=asana_client,
         task_gid=asana_task_gid,
         workspace_gid=asana_workspace_gid,
+        incremental=incremental,
+        max_in_flight=asana_max_in_flight,
     )
 
     # teardown function and exception handling ------------------------------------------------
@@ -231,6 +238,8 @@ def main(  # noqa: PLR0915, C901, PLR0912
             side_B_type=type(tw_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             (
                 "completed_at",
@@ -57,6 +57,9 @@ def main(  # noqa: PLR0915
     tw_sync_all_tasks: bool,
     prefer_scheduled_date: bool,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -171,6 +174,7 @@ def main(  # noqa: PLR0915
         tags=tw_tags,
         project=tw_project,
         config_overrides=tw_config_overrides,
+        incremental=incremental,
     )
 
     # caldav
@@ -209,7 +213,11 @@ def main(  # noqa: PLR0915
         caldav_passwd = fetch_from_pass_manager(caldav_passwd_pass_path)
 
     client = caldav.DAVClient(url=caldav_url, username=caldav_user, password=caldav_passwd)
-    caldav_side = CaldavSide(client=client, calendar_name=caldav_calendar)
+    caldav_side = CaldavSide(
+        client=client,
+        calendar_name=caldav_calendar,
+        incremental=incremental,
+    )
 
     # teardown function and exception handling ------------------------------------------------
     register_teardown_handler(
@@ -231,6 +239,8 @@ def main(  # noqa: PLR0915
             side_B_type=type(tw_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             (),
             (),
@@ -50,6 +50,9 @@ def main(
     tw_sync_all_tasks: bool,
     prefer_scheduled_date: bool,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -184,6 +187,7 @@ def main(
         tw_filter=" ".join(tw_filter_li),
         tags=tw_tags,
         project=tw_project,
+        incremental=incremental,
     )
 
     # teardown function and exception handling ------------------------------------------------
@@ -206,6 +210,8 @@ def main(
             side_B_type=type(tw_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             (),
             ("due", "end", "entry", "modified", "urgency"),
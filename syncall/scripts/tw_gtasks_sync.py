@@ -53,6 +53,9 @@ def main(
     tw_sync_all_tasks: bool,
     prefer_scheduled_date: bool,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -167,12 +170,14 @@ def main(
         tw_filter=" ".join(tw_filter_li),
         tags=tw_tags,
         project=tw_project,
+        incremental=incremental,
     )
 
     gtasks_side = GTasksSide(
         task_list_title=gtasks_list,
         oauth_port=oauth_port,
         client_secret=google_secret,
+        incremental=incremental,
     )
 
     # teardown function and exception handling ------------------------------------------------
@@ -213,6 +218,8 @@ def main(
             side_B_type=type(tw_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             (),
             (),
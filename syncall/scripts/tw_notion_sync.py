@@ -37,6 +37,7 @@ from syncall.app_utils import (
     register_teardown_handler,
 )
 from syncall.cli import (
+    opt_notion_nested_todos,
     opt_notion_page_id,
     opt_notion_token_pass_path,
     opts_miscellaneous,
@@ -48,11 +49,13 @@ from syncall.tw_notion_utils import convert_notion_to_tw, convert_tw_to_notion
 # CLI parsing ---------------------------------------------------------------------------------
 @click.command()
 @opt_notion_page_id()
+@opt_notion_nested_todos()
 @opt_notion_token_pass_path()
 @opts_tw_filtering()
 @opts_miscellaneous("TW", "Notion")
 def main(
     notion_page_id: str,
+    notion_nested_todos: bool,
     token_pass_path: str,
     tw_filter: str,
     tw_tags: list[str],
@@ -61,6 +64,9 @@ def main(
     tw_sync_all_tasks: bool,
     prefer_scheduled_date: bool,
     resolution_strategy: str,
+    serdes_backend: str,
+    incremental: bool,
+    write_workers: int,
     verbose: int,
     combination_name: str,
     custom_combination_savename: str,
@@ -196,6 +202,7 @@ def main(
         tw_filter=" ".join(tw_filter_li),
         tags=tw_tags,
         project=tw_project,
+        incremental=incremental,
     )
 
     # notion
@@ -205,7 +212,11 @@ def main(
         auth=token_v2,
         log_level=verbosity_int_to_std_logging_lvl(client_verbosity),
     )
-    notion_side = NotionSide(client=client, page_id=notion_page_id)
+    notion_side = NotionSide(
+        client=client,
+        page_id=notion_page_id,
+        nested_todos=notion_nested_todos,
+    )
 
     # sync ------------------------------------------------------------------------------------
     with Aggregator(
@@ -219,6 +230,8 @@ def main(
             side_B_type=type(tw_side),
         ),
         config_fname=combination_name,
+        serdes_backend=serdes_backend,
+        write_workers=(write_workers, write_workers),
         ignore_keys=(
             ("last_modified_date",),
             ("due", "end", "entry", "modified", "urgency"),
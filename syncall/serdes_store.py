@@ -0,0 +1,357 @@
+"""Persistent stores for the cached (serialized) versions of the synchronized items.
+
+The Aggregator keeps the last synchronized version of every item of each side so that, on the
+next run, it can figure out which of these items have been modified. Historically this was a
+directory with one pickle file per item. For sides with many items that means one
+open/read/close per item on every run, therefore the storage is abstracted behind the
+`SerdesStore` interface and the backend can be selected per Aggregator.
+"""
+
+from __future__ import annotations
+
+import abc
+import atexit
+import pickle
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Self
+
+from bubop import logger, pickle_dump, pickle_load
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from pathlib import Path
+
+    from item_synchronizer.types import ID
+
+
+class SerdesStore(abc.ABC):
+    """Persistent mapping of item IDs to the cached version of the corresponding item."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __contains__(self, item_id: ID) -> bool:
+        try:
+            self.load(item_id)
+        except KeyError:
+            return False
+
+        return True
+
+    @property
+    def path(self) -> Path:
+        """Location of the store on disk."""
+        return self._path
+
+    @classmethod
+    @abc.abstractmethod
+    def path_for(cls, serdes_root: Path, side_name: str) -> Path:
+        """Location of the store of the given side under the top-level serdes directory."""
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def load(self, item_id: ID) -> Any:  # noqa: ANN401
+        """Load the cached version of the item with the given ID.
+
+        .. raises:: KeyError if there's no cached version of the item.
+        """
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def dump(
+        self,
+        item_id: ID,
+        item: Any,  # noqa: ANN401
+        fingerprint: str | None = None,
+    ) -> None:
+        """Cache the given item, overwriting any previous version of it.
+
+        :param fingerprint: Fingerprint of the item, see SyncSide.fingerprint. Any previously
+                            stored fingerprint is discarded if this is not provided.
+        """
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def fingerprints(self) -> Mapping[ID, str]:
+        """Get the stored fingerprints of all the cached items that have one."""
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def set_fingerprint(self, item_id: ID, fingerprint: str) -> None:
+        """Store the fingerprint of an already cached item."""
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def remove(self, item_id: ID) -> None:
+        """Remove the cached version of the item with the given ID.
+
+        .. raises:: KeyError if there's no cached version of the item.
+        """
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    @abc.abstractmethod
+    def ids(self) -> Iterator[ID]:
+        """Iterate over the IDs of all the cached items."""
+        err = "Implement in derived"
+        raise NotImplementedError(err)
+
+    def flush(self) -> None:  # noqa: B027
+        """Make all the changes so far persistent."""
+
+    def close(self) -> None:
+        """Flush and release any resources held by the store."""
+        self.flush()
+
+    def update_from(self, other: SerdesStore) -> int:
+        """Copy all the items of another store into this one.
+
+        :returns: The number of items copied
+        """
+        count = 0
+        fingerprints = other.fingerprints()
+        for item_id in other.ids():
+            self.dump(item_id, other.load(item_id), fingerprint=fingerprints.get(item_id))
+            count += 1
+
+        self.flush()
+        return count
+
+
+class PickleDirSerdesStore(SerdesStore):
+    """Store each item as a separate pickle file under a directory, named after its ID.
+
+    The fingerprints of all the items are kept in a single pickle file next to the directory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path=path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._fingerprints_path = self._path.with_name(f"{self._path.name}.fingerprints")
+        self._fingerprints: dict[ID, str] | None = None
+        self._fingerprints_dirty = False
+
+    @classmethod
+    def path_for(cls, serdes_root: Path, side_name: str) -> Path:
+        return serdes_root / side_name
+
+    def load(self, item_id: ID) -> Any:  # noqa: ANN401
+        try:
+            return pickle_load(self._path / str(item_id))
+        except FileNotFoundError as err:
+            raise KeyError(item_id) from err
+
+    def dump(
+        self,
+        item_id: ID,
+        item: Any,  # noqa: ANN401
+        fingerprint: str | None = None,
+    ) -> None:
+        pickle_dump(item, self._path / str(item_id))
+        if fingerprint is None:
+            self._discard_fingerprint(item_id)
+        else:
+            self.set_fingerprint(item_id, fingerprint)
+
+    def remove(self, item_id: ID) -> None:
+        try:
+            (self._path / str(item_id)).unlink()
+        except FileNotFoundError as err:
+            raise KeyError(item_id) from err
+
+        self._discard_fingerprint(item_id)
+
+    @property
+    def _fingerprints_index(self) -> dict[ID, str]:
+        if self._fingerprints is None:
+            try:
+                self._fingerprints = pickle_load(self._fingerprints_path)
+            except FileNotFoundError:
+                self._fingerprints = {}
+
+        return self._fingerprints
+
+    def fingerprints(self) -> Mapping[ID, str]:
+        return self._fingerprints_index
+
+    def set_fingerprint(self, item_id: ID, fingerprint: str) -> None:
+        if self._fingerprints_index.get(str(item_id)) != fingerprint:
+            self._fingerprints_index[str(item_id)] = fingerprint
+            self._fingerprints_dirty = True
+
+    def _discard_fingerprint(self, item_id: ID) -> None:
+        if self._fingerprints_index.pop(str(item_id), None) is not None:
+            self._fingerprints_dirty = True
+
+    def flush(self) -> None:
+        if self._fingerprints_dirty:
+            pickle_dump(self._fingerprints, self._fingerprints_path)
+            self._fingerprints_dirty = False
+
+    def ids(self) -> Iterator[ID]:
+        return (p.name for p in self._path.iterdir() if p.is_file())
+
+    def __contains__(self, item_id: ID) -> bool:
+        return (self._path / str(item_id)).is_file()
+
+
+class SqliteSerdesStore(SerdesStore):
+    """Store all the items of a side in a single SQLite database file.
+
+    Changes are grouped in a single transaction and are only committed on `flush()` / `close()`
+    - the latter is also registered to run at exit, similar to how the PrefsManager flushes the
+    ID correspondences.
+
+    Safe to use from multiple threads, e.g., from sides that access their cache while they're
+    being started or fetched concurrently - all the accesses to the connection are serialized.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path=path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn: sqlite3.Connection | None = sqlite3.connect(
+            self._path,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items"
+            " (id TEXT PRIMARY KEY, item BLOB NOT NULL, fingerprint TEXT)",
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(items)")}
+        if "fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE items ADD COLUMN fingerprint TEXT")
+        self._conn.commit()
+
+        atexit.register(self.close)
+
+    @classmethod
+    def path_for(cls, serdes_root: Path, side_name: str) -> Path:
+        return serdes_root / f"{side_name}.sqlite3"
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError(f"Serdes store has already been closed -> {self._path}")
+
+            yield self._conn
+
+    def load(self, item_id: ID) -> Any:  # noqa: ANN401
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT item FROM items WHERE id = ?", (str(item_id),)
+            ).fetchone()
+        if row is None:
+            raise KeyError(item_id)
+
+        return pickle.loads(row[0])  # noqa: S301
+
+    def dump(
+        self,
+        item_id: ID,
+        item: Any,  # noqa: ANN401
+        fingerprint: str | None = None,
+    ) -> None:
+        data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO items (id, item, fingerprint) VALUES (?, ?, ?)",
+                (str(item_id), data, fingerprint),
+            )
+
+    def remove(self, item_id: ID) -> None:
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM items WHERE id = ?", (str(item_id),))
+        if cursor.rowcount == 0:
+            raise KeyError(item_id)
+
+    def ids(self) -> Iterator[ID]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT id FROM items").fetchall()
+        return (row[0] for row in rows)
+
+    def fingerprints(self) -> Mapping[ID, str]:
+        with self._connection() as conn:
+            return dict(
+                conn.execute(
+                    "SELECT id, fingerprint FROM items WHERE fingerprint IS NOT NULL",
+                ).fetchall(),
+            )
+
+    def set_fingerprint(self, item_id: ID, fingerprint: str) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE items SET fingerprint = ? WHERE id = ?",
+                (fingerprint, str(item_id)),
+            )
+
+    def __contains__(self, item_id: ID) -> bool:
+        with self._connection() as conn:
+            row = conn.execute("SELECT 1 FROM items WHERE id = ?", (str(item_id),)).fetchone()
+        return row is not None
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
+
+
+# Available serdes backends with their respective names so that the user can choose which one
+# they want. ----------------------------------------------------------------------------------
+name_to_serdes_store_type: Mapping[str, type[SerdesStore]] = {
+    "pickle": PickleDirSerdesStore,
+    "sqlite": SqliteSerdesStore,
+}
+
+
+def open_serdes_store(
+    serdes_root: Path,
+    side_name: str,
+    backend: str = "pickle",
+) -> SerdesStore:
+    """Open the serdes store of the given side, using the backend of the given name.
+
+    If the store doesn't exist yet but there's a legacy serdes directory for this side (i.e.,
+    one pickle file per item), migrate its contents to the newly created store. The legacy
+    directory is left intact since it may still be used by other synchronizations.
+    """
+    store_type = name_to_serdes_store_type[backend]
+    path = store_type.path_for(serdes_root, side_name)
+    legacy_path = PickleDirSerdesStore.path_for(serdes_root, side_name)
+    needs_migration = (
+        store_type is not PickleDirSerdesStore and not path.exists() and legacy_path.is_dir()
+    )
+
+    store = store_type(path)
+    if needs_migration:
+        logger.info(f"Migrating cached items from {legacy_path} to {path}...")
+        count = store.update_from(PickleDirSerdesStore(legacy_path))
+        logger.info(f"Migrated {count} cached items.")
+
+    return store
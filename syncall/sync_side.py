@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import abc
 import datetime
-from collections.abc import Mapping, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from typing import TYPE_CHECKING, Any, final
 
 from bubop.time import is_same_datetime
@@ -10,10 +10,18 @@ from bubop.time import is_same_datetime
 if TYPE_CHECKING:
     from item_synchronizer.types import ID
 
+    from syncall.serdes_store import SerdesStore
+
 from loguru import logger
 
+from syncall.fingerprint import fingerprint_of
+
 ItemType = Mapping[str, Any]
 
+# Called with the outcome of a write operation - i.e., the resulting item, if any, or the
+# exception that occurred in case the operation was deferred
+WriteCallback = Callable[[ItemType | None, Exception | None], None]
+
 
 class SyncSide(abc.ABC):
     """Interface class for interacting with the various synchronization sides.
@@ -25,12 +33,19 @@ class SyncSide(abc.ABC):
     item_synchronizer.
     """
 
+    # Whether add_item, update_item and delete_single_item can be called concurrently from
+    # multiple threads - see syncall.write_pool.WritePool
+    concurrent_writes_safe: bool = False
+
     def __init__(self, name: str, fullname: str, *args, **kargs) -> None:
         del args, kargs
         """Initialize the side."""
         self._fullname = fullname
         self._name = name
 
+        # persistent cache of the side, see attach_cache
+        self._cache: SerdesStore | None = None
+
     def __str__(self) -> str:
         """Return the string representation of the side."""
         return self._fullname
@@ -61,6 +76,16 @@ class SyncSide(abc.ABC):
         their cached data, etc.
         """
 
+    def attach_cache(self, cache: SerdesStore) -> None:
+        """Provide the side with a store for persisting data across runs.
+
+        Called by the Aggregator before `start()`. The store is specific to this side and to
+        the synchronization at hand and it's closed by the Aggregator after `finish()`. Derived
+        classes can use it to e.g., keep whatever state they need to only fetch the items that
+        changed since the last run.
+        """
+        self._cache = cache
+
     @abc.abstractmethod
     def get_all_items(self, **kargs) -> Sequence[ItemType]:
         """Query side and return a sequence of items.
@@ -111,6 +136,36 @@ class SyncSide(abc.ABC):
         err = "Implement in derived"
         raise NotImplementedError(err)
 
+    def queue_add_item(self, item: ItemType, callback: WriteCallback) -> None:
+        """Add a new item, possibly deferring the operation until `flush_writes()`.
+
+        Sides that can group multiple write operations in a single request override this and
+        the rest of the `queue_*` methods. By default the operation is executed right away and
+        any exception is propagated to the caller.
+
+        :param callback: Called with the newly added item or with the exception that occurred
+        """
+        callback(self.add_item(item), None)
+
+    def queue_update_item(self, item_id: ID, callback: WriteCallback, **changes) -> None:
+        """Update an item, possibly deferring the operation until `flush_writes()`.
+
+        See `queue_add_item`.
+        """
+        self.update_item(item_id, **changes)
+        callback(None, None)
+
+    def queue_delete_single_item(self, item_id: ID, callback: WriteCallback) -> None:
+        """Delete an item, possibly deferring the operation until `flush_writes()`.
+
+        See `queue_add_item`.
+        """
+        self.delete_single_item(item_id)
+        callback(None, None)
+
+    def flush_writes(self) -> None:  # noqa: B027
+        """Execute all the write operations deferred by the `queue_*` methods."""
+
     @classmethod
     @abc.abstractmethod
     def id_key(cls) -> str:
@@ -159,6 +214,36 @@ class SyncSide(abc.ABC):
         err = "Implement in derived"
         raise NotImplementedError(err)
 
+    @classmethod
+    def fingerprint(
+        cls,
+        item: ItemType,
+        ignore_keys: Sequence[str] = [],
+    ) -> str | None:
+        """Compute a canonical fingerprint over the keys that `items_are_identical` compares.
+
+        Two items with the same fingerprint must also be identical according to
+        `items_are_identical`. The opposite doesn't have to hold.
+
+        .. returns:: The fingerprint or None if the side doesn't support fingerprints.
+        """
+        del item, ignore_keys
+        return None
+
+    @final
+    @staticmethod
+    def _fingerprint(item: ItemType, keys: list) -> str:
+        """Compute the fingerprint of the provided keys of the given item.
+
+        Counterpart of `_items_are_identical` - datetimes are normalized using the same
+        tolerance and keys that the item doesn't have are fingerprinted as missing.
+        """
+        return fingerprint_of(
+            item,
+            keys,
+            datetime_tolerance=datetime.timedelta(minutes=1),
+        )
+
     @final
     @staticmethod
     def _items_are_identical(item1: ItemType, item2: ItemType, keys: list) -> bool:
@@ -7,6 +7,7 @@ from uuid import UUID
 
 from bubop import logger, parse_datetime
 from taskw_ng import TaskWarrior
+from taskw_ng.utils import DATE_FORMAT
 from taskw_ng.warrior import TASKRC
 from xdg import xdg_config_home
 
@@ -29,6 +30,14 @@ OrderByType = Literal[
     "urgency",
 ]
 
+# Key under which the state of the incremental loading is persisted in the side's cache
+_INCREMENTAL_STATE_KEY = "incremental_state"
+
+# taskwarrior stores modification times with a resolution of a second, and the clock of the
+# current run may be slightly off compared to the previous one. Fetch a bit more than what's
+# strictly necessary - re-fetching a task is harmless, missing one is not.
+_INCREMENTAL_WATERMARK_OVERLAP = datetime.timedelta(minutes=1)
+
 TW_CONFIG_DEFAULT_OVERRIDES = {
     "context": "none",
     "uda": {tw_duration_key: {"type": "duration", "label": "Syncall Duration"}},
@@ -48,6 +57,15 @@ class TaskWarriorSide(SyncSide):
     ID_KEY = "uuid"
     SUMMARY_KEY = "description"
     LAST_MODIFICATION_KEY = "modified"
+    _identical_comparison_keys: tuple[str, ...] = (
+        "annotations",
+        "description",
+        "scheduled",
+        "due",
+        "status",
+        "uuid",
+        tw_duration_key,
+    )
 
     def __init__(
         self,
@@ -56,6 +74,8 @@ class TaskWarriorSide(SyncSide):
         tw_filter: str = "",
         config_file_override: Path | None = None,
         config_overrides: Mapping[str, Any] = {},
+        *,
+        incremental: bool = False,
         **kargs,
     ):
         """Init.
@@ -69,11 +89,19 @@ class TaskWarriorSide(SyncSide):
         :param config_file: Path to the taskwarrior RC file
         :param config_overrides: Dictionary of taskrc key, values to override. See also
                                  TW_CONFIG_DEFAULT_OVERRIDES
+        :param incremental: Only query taskwarrior for the tasks modified since the last run
+                            and merge them with the snapshot of the tasks persisted in the
+                            side's cache. Filters that depend on the current time (e.g.,
+                            `modified.after:-3d`, `+OVERDUE`) can't be evaluated
+                            incrementally, tasks that start matching them without being
+                            modified will be missed. The same applies to tasks pulled via
+                            `task sync` that were modified before the last run.
         """
         super().__init__(name="Tw", fullname="Taskwarrior", **kargs)
         self._tags: set[str] = set(tags)
         self._project: str = project or ""
         self._tw_filter: str = tw_filter
+        self._incremental = incremental
 
         config_overrides_ = TW_CONFIG_DEFAULT_OVERRIDES.copy()
         config_overrides_.update(config_overrides)
@@ -131,14 +159,73 @@ class TaskWarriorSide(SyncSide):
             filter_.append(f"pro:{self._project}")
         filter_ = f"( {' and '.join(filter_)} )"
         logger.debug(f"Using the following filter to fetch TW tasks: {filter_}")
-        tasks = self._tw.load_tasks_and_filter(command="all", filter_=filter_)
 
-        items = [*tasks["completed"], *tasks["pending"]]
-        self._items_cache: dict[str, TaskwarriorRawItem] = {  # type: ignore
-            str(item["uuid"]): item for item in items
-        }
+        # time of the query - anything modified from now on will be fetched on the next run
+        watermark = datetime.datetime.now(tz=datetime.UTC)
+        state = self._incremental_state(filter_)
+        if state is None:
+            tasks = self._tw.load_tasks_and_filter(command="all", filter_=filter_)
+            items = [*tasks["completed"], *tasks["pending"]]
+            self._items_cache: dict[str, TaskwarriorRawItem] = {  # type: ignore
+                str(item["uuid"]): item for item in items
+            }
+        else:
+            self._items_cache = state["items"]
+            self._load_modified_items(filter_, since=state["watermark"])
+
+        if self._incremental and self._cache is not None:
+            self._cache.dump(
+                _INCREMENTAL_STATE_KEY,
+                {"filter": filter_, "watermark": watermark, "items": self._items_cache},
+            )
         self._reload_items = False
 
+    def _incremental_state(self, filter_: str) -> dict[str, Any] | None:
+        """Get the persisted state of the previous run, if it's usable for the given filter."""
+        if not self._incremental or self._cache is None:
+            return None
+
+        try:
+            state = self._cache.load(_INCREMENTAL_STATE_KEY)
+        except KeyError:
+            logger.info("No snapshot of TW tasks from a previous run, loading all tasks...")
+            return None
+
+        if state["filter"] != filter_:
+            logger.info("TW filter has changed since the previous run, loading all tasks...")
+            return None
+
+        return state
+
+    def _load_modified_items(self, filter_: str, since: datetime.datetime):
+        """Merge the tasks modified after the given time into the already loaded tasks.
+
+        Tasks that were modified but don't match the filter anymore (e.g., because they were
+        deleted, or because they were re-tagged) are removed.
+        """
+        since_str = (since - _INCREMENTAL_WATERMARK_OVERLAP).strftime(DATE_FORMAT)
+        logger.debug(f"Fetching TW tasks modified after {since_str}...")
+        tasks = self._tw.load_tasks_and_filter(
+            command="all",
+            filter_=f"{filter_} modified.after:{since_str}",
+        )
+        matching = {
+            str(item["uuid"]): item for item in [*tasks["completed"], *tasks["pending"]]
+        }
+        # all the modified tasks, regardless of status or filter
+        modified = {
+            str(item["uuid"]) for item in self._tw.filter_tasks({"modified.after": since_str})
+        }
+
+        for uuid in modified.difference(matching):
+            self._items_cache.pop(uuid, None)
+        self._items_cache.update(matching)
+
+        logger.debug(
+            f"Merged {len(matching)} modified TW tasks, {len(self._items_cache)} tasks in"
+            " total",
+        )
+
     def get_all_items(
         self,
         skip_completed=False,
@@ -266,19 +353,7 @@ class TaskWarriorSide(SyncSide):
         item1 = item1.copy()
         item2 = item2.copy()
 
-        keys = [
-            k
-            for k in [
-                "annotations",
-                "description",
-                "scheduled",
-                "due",
-                "status",
-                "uuid",
-                tw_duration_key,
-            ]
-            if k not in ignore_keys
-        ]
+        keys = [k for k in cls._identical_comparison_keys if k not in ignore_keys]
 
         # special care for the annotations key
         if "annotations" in item1 and "annotations" in item2:
@@ -308,3 +383,21 @@ class TaskWarriorSide(SyncSide):
                 item["modified"] = parse_datetime_(item["modified"])
 
         return SyncSide._items_are_identical(item1, item2, keys)
+
+    @classmethod
+    def fingerprint(cls, item: dict, ignore_keys: Sequence[str] = []) -> str:
+        item = item.copy()
+
+        # a missing annotations key is equivalent to an empty list of annotations - see
+        # items_are_identical
+        item["annotations"] = item.get("annotations") or []
+        if "uuid" in item:
+            item["uuid"] = str(item["uuid"])
+
+        return SyncSide._fingerprint(
+            item,
+            keys=[
+                "annotations",
+                *(k for k in cls._identical_comparison_keys if k not in ignore_keys),
+            ],
+        )
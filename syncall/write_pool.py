@@ -0,0 +1,92 @@
+"""Concurrent execution of the write operations of a synchronization side."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import TYPE_CHECKING
+
+from bubop import logger
+
+from syncall.sync_side import SyncSide
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from item_synchronizer.types import ID
+
+    from syncall.sync_side import ItemType, WriteCallback
+
+
+class WritePool:
+    """Execute the write operations of a side on a bounded pool of worker threads.
+
+    Exposes the same `queue_*` / `flush_writes` interface as the SyncSide it wraps. Operations
+    start executing as soon as they are queued, but their callbacks are only called from the
+    thread that calls `flush_writes()`, in order of completion. This way, whatever bookkeeping
+    the callbacks do (e.g., updating the ID correspondences and the serdes stores) doesn't
+    need any locking.
+
+    Operations that the side defers itself, i.e., whose `queue_*` method it overrides (e.g., to
+    batch them), are still queued on the side, so that they are executed on its
+    `flush_writes()` as usual.
+
+    Only use this for sides whose write methods are safe to call from multiple threads, see
+    `SyncSide.concurrent_writes_safe`.
+    """
+
+    def __init__(self, side: SyncSide, max_workers: int) -> None:
+        self._side = side
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"syncall-{side.name.lower()}",
+        )
+        self._pending: dict[Future, WriteCallback] = {}
+
+    def queue_add_item(self, item: ItemType, callback: WriteCallback) -> None:
+        if self._side_defers("queue_add_item"):
+            self._side.queue_add_item(item, callback)
+            return
+
+        self._submit(partial(self._side.add_item, item), callback)
+
+    def queue_update_item(self, item_id: ID, callback: WriteCallback, **changes) -> None:
+        if self._side_defers("queue_update_item"):
+            self._side.queue_update_item(item_id, callback, **changes)
+            return
+
+        self._submit(partial(self._side.update_item, item_id, **changes), callback)
+
+    def queue_delete_single_item(self, item_id: ID, callback: WriteCallback) -> None:
+        if self._side_defers("queue_delete_single_item"):
+            self._side.queue_delete_single_item(item_id, callback)
+            return
+
+        self._submit(partial(self._side.delete_single_item, item_id), callback)
+
+    def flush_writes(self) -> None:
+        """Wait for all the queued operations and call their callbacks."""
+        if self._pending:
+            logger.debug(f"Waiting for {len(self._pending)} {self._side} write operations...")
+
+        for future in as_completed(list(self._pending)):
+            callback = self._pending.pop(future)
+            exc = future.exception()
+            if exc is not None and not isinstance(exc, Exception):
+                # e.g., KeyboardInterrupt
+                raise exc
+
+            callback(None if exc is not None else future.result(), exc)
+
+        self._side.flush_writes()
+
+    def shutdown(self) -> None:
+        """Release the worker threads - pending operations are cancelled."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _side_defers(self, method_name: str) -> bool:
+        default = getattr(SyncSide, method_name)
+        return getattr(type(self._side), method_name, default) is not default
+
+    def _submit(self, fn: Callable[[], ItemType | None], callback: WriteCallback) -> None:
+        self._pending[self._executor.submit(fn)] = callback
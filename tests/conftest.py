@@ -6,9 +6,13 @@ from _pytest.logging import caplog as _caplog  # noqa: F401
 from bubop import PrefsManager
 from loguru import logger
 
+from .conftest_aggregator import *  # noqa: F403
+from .conftest_asana import *  # noqa: F403
+from .conftest_caldav import *  # noqa: F403
 from .conftest_fs import *  # noqa: F403
 from .conftest_gcal import *  # noqa: F403
 from .conftest_gkeep import *  # noqa: F403
+from .conftest_google import *  # noqa: F403
 from .conftest_gtasks import *  # noqa: F403
 from .conftest_helpers import *  # noqa: F403
 from .conftest_notion import *  # noqa: F403
@@ -0,0 +1,223 @@
+"""In-memory synchronization sides and helpers for testing the Aggregator."""
+
+from __future__ import annotations
+
+import threading
+from contextlib import suppress
+from functools import partial
+from itertools import count
+from typing import TYPE_CHECKING
+
+import pytest
+from bubop import CommonDir
+from syncall.aggregator import Aggregator
+from syncall.serdes_store import PickleDirSerdesStore
+from syncall.sync_side import SyncSide
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from pathlib import Path
+
+    from item_synchronizer.types import ID
+    from syncall.sync_side import ItemType, WriteCallback
+
+
+class InMemorySide(SyncSide):
+    """Side keeping its items in a dict.
+
+    Like the sides that fetch incrementally, it uses its cache both during `start()` and
+    `get_all_items()`. Optionally, it defers its write operations until `flush_writes()`.
+    """
+
+    _compared_keys = ("title", "done")
+
+    def __init__(self, name: str, deferred_writes: bool = False) -> None:
+        super().__init__(name=name, fullname=f"In-memory {name}")
+        self.items: dict[ID, dict] = {}
+        self.deferred_writes = deferred_writes
+
+        # write operations on these item IDs raise
+        self.failing_ids: set[ID] = set()
+        # additions raise
+        self.fail_additions = False
+        # `flush_writes()` raises, before executing any of the queued operations
+        self.fail_flush = False
+
+        self.num_fetches = 0
+        self.num_gets = 0
+        # names of the threads that `start()` and `get_all_items()` ran on
+        self.threads: set[str] = set()
+        # if set, `start()` and `get_all_items()` wait on it, e.g., for the other side
+        self.barrier: threading.Barrier | None = None
+
+        self._ids = count()
+        self._queued: list[Callable[[], None]] = []
+
+    def start(self):
+        self._rendezvous()
+        num_runs = 0
+        with suppress(KeyError):
+            num_runs = self._cache.load("num_runs")
+        self._cache.dump("num_runs", num_runs + 1)
+
+    def get_all_items(self, **kargs) -> Sequence[ItemType]:
+        del kargs
+        self._rendezvous()
+        self.num_fetches += 1
+        self._cache.dump("ids", sorted(self.items))
+        return [dict(item) for item in self.items.values()]
+
+    def get_item(self, item_id: ID, use_cached: bool = False) -> ItemType | None:
+        del use_cached
+        self.num_gets += 1
+        item = self.items.get(item_id)
+        return None if item is None else dict(item)
+
+    def add_item(self, item: ItemType) -> ItemType:
+        if self.fail_additions:
+            raise RuntimeError("Failed to add item")
+
+        item_id = f"{self.name}-{next(self._ids)}"
+        self.items[item_id] = {**item, "id": item_id}
+        return dict(self.items[item_id])
+
+    def update_item(self, item_id: ID, **changes):
+        self._check_writable(item_id)
+        self.items[item_id].update({k: v for k, v in changes.items() if k != "id"})
+
+    def delete_single_item(self, item_id: ID):
+        self._check_writable(item_id)
+        del self.items[item_id]
+
+    def queue_add_item(self, item: ItemType, callback: WriteCallback) -> None:
+        if not self.deferred_writes:
+            super().queue_add_item(item, callback)
+            return
+
+        self._queued.append(partial(_run, partial(self.add_item, item), callback))
+
+    def queue_update_item(self, item_id: ID, callback: WriteCallback, **changes) -> None:
+        if not self.deferred_writes:
+            super().queue_update_item(item_id, callback, **changes)
+            return
+
+        self._queued.append(
+            partial(_run, partial(self.update_item, item_id, **changes), callback),
+        )
+
+    def queue_delete_single_item(self, item_id: ID, callback: WriteCallback) -> None:
+        if not self.deferred_writes:
+            super().queue_delete_single_item(item_id, callback)
+            return
+
+        self._queued.append(partial(_run, partial(self.delete_single_item, item_id), callback))
+
+    def flush_writes(self) -> None:
+        if self.fail_flush:
+            raise RuntimeError("Failed to flush the queued writes")
+
+        queued, self._queued = self._queued, []
+        for fn in queued:
+            fn()
+
+    def _rendezvous(self) -> None:
+        self.threads.add(threading.current_thread().name)
+        if self.barrier is not None:
+            self.barrier.wait()
+
+    def _check_writable(self, item_id: ID) -> None:
+        if item_id in self.failing_ids:
+            raise RuntimeError(f"Failed to write item {item_id}")
+
+    @classmethod
+    def id_key(cls) -> str:
+        return "id"
+
+    @classmethod
+    def summary_key(cls) -> str:
+        return "title"
+
+    @classmethod
+    def last_modification_key(cls) -> str:
+        return "modified"
+
+    @classmethod
+    def items_are_identical(
+        cls,
+        item1: ItemType,
+        item2: ItemType,
+        ignore_keys: Sequence[str] = [],
+    ) -> bool:
+        keys = [k for k in cls._compared_keys if k not in ignore_keys]
+        return SyncSide._items_are_identical(item1, item2, keys=keys)
+
+    @classmethod
+    def fingerprint(cls, item: ItemType, ignore_keys: Sequence[str] = []) -> str:
+        keys = [k for k in cls._compared_keys if k not in ignore_keys]
+        return SyncSide._fingerprint(item, keys=keys)
+
+
+class InMemorySideWithoutFingerprints(InMemorySide):
+    """In-memory side that, like most sides, doesn't support fingerprints."""
+
+    @classmethod
+    def fingerprint(cls, item: ItemType, ignore_keys: Sequence[str] = []) -> str | None:
+        del item, ignore_keys
+
+
+def _run(fn: Callable[[], ItemType | None], callback: WriteCallback) -> None:
+    try:
+        result = fn()
+    except Exception as err:  # noqa: BLE001
+        callback(None, err)
+        return
+
+    callback(result, None)
+
+
+def _convert(item: ItemType) -> dict:
+    return {k: v for k, v in item.items() if k != "id"}
+
+
+def run_sync(side_A: SyncSide, side_B: SyncSide, **kargs) -> Aggregator:
+    """Synchronize the given sides once, persisting the ID correspondences for the next run.
+
+    Like at exit, the correspondences are persisted even if the synchronization raises.
+    """
+    aggregator = Aggregator(
+        side_A=side_A,
+        side_B=side_B,
+        converter_B_to_A=_convert,
+        converter_A_to_B=_convert,
+        **{"config_fname": "in_memory_sync", **kargs},
+    )
+    try:
+        with aggregator:
+            aggregator.sync()
+    finally:
+        aggregator.prefs_manager._cleanup()
+
+    return aggregator
+
+
+@pytest.fixture
+def serdes_loads(monkeypatch: pytest.MonkeyPatch) -> list[ID]:
+    """Record the IDs of the items that are loaded from the serdes stores."""
+    loads: list[ID] = []
+    load = PickleDirSerdesStore.load
+
+    def spy(self: PickleDirSerdesStore, item_id: ID) -> ItemType:
+        if self.path.parent.name == "serdes":
+            loads.append(item_id)
+        return load(self, item_id)
+
+    monkeypatch.setattr(PickleDirSerdesStore, "load", spy)
+    return loads
+
+
+@pytest.fixture
+def aggregator_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the configuration and the caches of the Aggregator under a temporary directory."""
+    monkeypatch.setattr(CommonDir, "config", staticmethod(lambda: tmp_path / "config"))
+    monkeypatch.setattr(CommonDir, "cache", staticmethod(lambda: tmp_path / "cache"))
+    return tmp_path
@@ -0,0 +1,100 @@
+"""Fakes of the Asana client and of the Asana API server."""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler
+
+import asana
+from bubop import parse_datetime
+from syncall.asana.asana_side import TASK_FIELDS
+
+
+def asana_raw_task(gid: str, modified_at: str = "2024-01-02T00:00:00.000Z", **kargs) -> dict:
+    return {
+        "gid": gid,
+        "name": f"task {gid}",
+        "completed": False,
+        "completed_at": None,
+        "created_at": "2024-01-01T00:00:00.000Z",
+        "modified_at": modified_at,
+        "due_at": None,
+        "due_on": None,
+        **kargs,
+    }
+
+
+class FakeAsanaTasks:
+    """`tasks` endpoint of the Asana client, for the tasks of a single assignee."""
+
+    def __init__(self, num_tasks: int):
+        self.tasks = {
+            str(i): asana_raw_task(
+                str(i), modified_at=f"2024-01-02T{i // 60:02d}:{i % 60:02d}:00Z"
+            )
+            for i in range(num_tasks)
+        }
+        self.num_requests = 0
+        self.num_full_tasks = 0
+
+    def find_all(self, **options):
+        tasks = list(self.tasks.values())
+        if "modified_since" in options:
+            since = parse_datetime(options["modified_since"])
+            tasks = [t for t in tasks if parse_datetime(t["modified_at"]) >= since]
+
+        # even an empty listing takes a request
+        for start in range(0, max(len(tasks), 1), options["page_size"]):
+            self.num_requests += 1
+            yield from (
+                self._project(t, options["fields"])
+                for t in tasks[start : start + options["page_size"]]
+            )
+
+    def find_by_id(self, task: str, **options):
+        self.num_requests += 1
+        if task not in self.tasks:
+            raise asana.error.NotFoundError
+
+        return self._project(self.tasks[task], options["fields"])
+
+    def update_task(self, task: str, params: dict, **options):
+        self.num_requests += 1
+        self.tasks[task].update(params)
+        return self._project(self.tasks[task], options["fields"])
+
+    def _project(self, task: dict, fields: list[str]) -> dict:
+        if fields == TASK_FIELDS:
+            self.num_full_tasks += 1
+        return {"gid": task["gid"], **{f: task[f] for f in fields}}
+
+
+class FakeAsanaClient:
+    """Asana client that only supports the requests to the tasks endpoint."""
+
+    def __init__(self, num_tasks: int):
+        self.tasks = FakeAsanaTasks(num_tasks)
+
+
+class AsanaThrottlingHandler(BaseHTTPRequestHandler):
+    """Throttles the first 2 requests it receives, then responds with a task.
+
+    The second request is asked to retry after an HTTP-date rather than a number of seconds.
+    """
+
+    num_requests = 0
+    retry_afters = ("0.1", "Wed, 21 Oct 2015 07:28:00 GMT")
+
+    def do_GET(self):
+        type(self).num_requests += 1
+        throttle = self.num_requests <= 2
+        body = b"{}" if throttle else b'{"data": {"gid": "1"}}'
+        self.send_response(429 if throttle else 200)
+        if throttle:
+            self.send_header("Retry-After", self.retry_afters[self.num_requests - 1])
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,159 @@
+"""Fake of a CalDAV calendar and the fixtures of the Caldav sides that use it."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from caldav.elements import dav
+from caldav.lib.error import NotFoundError, ReportError
+from caldav.lib.url import URL
+from icalendar import Todo
+from syncall.caldav.caldav_side import CaldavSide
+from syncall.caldav.caldav_utils import GetCTag
+from syncall.serdes_store import PickleDirSerdesStore
+
+
+class FakeCaldavTodo:
+    """Todo of a FakeCaldavCalendar."""
+
+    def __init__(self, calendar: FakeCaldavCalendar, uid: str):
+        self._calendar = calendar
+        self.url = URL.objectify(f"/calendar/{uid}.ics")
+        self._component = Todo(uid=uid, summary=f"todo {uid}", status="NEEDS-ACTION")
+        self.etag = "0"
+
+    @property
+    def data(self) -> str:
+        return self._component.to_ical().decode()
+
+    @property
+    def icalendar_component(self) -> Todo:
+        self._calendar.num_parses += 1
+        return self._component
+
+    def load(self) -> FakeCaldavTodo:
+        self._calendar.num_requests += 1
+        if self.url not in self._calendar.objects:
+            raise NotFoundError(self.url)
+
+        return self
+
+    def save(self):
+        self._calendar.num_requests += 1
+        self.etag = str(int(self.etag) + 1)
+        self._calendar.objects[self.url] = self
+        self._calendar.changed(self.url)
+
+    def delete(self):
+        self._calendar.num_requests += 1
+        del self._calendar.objects[self.url]
+        self._calendar.changed(self.url)
+
+
+class FakeCaldavObject:
+    """Bare calendar object resource, as returned by a sync-collection REPORT."""
+
+    def __init__(self, url: URL, etag: str | None):
+        self.url = url
+        self.props = {} if etag is None else {dav.GetEtag.tag: etag}
+
+
+class FakeCaldavCalendar:
+    """Radicale-like stand-in, supports sync-collection and calendar-multiget REPORTs."""
+
+    def __init__(self, num_todos: int):
+        self.url = URL.objectify("/calendar/")
+        self.num_requests = 0
+        self.num_parses = 0
+        self.objects = {}
+        for i in range(num_todos):
+            todo = FakeCaldavTodo(self, str(i))
+            self.objects[todo.url] = todo
+
+        # sync token -> URLs of the objects that changed after it
+        self.sync_token = 0
+        self.changes: list[URL] = []
+        self.sync_tokens_expired = False
+        self.supports_sync_collection = True
+        self.multiget_calls: list[list[str]] = []
+
+    def changed(self, url: URL):
+        self.sync_token += 1
+        self.changes.append(url)
+
+    def get_properties(self, props: list) -> dict:
+        assert [p.tag for p in props] == [GetCTag.tag, dav.SyncToken.tag]
+        self.num_requests += 1
+        return {GetCTag.tag: str(self.sync_token)}
+
+    def objects_by_sync_token(self, sync_token: int | None = None) -> FakeCaldavCollection:
+        self.num_requests += 1
+        if not self.supports_sync_collection:
+            raise ReportError(sync_token)
+        if sync_token is None:
+            urls = list(self.objects)
+        elif self.sync_tokens_expired:
+            raise ReportError(sync_token)
+        else:
+            urls = list(dict.fromkeys(self.changes[sync_token:]))
+
+        return FakeCaldavCollection(
+            [
+                FakeCaldavObject(url, self.objects[url].etag if url in self.objects else None)
+                for url in urls
+            ],
+            self.sync_token,
+        )
+
+    def calendar_multiget(self, urls: list[URL]) -> list[FakeCaldavTodo]:
+        self.num_requests += 1
+        self.multiget_calls.append(sorted(url.path for url in urls))
+        return [self.objects[url] for url in urls if url in self.objects]
+
+    def todos(self, include_completed: bool) -> list[FakeCaldavTodo]:
+        assert include_completed
+        self.num_requests += 1
+        return list(self.objects.values())
+
+    def todo_by_uid(self, uid: str) -> FakeCaldavTodo:
+        self.num_requests += 1
+        for todo in self.objects.values():
+            if todo.icalendar_component["uid"] == uid:
+                return todo
+
+        raise NotFoundError(uid)
+
+
+class FakeCaldavCollection:
+    """Objects of a sync-collection REPORT, along with the new sync token."""
+
+    def __init__(self, objects: list[FakeCaldavObject], sync_token: int):
+        self.objects = objects
+        self.sync_token = sync_token
+
+    def __iter__(self):
+        return iter(self.objects)
+
+
+class FakeCaldavClient:
+    """Client whose principal is never used, the calendar is set on the side directly."""
+
+    def principal(self):
+        return None
+
+
+@pytest.fixture
+def caldav_side(tmpdir) -> CaldavSide:
+    side = CaldavSide(client=FakeCaldavClient(), calendar_name="calendar")
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "caldav"))
+    side._calendar = FakeCaldavCalendar(num_todos=10)
+    return side
+
+
+@pytest.fixture
+def incremental_caldav_side(tmpdir) -> CaldavSide:
+    side = CaldavSide(client=FakeCaldavClient(), calendar_name="calendar", incremental=True)
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "caldav"))
+    side._calendar = FakeCaldavCalendar(num_todos=5)
+    return side
@@ -1,8 +1,20 @@
+from __future__ import annotations
+
 import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
 
+import httplib2
 import pytest
 from dateutil.tz import tzutc
-from syncall.types import GCalItem
+from googleapiclient.http import HttpError
+from syncall.google.gcal_side import GCalSide
+from syncall.serdes_store import PickleDirSerdesStore
+
+from .conftest_google import FakeGoogleRequest
+
+if TYPE_CHECKING:
+    from syncall.types import GCalItem
 
 
 @pytest.fixture
@@ -66,3 +78,72 @@ def gcal_event_completed() -> GCalItem:
         "reminders": {"useDefault": True},
         "eventType": "default",
     }
+
+
+class FakeGCalEvents:
+    """Serves the events of a single calendar, in pages of 2 events."""
+
+    def __init__(self):
+        self.events: dict[str, dict] = {}
+        self.changed: list[str] = []
+        self.sync_token_expired = False
+        self.list_calls: list[dict] = []
+        self.get_calls = 0
+
+    def list(self, calendarId: str, syncToken: str | None = None):
+        del calendarId
+        self.list_calls.append({"syncToken": syncToken})
+        if syncToken is not None and self.sync_token_expired:
+            return FakeGoogleRequest(HttpError(httplib2.Response({"status": 410}), b"Gone"))
+
+        ids = list(self.events) if syncToken is None else self.changed
+        return self._page([self.events[id_] for id_ in ids], 0)
+
+    def get(self, calendarId: str, eventId: str):
+        del calendarId
+        self.get_calls += 1
+        return FakeGoogleRequest(dict(self.events[eventId]))
+
+    def update(self, calendarId: str, eventId: str, body: dict):
+        del calendarId
+
+        def execute(request: FakeGoogleRequest) -> dict:
+            etag = self.events[eventId]["etag"]
+            if request.headers.get("If-Match", etag) != etag:
+                raise HttpError(httplib2.Response({"status": 412}), b"Precondition Failed")
+
+            self.events[eventId] = {**body, "etag": f"{etag}+"}
+            return self.events[eventId]
+
+        return FakeGoogleRequest(execute)
+
+    def list_next(self, request: FakeGoogleRequest, response: dict):
+        del request
+        return response.get("_next")
+
+    def _page(self, events: list[dict], start: int) -> FakeGoogleRequest:
+        response: dict = {"items": events[start : start + 2]}
+        if start + 2 < len(events):
+            response["_next"] = self._page(events, start + 2)
+        else:
+            response["nextSyncToken"] = f"token-{len(self.list_calls)}"
+        return FakeGoogleRequest(response)
+
+
+class FakeGCalService:
+    """Google Calendar service with a single calendar."""
+
+    def __init__(self):
+        self._events = FakeGCalEvents()
+
+    def events(self) -> FakeGCalEvents:
+        return self._events
+
+
+@pytest.fixture
+def gcal_side(tmpdir) -> GCalSide:
+    side = GCalSide(client_secret="", oauth_port=8081, incremental=True)
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "gcal"))
+    side._service = FakeGCalService()
+    side._calendar_id = "calendar"
+    return side
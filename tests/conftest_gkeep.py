@@ -1,5 +1,8 @@
+from __future__ import annotations
+
+import gkeepapi
 import pytest
-from gkeepapi.node import List
+from gkeepapi.node import Label, List, Note
 from syncall.google.gkeep_note import GKeepNote as MyGKeepNote
 
 
@@ -202,3 +205,99 @@ as emojis
     """
 
     return note
+
+
+class FakeKeepServer:
+    """Keeps the notes of an account and serves the changes since a given version."""
+
+    def __init__(self, num_notes: int):
+        self.nodes: dict[str, dict] = {}
+        self.labels: dict[str, dict] = {}
+        # version of the account -> IDs of the nodes that changed in it
+        self.history: list[list[str]] = []
+        self.num_requests = 0
+        self.num_nodes_sent = 0
+        self.force_full_resync = False
+        self.fail_next_request = False
+        self.token_expired = False
+        self.num_logins = 0
+        self.store(
+            [
+                node
+                for i in range(num_notes)
+                for node in self.make_note(f"note {i}", f"contents {i}")
+            ],
+        )
+
+    def make_label(self, name: str) -> Label:
+        label = Label()
+        label.name = name
+        self.labels[label.id] = label.save()
+        return label
+
+    @staticmethod
+    def make_note(title: str, text: str, labels: tuple[Label, ...] = ()) -> list[dict]:
+        note = Note()
+        note.title = title
+        note.text = text
+        for label in labels:
+            note.labels.add(label)
+        return [note.save(), *(child.save() for child in note.children)]
+
+    def store(self, nodes: list[dict]) -> None:
+        if not nodes:
+            return
+
+        for node in nodes:
+            node["serverId"] = node["id"]
+            self.nodes[node["id"]] = node
+        self.history.append([node["id"] for node in nodes])
+
+    def resume(self) -> None:
+        if self.token_expired:
+            raise gkeepapi.exception.LoginException("BadAuthentication")
+
+    def login(self) -> None:
+        self.num_logins += 1
+        self.token_expired = False
+
+    def changes(
+        self,
+        target_version: str | None = None,
+        nodes: list[dict] | None = None,
+        labels: list[dict] | None = None,
+    ) -> dict:
+        self.num_requests += 1
+        if self.fail_next_request:
+            self.fail_next_request = False
+            raise gkeepapi.exception.APIException(503, "Service Unavailable")
+
+        if self.force_full_resync and target_version is not None:
+            self.force_full_resync = False
+            return {"forceFullResync": True}
+
+        self.store(nodes or [])
+        self.labels.update({label["mainId"]: label for label in labels or []})
+        since = 0 if target_version is None else int(target_version)
+        changed = dict.fromkeys(id_ for ids in self.history[since:] for id_ in ids)
+        self.num_nodes_sent += len(changed)
+        return {
+            "nodes": [self.nodes[id_] for id_ in changed],
+            "userInfo": {"labels": list(self.labels.values())},
+            "toVersion": str(len(self.history)),
+            "truncated": False,
+        }
+
+
+@pytest.fixture
+def keep_server(monkeypatch: pytest.MonkeyPatch) -> FakeKeepServer:
+    server = FakeKeepServer(num_notes=10)
+    monkeypatch.setattr(gkeepapi.Keep, "resume", lambda *_, **__: server.resume())
+    monkeypatch.setattr(gkeepapi.Keep, "login", lambda *_, **__: server.login())
+    monkeypatch.setattr(gkeepapi.Keep, "getMasterToken", lambda _: "token")
+    monkeypatch.setattr(
+        gkeepapi.KeepAPI,
+        "changes",
+        lambda _, **kargs: server.changes(**kargs),
+    )
+    return server
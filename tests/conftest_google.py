@@ -0,0 +1,50 @@
+"""Fakes of the requests and batches of the Google API client, shared by the Google sides."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httplib2
+from googleapiclient.http import HttpError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class FakeGoogleRequest:
+    """Request that returns the given response, raises it, or computes it when executed."""
+
+    def __init__(self, response: dict | Exception | Callable[[FakeGoogleRequest], dict]):
+        self.response = response
+        self.headers: dict[str, str] = {}
+
+    def execute(self) -> dict:
+        if isinstance(self.response, Exception):
+            raise self.response
+        if callable(self.response):
+            return self.response(self)
+
+        return self.response
+
+
+class FakeGoogleBatch:
+    """Executes the added requests in order, fails as a whole after `fail_after` requests."""
+
+    def __init__(self, executed: list[int], fail_after: int | None = None):
+        self._executed = executed
+        self._fail_after = fail_after
+        self._requests = []
+
+    def add(self, request: FakeGoogleRequest, callback, request_id: str):
+        self._requests.append((request, callback, request_id))
+
+    def execute(self):
+        self._executed.append(len(self._requests))
+        for i, (request, callback, request_id) in enumerate(self._requests):
+            if i == self._fail_after:
+                raise httplib2.ServerNotFoundError("Unable to find the server")
+
+            try:
+                callback(request_id, request.execute(), None)
+            except HttpError as err:
+                callback(request_id, None, err)
@@ -1,7 +1,16 @@
-from typing import cast
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
 
 import pytest
-from syncall.types import GTasksItem
+from syncall.google.gtasks_side import GTasksSide
+from syncall.serdes_store import PickleDirSerdesStore
+
+from .conftest_google import FakeGoogleRequest
+
+if TYPE_CHECKING:
+    from syncall.types import GTasksItem
 
 # API Reference: https://googleapis.github.io/google-api-python-client/docs/dyn/tasks_v1.html
 
@@ -154,3 +163,54 @@ def gtasks_list0():
         "title": "Taskwarrior Reminders",
         "updated": "2021-12-04T15:07:00.000Z",
     }
+
+
+class FakeGTasksTasks:
+    """Serves the tasks of a single task list, honouring `updatedMin` and `showDeleted`."""
+
+    def __init__(self):
+        self.tasks: dict[str, dict] = {}
+        self.list_calls: list[dict] = []
+
+    def list(self, tasklist: str, **kargs):
+        del tasklist
+        self.list_calls.append(kargs)
+        tasks = [
+            t
+            for t in self.tasks.values()
+            if (kargs["showDeleted"] or not t.get("deleted"))
+            and t["updated"] >= kargs.get("updatedMin", "")
+        ]
+        return FakeGoogleRequest({"items": tasks})
+
+    def list_next(self, request: FakeGoogleRequest, response: dict):
+        del request, response
+
+    def insert(self, tasklist: str, body: dict):
+        del tasklist
+
+        def execute(_: FakeGoogleRequest) -> dict:
+            task = {**body, "id": f"inserted-{len(self.tasks)}"}
+            self.tasks[task["id"]] = task
+            return task
+
+        return FakeGoogleRequest(execute)
+
+
+class FakeGTasksService:
+    """Google Tasks service with a single task list."""
+
+    def __init__(self):
+        self._tasks = FakeGTasksTasks()
+
+    def tasks(self) -> FakeGTasksTasks:
+        return self._tasks
+
+
+@pytest.fixture
+def gtasks_side(tmpdir) -> GTasksSide:
+    side = GTasksSide(client_secret="", oauth_port=8081, incremental=True)
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "gtasks"))
+    side._service = FakeGTasksService()
+    side._task_list_id = "task_list"
+    return side
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 from copy import deepcopy
-from typing import cast, no_type_check
+from typing import TYPE_CHECKING, cast, no_type_check
 
+import httpx
 import pytest
-from syncall.types import NotionPageContents, NotionTodoBlockItem
+
+if TYPE_CHECKING:
+    from syncall.types import NotionPageContents, NotionTodoBlockItem
 
 
 @pytest.fixture
@@ -1178,3 +1183,70 @@ def page_contents() -> NotionPageContents:
         "next_cursor": None,
         "has_more": False,
     }  # type: ignore
+
+
+class FakeNotionChildren:
+    """Serves the children of each block in pages of up to `page_size` blocks."""
+
+    def __init__(self):
+        self.blocks: dict[str, list[dict]] = {}
+        self.list_calls: list[dict] = []
+        self.append_calls: list[int] = []
+        # indices of the append calls that time out
+        self.failing_appends: set[int] = set()
+        # fields of the appended blocks that Notion fills in
+        self.template = {
+            "object": "block",
+            "created_time": "2021-11-04T19:07:00.000Z",
+            "last_edited_time": "2021-12-04T10:01:00.000Z",
+            "archived": False,
+        }
+
+    def list(self, block_id: str, page_size: int = 100, start_cursor: str | None = None):
+        self.list_calls.append({"block_id": block_id, "start_cursor": start_cursor})
+        children = self.blocks.get(block_id, [])
+        start = int(start_cursor) if start_cursor is not None else 0
+        end = start + page_size
+        return {
+            "object": "list",
+            "results": children[start:end],
+            "has_more": end < len(children),
+            "next_cursor": str(end) if end < len(children) else None,
+        }
+
+    def append(self, block_id: str, children: list[dict]):
+        self.append_calls.append(len(children))
+        if len(self.append_calls) - 1 in self.failing_appends:
+            raise httpx.ReadTimeout("The read operation timed out")
+        if len(children) > 100:
+            raise ValueError(len(children))
+
+        blocks = self.blocks.setdefault(block_id, [])
+        for child in children:
+            for text in child["to_do"]["text"]:
+                text["plain_text"] = text["text"]["content"]
+        new_blocks = [
+            {
+                **self.template,
+                **child,
+                "id": f"block-{len(blocks) + i}",
+                "has_children": False,
+            }
+            for i, child in enumerate(children)
+        ]
+        blocks.extend(new_blocks)
+        return {"object": "list", "results": new_blocks, "has_more": False}
+
+
+class FakeNotionBlocks:
+    """`blocks` endpoint of the Notion client."""
+
+    def __init__(self):
+        self.children = FakeNotionChildren()
+
+
+class FakeNotionClient:
+    """Notion client that only supports listing and appending the children of blocks."""
+
+    def __init__(self):
+        self.blocks = FakeNotionBlocks()
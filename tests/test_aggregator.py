@@ -1,8 +1,12 @@
+import threading
 from collections.abc import Sequence
 
+import pytest
 from item_synchronizer.types import ID
 from syncall.sync_side import ItemType, SyncSide
 
+from .conftest_aggregator import InMemorySide, InMemorySideWithoutFingerprints, run_sync
+
 
 class MockSide(SyncSide):
     """MockSide class."""
@@ -49,3 +53,182 @@ class MockSide(SyncSide):
         .. returns:: True if items are identical, False otherwise.
         """
         raise NotImplementedError("Implement in derived")
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+@pytest.mark.parametrize("serdes_backend", ["pickle", "sqlite"])
+def test_sync(serdes_backend: str):
+    side_A, side_B = InMemorySide("A"), InMemorySide("B")
+    side_A.items = {
+        f"a{i}": {"id": f"a{i}", "title": f"A {i}", "done": False} for i in range(3)
+    }
+    side_B.items = {"b0": {"id": "b0", "title": "B 0", "done": False}}
+    aggregator = run_sync(side_A, side_B, serdes_backend=serdes_backend)
+    assert {item["title"] for item in side_A.items.values()} == {"A 0", "A 1", "A 2", "B 0"}
+    assert {item["title"] for item in side_B.items.values()} == {"A 0", "A 1", "A 2", "B 0"}
+
+    # sides use their caches while being started and fetched, off the main thread
+    assert "MainThread" not in side_A.threads | side_B.threads
+    assert {"start [In-memory A]", "fetch [In-memory B]"}.issubset(aggregator.timings)
+
+    # next run - changes are propagated
+    side_A.items["a1"]["title"] = "A 1 - modified"
+    del side_B.items["b0"]
+    run_sync(side_A, side_B, serdes_backend=serdes_backend)
+    assert {item["title"] for item in side_B.items.values()} == {
+        "A 0",
+        "A 1 - modified",
+        "A 2",
+    }
+    assert {item["title"] for item in side_A.items.values()} == {
+        "A 0",
+        "A 1 - modified",
+        "A 2",
+    }
+
+
+def _make_sides(**kargs) -> tuple[InMemorySide, InMemorySide]:
+    side_A, side_B = InMemorySide("A", **kargs), InMemorySide("B", **kargs)
+    side_A.items = {
+        f"a{i}": {"id": f"a{i}", "title": f"A {i}", "done": False} for i in range(3)
+    }
+    return side_A, side_B
+
+
+def _titles(side: InMemorySide) -> set[str]:
+    return {item["title"] for item in side.items.values()}
+
+
+def _id_of(side: InMemorySide, title: str) -> ID:
+    return next(id_ for id_, item in side.items.items() if item["title"] == title)
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_unchanged_items_are_detected_via_fingerprints(serdes_loads: list[ID]):
+    side_A, side_B = _make_sides()
+    run_sync(side_A, side_B)
+
+    # next run - only the modified item is loaded for a full comparison
+    serdes_loads.clear()
+    side_A.items["a1"]["done"] = True
+    run_sync(side_A, side_B)
+    assert serdes_loads == ["a1"]
+    assert side_B.items[_id_of(side_B, "A 1")]["done"]
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_fingerprints_over_different_keys_dont_match(serdes_loads: list[ID]):
+    side_A, side_B = InMemorySide("A"), InMemorySide("B")
+    side_A.items = {"a0": {"id": "a0", "title": "A 0", "done": True}}
+    run_sync(side_A, side_B)
+    # another synchronization that shares the serdes store of A but ignores one of its keys
+    run_sync(side_A, InMemorySide("C"), config_fname="other_sync", ignore_keys=(["done"], []))
+
+    # the key is removed - it's not ignored by the first synchronization, so it's a change
+    serdes_loads.clear()
+    del side_A.items["a0"]["done"]
+    run_sync(side_A, side_B)
+    assert serdes_loads == ["a0"]
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_items_are_compared_in_full_without_fingerprints(serdes_loads: list[ID]):
+    side_A = InMemorySideWithoutFingerprints("A")
+    side_B = InMemorySideWithoutFingerprints("B")
+    side_A.items = {"a0": {"id": "a0", "title": "A 0", "done": False}}
+    run_sync(side_A, side_B)
+
+    serdes_loads.clear()
+    side_A.items["a0"]["done"] = True
+    run_sync(side_A, side_B)
+    assert sorted(serdes_loads) == ["B-0", "a0"]
+    assert [item["done"] for item in side_B.items.values()] == [True]
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_deferred_inserts_replace_their_placeholder_ids():
+    side_A, side_B = _make_sides(deferred_writes=True)
+    aggregator = run_sync(side_A, side_B)
+    assert _titles(side_B) == {"A 0", "A 1", "A 2"}
+    assert dict(aggregator._B_to_A_map) == {
+        _id_of(side_B, f"A {i}"): f"a{i}" for i in range(3)
+    }
+
+    # next run - the inserted items are known, nothing is inserted again
+    run_sync(side_A, side_B)
+    assert len(side_A.items) == len(side_B.items) == 3
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_failed_deferred_inserts_are_retried():
+    side_A, side_B = _make_sides(deferred_writes=True)
+    side_B.fail_additions = True
+    aggregator = run_sync(side_A, side_B)
+    assert not side_B.items
+    assert not aggregator._B_to_A_map
+
+    side_B.fail_additions = False
+    run_sync(side_A, side_B)
+    assert _titles(side_B) == {"A 0", "A 1", "A 2"}
+    assert len(side_A.items) == 3
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_deferred_inserts_are_retried_if_flushing_raises():
+    side_A, _ = _make_sides()
+    side_B = InMemorySide("B", deferred_writes=True)
+    side_B.fail_flush = True
+    # placeholder IDs of a run must not be persisted, e.g., to clash with those of the next
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="Failed to flush"):
+            run_sync(side_A, side_B)
+        assert not side_B.items
+
+    # had they been persisted, the items of A would be considered deleted at B
+    side_B.fail_flush = False
+    run_sync(side_A, side_B)
+    assert _titles(side_A) == _titles(side_B) == {"A 0", "A 1", "A 2"}
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+@pytest.mark.parametrize("deferred_writes", [False, True])
+def test_failed_deletions_are_retried(deferred_writes: bool):
+    side_A, side_B = _make_sides(deferred_writes=deferred_writes)
+    run_sync(side_A, side_B)
+
+    # deletion fails - the correspondence is kept so that it's retried on the next run
+    del side_A.items["a1"]
+    id_B = _id_of(side_B, "A 1")
+    side_B.failing_ids.add(id_B)
+    aggregator = run_sync(side_A, side_B)
+    assert id_B in side_B.items
+    assert aggregator._B_to_A_map[id_B] == "a1"
+
+    # had the correspondence been dropped, the item of B would be inserted back to A
+    side_B.failing_ids.clear()
+    run_sync(side_A, side_B)
+    assert _titles(side_A) == _titles(side_B) == {"A 0", "A 2"}
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_sides_are_started_and_fetched_concurrently():
+    side_A, side_B = _make_sides()
+    # each side waits for the other one - doesn't time out only if they run concurrently
+    side_A.barrier = side_B.barrier = threading.Barrier(2, timeout=5)
+    run_sync(side_A, side_B)
+    assert _titles(side_B) == {"A 0", "A 1", "A 2"}
+
+
+@pytest.mark.usefixtures("aggregator_dirs")
+def test_fetched_items_are_reused():
+    side_A, side_B = _make_sides()
+    run_sync(side_A, side_B)
+
+    id_B = _id_of(side_B, "A 0")
+    side_A.items["a0"]["title"] = "A 0 - modified"
+    side_B.items[_id_of(side_B, "A 2")]["done"] = True
+    run_sync(side_A, side_B)
+    assert side_B.items[id_B]["title"] == "A 0 - modified"
+    assert side_A.items["a2"]["done"]
+    assert side_A.num_gets == side_B.num_gets == 0
+    assert side_A.num_fetches == side_B.num_fetches == 2
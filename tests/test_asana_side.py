@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import datetime as dt
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import asana
+from syncall.asana.asana_side import AsanaSide
+from syncall.asana.utils import RateLimitedAdapter
+from syncall.rate_limiter import RateLimiter
+from syncall.serdes_store import PickleDirSerdesStore
+
+from .conftest_asana import AsanaThrottlingHandler, FakeAsanaClient, asana_raw_task
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_get_all_items_lists_full_tasks():
+    client = FakeAsanaClient(num_tasks=250)
+    side = AsanaSide(client=client, task_gid=None, workspace_gid="1")
+
+    items = side.get_all_items()
+    assert [item["gid"] for item in items] == [str(i) for i in range(250)]
+    assert items[3]["name"] == "task 3"
+    assert client.tasks.num_requests == 3
+
+
+def _make_incremental_side(client: FakeAsanaClient, tmpdir, **kargs) -> AsanaSide:
+    side = AsanaSide(
+        client=client, task_gid=None, workspace_gid="1", incremental=True, **kargs
+    )
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "asana"))
+    return side
+
+
+def test_incremental_get_all_items(tmpdir):
+    client = FakeAsanaClient(num_tasks=250)
+    tasks = client.tasks
+    assert len(_make_incremental_side(client, tmpdir).get_all_items()) == 250
+    assert (tasks.num_full_tasks, tasks.num_requests) == (250, 3)
+
+    # nothing changed - a single request, for the most recently modified task
+    tasks.num_full_tasks = tasks.num_requests = 0
+    assert len(_make_incremental_side(client, tmpdir).get_all_items()) == 250
+    assert (tasks.num_full_tasks, tasks.num_requests) == (1, 1)
+
+    # modified and new tasks
+    tasks.tasks["1"] = asana_raw_task(
+        "1", modified_at="2024-02-01T00:00:00.000Z", name="kalimera"
+    )
+    tasks.tasks["250"] = asana_raw_task("250", modified_at="2024-02-02T00:00:00.000Z")
+    tasks.num_full_tasks = tasks.num_requests = 0
+    items = {
+        item["gid"]: item for item in _make_incremental_side(client, tmpdir).get_all_items()
+    }
+    assert len(items) == 251
+    assert items["1"]["name"] == "kalimera"
+    assert "250" in items
+    assert (tasks.num_full_tasks, tasks.num_requests) == (3, 1)
+
+
+def test_incremental_get_all_items_lists_all_tasks_periodically(tmpdir):
+    client = FakeAsanaClient(num_tasks=10)
+    tasks = client.tasks
+    _make_incremental_side(client, tmpdir).get_all_items()
+
+    # deleted tasks aren't reported by Asana - they're only dropped on a full listing
+    del tasks.tasks["3"]
+    items = _make_incremental_side(client, tmpdir).get_all_items()
+    assert "3" in {item["gid"] for item in items}
+
+    tasks.num_full_tasks = 0
+    side = _make_incremental_side(client, tmpdir, full_listing_interval=dt.timedelta(0))
+    items = side.get_all_items()
+    assert "3" not in {item["gid"] for item in items}
+    assert len(items) == tasks.num_full_tasks == 9
+
+
+def test_update_item_uses_listed_task():
+    client = FakeAsanaClient(num_tasks=10)
+    side = AsanaSide(client=client, task_gid=None, workspace_gid="1")
+    items = side.get_all_items()
+    assert client.tasks.num_requests == 1
+
+    task = items[3]
+    side.update_item("3", **{**task, "name": "kalimera"})
+    side.update_item("3", **{**task, "name": "kalispera"})
+    assert client.tasks.tasks["3"]["name"] == "kalispera"
+    assert client.tasks.num_requests == 3
+
+
+def test_rate_limited_adapter_honours_retry_after(monkeypatch: pytest.MonkeyPatch):
+    # the test server is served over plain HTTP
+    monkeypatch.setenv("OAUTHLIB_INSECURE_TRANSPORT", "1")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AsanaThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    limiter = RateLimiter(rate=100)
+    client = asana.Client.access_token("token")
+    client.options["base_url"] = url
+    client.session.mount(url, RateLimitedAdapter(limiter))
+    try:
+        # the client retries the throttled requests, the adapter doesn't retry them again
+        assert client.get("/tasks/1", {}) == {"gid": "1"}
+    finally:
+        server.shutdown()
+
+    assert AsanaThrottlingHandler.num_requests == 3
+    metrics = limiter.metrics()
+    assert metrics["Requests"] == "3"
+    assert metrics["Pauses requested by the service"] == "2"
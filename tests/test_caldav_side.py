@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from icalendar import Event
+from syncall.caldav.caldav_side import CaldavSide
+from syncall.serdes_store import PickleDirSerdesStore
+
+from .conftest_caldav import FakeCaldavClient, FakeCaldavTodo
+
+
+def test_operations_use_uid_index(caldav_side: CaldavSide):
+    calendar = caldav_side._calendar
+    assert len(caldav_side.get_all_items()) == 10
+    assert calendar.num_requests == 1
+
+    # one request per operation, no calendar scans
+    caldav_side.update_item("3", summary="kalimera", status="completed")
+    assert calendar.objects["/calendar/3.ics"].icalendar_component["summary"] == "kalimera"
+    caldav_side.delete_single_item("4")
+    assert "/calendar/4.ics" not in calendar.objects
+    assert caldav_side.get_item("3")["summary"] == "kalimera"
+    assert caldav_side.get_item("4") is None
+    assert calendar.num_requests == 5
+
+    # only the updated todo is parsed again
+    calendar.num_parses = 0
+    assert len(caldav_side.get_all_items()) == 9
+    assert calendar.num_parses == 1
+
+    # not indexed - query the server by UID
+    caldav_side._resources.clear()
+    assert caldav_side.get_item("5")["summary"] == "todo 5"
+    assert caldav_side.get_item("42") is None
+    assert calendar.num_requests == 8
+
+
+def test_incremental_get_all_items(incremental_caldav_side: CaldavSide):
+    side = incremental_caldav_side
+    calendar = side._calendar
+    assert len(side.get_all_items()) == 5
+    assert len(calendar.multiget_calls[-1]) == 5
+
+    # calendar unchanged - just a PROPFIND
+    calendar.num_requests = 0
+    assert len(side.get_all_items()) == 5
+    assert calendar.num_requests == 1
+    assert len(calendar.multiget_calls) == 1
+
+    # only the changed todos are downloaded, events are ignored
+    side.update_item("1", summary="kalimera", status="completed")
+    side.delete_single_item("2")
+    todo = FakeCaldavTodo(calendar, "5")
+    todo.save()
+    event = FakeCaldavTodo(calendar, "event")
+    event._component = Event(uid="event", summary="event")
+    event.save()
+    items = {item["id"]: item for item in side.get_all_items()}
+    assert set(items) == {"0", "1", "3", "4", "5"}
+    assert items["1"]["summary"] == "kalimera"
+    assert calendar.multiget_calls[-1] == [
+        "/calendar/1.ics",
+        "/calendar/5.ics",
+        "/calendar/event.ics",
+    ]
+
+    # expired sync token - list everything but only download what changed
+    calendar.sync_tokens_expired = True
+    side.delete_single_item("0")
+    side.update_item("3", summary="kalispera", status="completed")
+    items = {item["id"]: item for item in side.get_all_items()}
+    assert set(items) == {"1", "3", "4", "5"}
+    assert items["3"]["summary"] == "kalispera"
+    assert calendar.multiget_calls[-1] == ["/calendar/3.ics"]
+
+
+def test_incremental_get_all_items_without_sync_collection(
+    incremental_caldav_side: CaldavSide,
+):
+    side = incremental_caldav_side
+    calendar = side._calendar
+    calendar.supports_sync_collection = False
+
+    # every run lists all the todos
+    for _ in range(2):
+        assert len(side.get_all_items()) == 5
+    assert not calendar.multiget_calls
+    side.update_item("1", summary="kalimera", status="completed")
+    assert {item["id"]: item for item in side.get_all_items()}["1"]["summary"] == "kalimera"
+
+
+def test_parsed_todos_are_persisted(caldav_side: CaldavSide, tmpdir):
+    calendar = caldav_side._calendar
+    items = caldav_side.get_all_items()
+    assert calendar.num_parses == 10
+    caldav_side._cache.close()
+
+    # next run - nothing to parse
+    side = CaldavSide(client=FakeCaldavClient(), calendar_name="calendar")
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "caldav"))
+    side._calendar = calendar
+    assert side.get_all_items() == items
+    assert calendar.num_parses == 10
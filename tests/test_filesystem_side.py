@@ -1,9 +1,11 @@
 import os
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import pytest
 from syncall.filesystem.filesystem_file import FilesystemFile
 from syncall.filesystem.filesystem_side import FilesystemSide
+from syncall.serdes_store import PickleDirSerdesStore
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
@@ -122,3 +124,64 @@ def test_item_not_in_cache(fs_side_with_existing_items: FilesystemSide):
     assert fs_file_returned.title == fs_file.title
     assert fs_file_returned.contents == fs_file.contents
     assert fs_file_returned.id == fs_file.id
+
+
+def test_fingerprint(fs_side_with_existing_items: FilesystemSide):
+    fs_side = fs_side_with_existing_items
+    all_items = fs_side.get_all_items()
+    item0, item1 = (item for item in all_items[:2])
+
+    assert fs_side.fingerprint(item0) == fs_side.fingerprint(item0)
+    assert fs_side.fingerprint(item0) != fs_side.fingerprint(item1)
+
+    item0.contents = item1.contents
+    assert fs_side.fingerprint(item0, ignore_keys=["title", "id"]) == fs_side.fingerprint(
+        item1,
+        ignore_keys=["title", "id"],
+    )
+
+
+def test_files_index_is_persisted(
+    fs_side_with_existing_items: FilesystemSide,
+    monkeypatch: pytest.MonkeyPatch,
+    tmpdir,
+):
+    fs_side = fs_side_with_existing_items
+    root = fs_side.filesystem_root
+    fs_side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "cache"))
+    fs_side.start()
+    items = fs_side.get_all_items()
+    fs_side.finish()
+
+    num_ids_read = 0
+    get_id_of_path = FilesystemFile.get_id_of_path
+
+    def counting_get_id_of_path(cls, path: Path):
+        del cls
+        nonlocal num_ids_read
+        num_ids_read += 1
+        return get_id_of_path(path)
+
+    monkeypatch.setattr(FilesystemFile, "get_id_of_path", classmethod(counting_get_id_of_path))
+
+    # next run - files are looked up by ID without reading any other file, the only ID read is
+    # the one of the file itself
+    fs_side = FilesystemSide(filesystem_root=root, filename_extension=".txt")
+    fs_side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "cache"))
+    fs_side.start()
+    item = fs_side.get_item(items[0].id)
+    assert item.contents == items[0].contents
+    assert num_ids_read == 1
+
+    # only the files that changed since indexed are read again
+    fs_side.update_item(items[1].id, title="renamed", contents="new contents")
+    new_file = FilesystemFile(path=root / "new")
+    new_file.contents = "new file"
+    new_file.flush()
+    num_ids_read = 0
+    assert fs_side.get_item(new_file.id).contents == "new file"
+    assert num_ids_read == 2
+    assert fs_side.get_item(items[1].id).title == "renamed"
+    assert num_ids_read == 3
+    assert fs_side.get_item("unknown") is None
+    assert num_ids_read == 3
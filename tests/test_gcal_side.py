@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httplib2
+from googleapiclient.http import HttpError
+
+from .conftest_google import FakeGoogleBatch, FakeGoogleRequest
+
+if TYPE_CHECKING:
+    from syncall.google.gcal_side import GCalSide
+
+
+def _event(id_: str, status: str = "confirmed") -> dict:
+    return {"id": id_, "status": status, "summary": f"event {id_}"}
+
+
+def test_incremental_get_all_items(gcal_side: GCalSide):
+    events = gcal_side._service.events()
+    events.events = {str(i): _event(str(i)) for i in range(5)}
+    assert {e["id"] for e in gcal_side.get_all_items()} == {str(i) for i in range(5)}
+
+    # only the changed events are fetched and merged with the snapshot
+    events.events["1"] = {**_event("1"), "summary": "kalimera"}
+    events.events["2"] = _event("2", status="cancelled")
+    events.events["5"] = _event("5")
+    events.changed = ["1", "2", "5"]
+    items = {e["id"]: e for e in gcal_side.get_all_items()}
+    assert events.list_calls[-1]["syncToken"] == "token-1"
+    assert set(items) == {"0", "1", "3", "4", "5"}
+    assert items["1"]["summary"] == "kalimera"
+
+
+def test_incremental_get_all_items_expired_token(gcal_side: GCalSide):
+    events = gcal_side._service.events()
+    events.events = {str(i): _event(str(i)) for i in range(3)}
+    gcal_side.get_all_items()
+
+    del events.events["0"]
+    events.sync_token_expired = True
+    assert {e["id"] for e in gcal_side.get_all_items()} == {"1", "2"}
+    assert [c["syncToken"] for c in events.list_calls] == [None, "token-1", None]
+
+
+def test_queued_writes_are_sent_in_batches(gcal_side: GCalSide):
+    executed: list[int] = []
+    gcal_side._service.new_batch_http_request = lambda: FakeGoogleBatch(executed)
+    gone = HttpError(httplib2.Response({"status": 410}), b"Gone")
+
+    results = {}
+    for i in range(120):
+        response = gone if i == 3 else {"id": str(i)}
+        gcal_side._queue_request(
+            FakeGoogleRequest(response),
+            lambda item, exc, i=i: results.__setitem__(i, (item, exc)),
+        )
+    assert not results
+
+    gcal_side.flush_writes()
+    assert executed == [50, 50, 20]
+    assert results[0] == ({"id": "0"}, None)
+    assert results[3] == (None, gone)
+    assert len(results) == 120
+
+    # nothing left to send
+    gcal_side.flush_writes()
+    assert executed == [50, 50, 20]
+
+
+def test_queued_writes_batch_failure(gcal_side: GCalSide):
+    executed: list[int] = []
+    batches = iter(
+        [
+            FakeGoogleBatch(executed),
+            FakeGoogleBatch(executed, fail_after=10),
+            FakeGoogleBatch(executed),
+        ]
+    )
+    gcal_side._service.new_batch_http_request = lambda: next(batches)
+
+    results = {}
+    for i in range(120):
+        gcal_side._queue_request(
+            FakeGoogleRequest({"id": str(i)}),
+            lambda item, exc, i=i: results.__setitem__(i, (item, exc)),
+        )
+
+    # every callback is called, the batches after the failed one are still sent
+    gcal_side.flush_writes()
+    assert executed == [50, 50, 20]
+    assert len(results) == 120
+    assert results[59] == ({"id": "59"}, None)
+    assert results[60][0] is None
+    assert isinstance(results[60][1], httplib2.ServerNotFoundError)
+    assert isinstance(results[99][1], httplib2.ServerNotFoundError)
+    assert results[100] == ({"id": "100"}, None)
+
+
+def test_update_item_uses_cached_event(gcal_side: GCalSide):
+    events = gcal_side._service.events()
+    events.events = {"0": {**_event("0"), "etag": "0"}, "1": {**_event("1"), "etag": "1"}}
+    gcal_side.get_all_items()
+
+    gcal_side.update_item("0", summary="kalimera")
+    assert events.events["0"]["summary"] == "kalimera"
+    assert events.get_calls == 0
+
+    # modified in the meantime - fetch it and retry
+    events.events["1"] = {**events.events["1"], "etag": "1-remote"}
+    gcal_side.update_item("1", summary="kalispera")
+    assert events.events["1"]["summary"] == "kalispera"
+    assert events.get_calls == 1
+
+    # the response of the update is the basis for the next one
+    gcal_side.update_item("0", summary="kalinixta")
+    assert events.events["0"]["summary"] == "kalinixta"
+    assert events.get_calls == 1
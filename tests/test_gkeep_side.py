@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from syncall.google.gkeep_note import GKeepNote
+from syncall.google.gkeep_note_side import GKeepNoteSide
+from syncall.google.gkeep_todo_item import GKeepTodoItem
+from syncall.google.gkeep_todo_side import GKeepTodoSide
+from syncall.serdes_store import PickleDirSerdesStore
+
+if TYPE_CHECKING:
+    from .conftest_gkeep import FakeKeepServer
+
+
+def _make_side(tmpdir, user: str = "user@example.com", **kargs) -> GKeepNoteSide:
+    side = GKeepNoteSide(gkeep_user=user, **kargs)
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "gkeep"))
+    return side
+
+
+def test_keep_state_is_persisted(keep_server: FakeKeepServer, tmpdir):
+    side = _make_side(tmpdir)
+    side.start()
+    assert len(side.get_all_items()) == 10
+    assert keep_server.num_nodes_sent == 20
+    side.finish()
+
+    # next run - only the changes since the previous run are transferred
+    keep_server.store(keep_server.make_note("note 10", "contents 10"))
+    keep_server.num_nodes_sent = 0
+    side = _make_side(tmpdir)
+    side.start()
+    assert {item.title for item in side.get_all_items()} == {f"note {i}" for i in range(11)}
+    assert keep_server.num_nodes_sent == 2
+    side.finish()
+
+    # server can't serve the changes since the persisted version - fetch everything
+    keep_server.force_full_resync = True
+    keep_server.num_nodes_sent = 0
+    side = _make_side(tmpdir)
+    side.start()
+    assert len(side.get_all_items()) == 11
+    assert keep_server.num_nodes_sent == 22
+    side.finish()
+
+    # state of another account isn't used
+    keep_server.num_nodes_sent = 0
+    side = _make_side(tmpdir, user="other@example.com")
+    side.start()
+    assert keep_server.num_nodes_sent == 22
+
+
+def test_expired_token_falls_back_to_password(keep_server: FakeKeepServer, tmpdir):
+    keep_server.token_expired = True
+    credentials = {"gkeep_token": "expired", "gkeep_passwd": "password"}
+    side = _make_side(tmpdir, **credentials)
+    side.start()
+    assert keep_server.num_logins == 1
+    assert side.get_master_token() == "token"
+    assert len(side.get_all_items()) == 10
+
+
+@pytest.mark.usefixtures("keep_server")
+def test_note_operations_use_id_index(tmpdir):
+    side = _make_side(tmpdir)
+    side.start()
+    items = {item.id: item for item in side.get_all_items()}
+    assert len(items) == 10
+
+    # no scans of the notes of the account after listing them
+    find = side._keep.find
+    side._keep.find = None
+    note_id = next(iter(items))
+    assert side.get_item(note_id) is items[note_id]
+    side.update_item(note_id, title="kalimera", plaintext="kalispera")
+    assert items[note_id].title == "kalimera"
+    new_item = side.add_item(GKeepNote(title="new", plaintext="note"))
+    assert side.get_item(new_item.id) is new_item
+
+    # not indexed - look it up in the Keep state
+    side._notes.clear()
+    assert side.get_item(note_id).title == "kalimera"
+    assert side.get_item("unknown") is None
+
+    side._keep.find = find
+    assert len(side.get_all_items()) == 11
+
+
+def test_notes_are_selected_by_label(keep_server: FakeKeepServer, tmpdir):
+    sync, ignore = keep_server.make_label("sync"), keep_server.make_label("ignore")
+    keep_server.store(keep_server.make_note("synced", "", labels=(sync,)))
+    keep_server.store(keep_server.make_note("ignored", "", labels=(sync, ignore)))
+
+    side = _make_side(tmpdir, gkeep_labels=["sync"], gkeep_ignore_labels=["ignore", "new"])
+    side.start()
+    assert [item.title for item in side.get_all_items()] == ["synced"]
+
+    # new notes get the labels of the side
+    side.add_item(GKeepNote(title="added", plaintext="note"))
+    assert {item.title for item in side.get_all_items()} == {"synced", "added"}
+
+    # without labels to look for, all notes without the ignored labels are selected
+    side = _make_side(tmpdir, gkeep_ignore_labels=["ignore"])
+    side.start()
+    assert len(side.get_all_items()) == 11
+
+
+def test_label_index_is_persisted(
+    keep_server: FakeKeepServer,
+    tmpdir,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    sync = keep_server.make_label("sync")
+    labelled = keep_server.make_note("labelled", "", labels=(sync,))
+    keep_server.store(labelled)
+
+    indexed: list[str] = []
+    index_notes = GKeepNoteSide._index_notes
+
+    def spy(self, note_ids):
+        note_ids = list(note_ids)
+        indexed.extend(note_ids)
+        index_notes(self, note_ids)
+
+    monkeypatch.setattr(GKeepNoteSide, "_index_notes", spy)
+
+    side = _make_side(tmpdir, gkeep_labels=["sync"])
+    side.start()
+    assert [item.title for item in side.get_all_items()] == ["labelled"]
+    assert len(indexed) == 11
+    side.finish()
+
+    # next run - only the notes changed on the server since then are indexed
+    unlabelled, relabelled = labelled[0], keep_server.nodes[next(iter(keep_server.nodes))]
+    relabelled["labelIds"], unlabelled["labelIds"] = unlabelled["labelIds"], []
+    keep_server.store([unlabelled, relabelled])
+
+    indexed.clear()
+    side = _make_side(tmpdir, gkeep_labels=["sync"])
+    side.start()
+    assert [item.title for item in side.get_all_items()] == [relabelled["title"]]
+    assert sorted(indexed) == sorted([unlabelled["id"], relabelled["id"]])
+
+
+def test_todo_writes_are_coalesced_in_a_single_sync(keep_server: FakeKeepServer, tmpdir):
+    side = GKeepTodoSide(note_title="todos", gkeep_user="user@example.com")
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "gkeep"))
+    side.start()
+    side.add_item(GKeepTodoItem(plaintext="first"))
+    side.add_item(GKeepTodoItem(plaintext="second"))
+    first, second = side.get_all_items()
+    assert side.get_item(first.id) is first
+
+    results = []
+
+    def callback(item, exc):
+        assert exc is None
+        results.append(item)
+
+    keep_server.num_requests = 0
+    side.queue_update_item(first.id, callback, plaintext="1st", is_checked=False)
+    side.queue_update_item(first.id, callback, plaintext="1st", is_checked=True)
+    side.queue_update_item(second.id, callback, plaintext="2nd", is_checked=False)
+    side.queue_delete_single_item(second.id, callback)
+    side.queue_add_item(GKeepTodoItem(plaintext="third"), callback)
+    assert not results
+    assert side._num_coalesced == 2
+
+    side.flush_writes()
+    assert keep_server.num_requests == 1
+    assert len(results) == 5
+    assert results[-1].plaintext == "third"
+    assert first.plaintext == "1st"
+    assert first.is_checked
+    assert [item.plaintext for item in side.get_all_items() if not item._inner.deleted] == [
+        "1st",
+        "third",
+    ]
+
+
+def test_todo_writes_are_kept_if_sync_fails(keep_server: FakeKeepServer, tmpdir):
+    side = GKeepTodoSide(note_title="todos", gkeep_user="user@example.com")
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "gkeep"))
+    side.start()
+    first = side.add_item(GKeepTodoItem(plaintext="first"))
+
+    results = []
+    side.queue_update_item(
+        "unknown",
+        lambda item, exc: results.append((item, exc)),
+        plaintext="unknown",
+        is_checked=False,
+    )
+    side.queue_update_item(
+        first.id,
+        lambda item, exc: results.append((item, exc)),
+        plaintext="1st",
+        is_checked=True,
+    )
+    side.queue_add_item(
+        GKeepTodoItem(plaintext="second"),
+        lambda item, exc: results.append((item, exc)),
+    )
+
+    # only the operation that couldn't be applied fails, the rest are sent on finish
+    keep_server.fail_next_request = True
+    side.flush_writes()
+    assert isinstance(results[0][1], RuntimeError)
+    assert results[1] == (None, None)
+    second, exc = results[2]
+    assert exc is None
+
+    side.finish()
+    assert keep_server.nodes[first.id]["text"] == "1st"
+    assert keep_server.nodes[second.id]["text"] == "second"
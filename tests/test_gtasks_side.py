@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import httplib2
+import pytest
+
+from .conftest_google import FakeGoogleBatch
+
+if TYPE_CHECKING:
+    from syncall.google.gtasks_side import GTasksSide
+
+
+def _task(id_: str, updated: str, **kargs) -> dict:
+    return {
+        "id": id_,
+        "title": f"task {id_}",
+        "status": "needsAction",
+        "updated": updated,
+        **kargs,
+    }
+
+
+def test_incremental_get_all_items(gtasks_side: GTasksSide):
+    tasks = gtasks_side._service.tasks()
+    tasks.tasks = {
+        str(i): _task(str(i), updated=f"2024-01-0{i + 1}T00:00:00.000Z") for i in range(3)
+    }
+    assert {t["id"] for t in gtasks_side.get_all_items()} == {"0", "1", "2"}
+    assert "updatedMin" not in tasks.list_calls[-1]
+
+    # updated, deleted and new tasks arrive since the most recent update of the previous run
+    tasks.tasks["0"] = _task("0", updated="2024-02-01T00:00:00.000Z", title="kalimera")
+    tasks.tasks["1"] = _task("1", updated="2024-02-01T00:00:00.000Z", deleted=True)
+    tasks.tasks["3"] = _task("3", updated="2024-02-02T00:00:00.000Z")
+    items = {t["id"]: t for t in gtasks_side.get_all_items()}
+    assert tasks.list_calls[-1]["updatedMin"] == "2024-01-03T00:00:00.000Z"
+    assert set(items) == {"0", "2", "3"}
+    assert items["0"]["title"] == "kalimera"
+
+    # nothing changed
+    assert {t["id"] for t in gtasks_side.get_all_items()} == {"0", "2", "3"}
+    assert tasks.list_calls[-1]["updatedMin"] == "2024-02-02T00:00:00.000Z"
+
+
+def test_queued_writes_batch_failure(gtasks_side: GTasksSide):
+    executed: list[int] = []
+    batches = iter([FakeGoogleBatch(executed, fail_after=1), FakeGoogleBatch(executed)])
+    gtasks_side._service.new_batch_http_request = lambda: next(batches)
+    gtasks_side.BATCH_SIZE = 2
+
+    results = []
+    for i in range(3):
+        gtasks_side.queue_add_item(
+            {"title": f"task {i}", "status": "needsAction"},
+            lambda item, exc: results.append((item, exc)),
+        )
+
+    # the failure of the batch is reported to its pending requests only
+    gtasks_side.flush_writes()
+    assert executed == [2, 1]
+    assert results[0][0]["title"] == "task 0"
+    assert results[1][0] is None
+    assert isinstance(results[1][1], httplib2.ServerNotFoundError)
+    assert results[2][0]["title"] == "task 2"
+    assert [task["title"] for task in gtasks_side._service.tasks().tasks.values()] == [
+        "task 0",
+        "task 2",
+    ]
+
+
+def test_queued_writes_callback_failure(gtasks_side: GTasksSide):
+    gtasks_side._service.new_batch_http_request = lambda: FakeGoogleBatch([])
+    results = []
+
+    def callback(item: dict | None, exc: Exception | None):
+        results.append((item, exc))
+        if item is not None and item["title"] == "task 0":
+            raise ValueError("Failed to handle the response")
+
+    for i in range(2):
+        gtasks_side.queue_add_item({"title": f"task {i}", "status": "needsAction"}, callback)
+
+    # not mistaken for a failure of the batch - the other request is still reported inserted
+    with pytest.raises(ValueError, match="Failed to handle the response"):
+        gtasks_side.flush_writes()
+    assert [(item["title"], exc) for item, exc in results] == [
+        ("task 0", None),
+        ("task 1", None),
+    ]
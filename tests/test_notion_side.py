@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import datetime as dt
+from copy import deepcopy
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+from notion_client import Client
+from syncall.notion.notion_side import NotionSide
+from syncall.notion.notion_todo_block import NotionTodoBlock
+from syncall.notion.utils import RateLimitedTransport
+from syncall.rate_limiter import RateLimiter
+from syncall.serdes_store import PickleDirSerdesStore
+from syncall.write_pool import WritePool
+
+from .conftest_notion import FakeNotionClient
+
+if TYPE_CHECKING:
+    from syncall.types import NotionTodoBlockItem
+
+
+def _block(id_: str, type_: str = "paragraph", has_children: bool = False) -> dict:
+    return {"object": "block", "id": id_, "type": type_, "has_children": has_children}
+
+
+@pytest.fixture
+def make_todo(notion_simple_todo: NotionTodoBlockItem):
+    def fn(id_: str, has_children: bool = False) -> dict:
+        todo = deepcopy(notion_simple_todo)
+        todo["id"] = id_
+        todo["has_children"] = has_children
+        return todo
+
+    return fn
+
+
+def test_get_all_items_goes_through_all_pages(make_todo):
+    client = FakeNotionClient()
+    children = client.blocks.children
+    children.blocks["page"] = [
+        make_todo(str(i)) if i % 2 else _block(str(i)) for i in range(250)
+    ]
+    side = NotionSide(client=client, page_id="page")
+
+    todos = side.get_all_items()
+    assert [todo.id for todo in todos] == [str(i) for i in range(1, 250, 2)]
+    assert [c["start_cursor"] for c in children.list_calls] == [None, "100", "200"]
+
+
+def test_get_all_items_nested_todos(make_todo):
+    client = FakeNotionClient()
+    children = client.blocks.children
+    children.blocks["page"] = [
+        make_todo("0"),
+        _block("toggle", type_="toggle", has_children=True),
+        make_todo("1", has_children=True),
+        _block("subpage", type_="child_page", has_children=True),
+    ]
+    children.blocks["toggle"] = [make_todo("2"), _block("column", has_children=True)]
+    children.blocks["column"] = [make_todo("3")]
+    children.blocks["1"] = [make_todo("4")]
+    children.blocks["subpage"] = [make_todo("5")]
+
+    todos = NotionSide(client=client, page_id="page").get_all_items()
+    assert [todo.id for todo in todos] == ["0", "1"]
+
+    children.list_calls.clear()
+    todos = NotionSide(client=client, page_id="page", nested_todos=True).get_all_items()
+    assert [todo.id for todo in todos] == ["0", "2", "3", "1", "4"]
+    assert "subpage" not in [c["block_id"] for c in children.list_calls]
+
+
+@pytest.mark.parametrize("write_workers", [1, 8])
+def test_queued_additions_are_appended_in_batches(write_workers: int):
+    client = FakeNotionClient()
+    side = NotionSide(client=client, page_id="page")
+    # the additions are still batched by the side when its writes go through a pool
+    writer = side if write_workers == 1 else WritePool(side, max_workers=write_workers)
+
+    results = {}
+    for i in range(250):
+        todo = NotionTodoBlock(
+            is_archived=False,
+            is_checked=False,
+            last_modified_date=dt.datetime.now(dt.UTC),
+            plaintext=f"todo {i}",
+        )
+        writer.queue_add_item(todo, lambda item, exc, i=i: results.__setitem__(i, (item, exc)))
+    assert not results
+
+    writer.flush_writes()
+    assert client.blocks.children.append_calls == [100, 100, 50]
+    assert len(results) == 250
+    for i, (item, exc) in results.items():
+        assert exc is None
+        assert item.id == f"block-{i}"
+        assert item.plaintext == f"todo {i}"
+
+
+def test_queued_additions_batch_failure():
+    client = FakeNotionClient()
+    client.blocks.children.failing_appends = {1}
+    side = NotionSide(client=client, page_id="page")
+
+    results = {}
+    for i in range(250):
+        todo = NotionTodoBlock(
+            is_archived=False,
+            is_checked=False,
+            last_modified_date=dt.datetime.now(dt.UTC),
+            plaintext=f"todo {i}",
+        )
+        side.queue_add_item(todo, lambda item, exc, i=i: results.__setitem__(i, (item, exc)))
+
+    # only the items of the failed request fail, the rest of the batches are still appended
+    side.flush_writes()
+    assert client.blocks.children.append_calls == [100, 100, 50]
+    assert len(results) == 250
+    assert results[99][0].plaintext == "todo 99"
+    assert all(
+        item is None and isinstance(exc, httpx.ReadTimeout)
+        for item, exc in (results[i] for i in range(100, 200))
+    )
+    assert results[200][0].plaintext == "todo 200"
+    assert len(client.blocks.children.blocks["page"]) == 150
+
+
+def test_unedited_blocks_are_not_parsed_again(make_todo, monkeypatch, tmpdir):
+    client = FakeNotionClient()
+    children = client.blocks.children
+    children.blocks["page"] = [make_todo(str(i)) for i in range(5)]
+
+    parsed = []
+    from_raw_item = NotionTodoBlock.from_raw_item
+
+    def counting_from_raw_item(block_item):
+        parsed.append(block_item["id"])
+        return from_raw_item(block_item)
+
+    monkeypatch.setattr(NotionTodoBlock, "from_raw_item", counting_from_raw_item)
+
+    def run() -> dict[str, NotionTodoBlock]:
+        side = NotionSide(client=client, page_id="page")
+        side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "notion"))
+        items = {item.id: item for item in side.get_all_items()}
+        side._cache.close()
+        return items
+
+    assert len(run()) == 5
+    assert len(parsed) == 5
+
+    # edited - one long ago, one just now and may be edited again within the same minute
+    parsed.clear()
+    now = dt.datetime.now(dt.UTC).isoformat()
+    children.blocks["page"][1]["last_edited_time"] = "2022-01-01T00:00:00.000Z"
+    children.blocks["page"][1]["to_do"]["checked"] = True
+    children.blocks["page"][2]["last_edited_time"] = now
+    items = run()
+    assert items["1"].is_checked
+    assert sorted(parsed) == ["1", "2"]
+
+    parsed.clear()
+    run()
+    assert parsed == ["2"]
+
+
+def test_rate_limited_transport_retries(notion_simple_todo: NotionTodoBlockItem):
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.1"}, json={}),
+        httpx.Response(503, json={}),
+        httpx.Response(200, json=notion_simple_todo),
+    ]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    limiter = RateLimiter(rate=100)
+    client = Client(
+        auth="token",
+        client=httpx.Client(
+            transport=RateLimitedTransport(limiter, httpx.MockTransport(handler))
+        ),
+    )
+    assert client.blocks.retrieve(notion_simple_todo["id"]) == notion_simple_todo
+    assert len(requests) == 3
+    assert requests[-1].headers["Authorization"] == "Bearer token"
+
+    metrics = limiter.metrics()
+    assert metrics["Pauses requested by the service"] == "2"
+    assert float(metrics["Total delay"].rstrip("s")) >= 0.1
+
+
+def test_rate_limited_transport_retries_after_http_date():
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+        httpx.Response(503, headers={"Retry-After": "soon"}),
+        httpx.Response(200, json={}),
+    ]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    transport = RateLimitedTransport(RateLimiter(rate=1000), httpx.MockTransport(handler))
+    with httpx.Client(transport=transport) as client:
+        assert client.get("https://api.notion.com/v1/blocks/id").status_code == 200
+    assert len(requests) == 3
+
+
+def test_rate_limited_transport_gives_up():
+    limiter = RateLimiter(rate=1000)
+    transport = RateLimitedTransport(
+        limiter,
+        httpx.MockTransport(lambda _: httpx.Response(502, json={})),
+        max_retries=2,
+    )
+    with httpx.Client(transport=transport) as client:
+        assert client.get("https://api.notion.com/v1/blocks/id").status_code == 502
+    assert limiter.metrics()["Requests"] == "3"
+
+
+def test_rate_limited_transport_retries_only_idempotent_requests_on_server_errors():
+    statuses = [503, 429, 200]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(statuses[len(requests) - 1], json={})
+
+    transport = RateLimitedTransport(RateLimiter(rate=1000), httpx.MockTransport(handler))
+    with httpx.Client(transport=transport) as client:
+        # the append may have been applied before the 503 - don't repeat it
+        url = "https://api.notion.com/v1/blocks/id/children"
+        assert client.post(url, json={}).status_code == 503
+        assert len(requests) == 1
+
+        # a 429 means that it wasn't processed
+        assert client.post(url, json={}).status_code == 200
+        assert len(requests) == 3
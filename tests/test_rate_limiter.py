@@ -0,0 +1,61 @@
+import datetime as dt
+import email.utils
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from syncall.rate_limiter import RateLimiter, parse_retry_after
+
+
+def test_rate_limiter_rate():
+    limiter = RateLimiter(rate=50, burst=5)
+
+    start = time.perf_counter()
+    for _ in range(15):
+        with limiter.request():
+            pass
+
+    # 5 requests go through immediately, the other 10 at 50 requests per second
+    assert 0.18 < time.perf_counter() - start < 0.5
+    metrics = limiter.metrics()
+    assert metrics["Requests"] == "15"
+    assert metrics["Delayed requests"] == "10"
+
+
+def test_rate_limiter_pause():
+    limiter = RateLimiter(rate=1000)
+    limiter.pause(0.2)
+
+    start = time.perf_counter()
+    with limiter.request():
+        pass
+    assert time.perf_counter() - start >= 0.2
+    assert limiter.metrics()["Pauses requested by the service"] == "1"
+
+
+def test_rate_limiter_max_in_flight():
+    limiter = RateLimiter(rate=1000, max_in_flight=2)
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+
+    def request(_):
+        with limiter.request():
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request, range(16)))
+
+    assert max_in_flight[0] == 2
+
+
+def test_parse_retry_after_http_date():
+    date = dt.datetime.now(dt.UTC) + dt.timedelta(seconds=30)
+    seconds = parse_retry_after(email.utils.format_datetime(date, usegmt=True))
+    assert seconds is not None
+    assert 25 < seconds <= 30
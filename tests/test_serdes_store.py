@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from syncall.serdes_store import (
+    PickleDirSerdesStore,
+    SerdesStore,
+    SqliteSerdesStore,
+    name_to_serdes_store_type,
+    open_serdes_store,
+)
+
+
+@pytest.fixture(params=list(name_to_serdes_store_type.keys()))
+def serdes_store(request: pytest.FixtureRequest, tmpdir) -> SerdesStore:
+    return open_serdes_store(Path(tmpdir), "side", backend=request.param)
+
+
+def test_dump_load_remove(serdes_store: SerdesStore):
+    item = {"id": "1", "title": "kalimera", "tags": ["a", "b"]}
+    assert "1" not in serdes_store
+    with pytest.raises(KeyError):
+        serdes_store.load("1")
+
+    serdes_store.dump("1", item)
+    assert "1" in serdes_store
+    assert serdes_store.load("1") == item
+
+    item["title"] = "kalispera"
+    serdes_store.dump("1", item)
+    assert serdes_store.load("1") == item
+    assert list(serdes_store.ids()) == ["1"]
+
+    serdes_store.remove("1")
+    assert "1" not in serdes_store
+    with pytest.raises(KeyError):
+        serdes_store.remove("1")
+
+
+def test_persistence_across_instances(serdes_store: SerdesStore):
+    serdes_store.dump("1", {"id": "1"})
+    serdes_store.dump("2", {"id": "2"})
+    serdes_store.close()
+
+    reopened = type(serdes_store)(serdes_store.path)
+    assert set(reopened.ids()) == {"1", "2"}
+    assert reopened.load("2") == {"id": "2"}
+
+
+def test_migrate_from_pickle_dir(tmpdir):
+    root = Path(tmpdir)
+    with PickleDirSerdesStore(PickleDirSerdesStore.path_for(root, "side")) as legacy:
+        for i in range(5):
+            legacy.dump(str(i), {"id": str(i)})
+
+    store = open_serdes_store(root, "side", backend="sqlite")
+    assert isinstance(store, SqliteSerdesStore)
+    assert sorted(store.ids()) == [str(i) for i in range(5)]
+    assert store.load("3") == {"id": "3"}
+
+    # the migration only happens once, when the new store is first created
+    store.remove("3")
+    store.close()
+    store = open_serdes_store(root, "side", backend="sqlite")
+    assert "3" not in store
+
+
+def test_fingerprints(serdes_store: SerdesStore):
+    serdes_store.dump("1", {"id": "1"}, fingerprint="fp1")
+    serdes_store.dump("2", {"id": "2"})
+    assert serdes_store.fingerprints() == {"1": "fp1"}
+
+    serdes_store.set_fingerprint("2", "fp2")
+    assert serdes_store.fingerprints() == {"1": "fp1", "2": "fp2"}
+
+    # dumping without a fingerprint invalidates the previous one
+    serdes_store.dump("1", {"id": "1", "title": "kalimera"})
+    serdes_store.remove("2")
+    assert serdes_store.fingerprints() == {}
+
+    serdes_store.dump("3", {"id": "3"}, fingerprint="fp3")
+    serdes_store.close()
+    reopened = type(serdes_store)(serdes_store.path)
+    assert reopened.fingerprints() == {"3": "fp3"}
+
+
+def test_sqlite_store_from_other_threads(tmpdir):
+    store = open_serdes_store(Path(tmpdir), "side", backend="sqlite")
+
+    def dump_and_load(i: int) -> dict:
+        store.dump(str(i), {"id": str(i)}, fingerprint=str(i))
+        return store.load(str(i))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(dump_and_load, range(20))) == [
+            {"id": str(i)} for i in range(20)
+        ]
+
+    assert len(store.fingerprints()) == 20
+    store.close()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import datetime as dt
+import re
+from pathlib import Path
+
+import pytest
+from syncall.serdes_store import PickleDirSerdesStore
+from syncall.taskwarrior import taskwarrior_side
+from syncall.taskwarrior.taskwarrior_side import TaskWarriorSide
+from taskw_ng.utils import DATE_FORMAT
+
+
+class _FakeTaskWarrior:
+    """Serves the tasks tagged with +remindme, evaluating only the `modified.after` filter."""
+
+    def __init__(self):
+        self.tasks: dict[str, dict] = {}
+        # filters of the load_tasks_and_filter calls
+        self.filters: list[str] = []
+
+    def add(
+        self, uuid: str, modified: dt.datetime, status: str = "pending", tags=("remindme",)
+    ):
+        self.tasks[uuid] = {
+            "uuid": uuid,
+            "description": f"task {uuid}",
+            "status": status,
+            "tags": list(tags),
+            "modified": modified,
+        }
+
+    @staticmethod
+    def _modified_after(task: dict, since: str | None) -> bool:
+        if since is None:
+            return True
+
+        return task["modified"] > dt.datetime.strptime(since, DATE_FORMAT).replace(
+            tzinfo=dt.UTC,
+        )
+
+    def load_tasks_and_filter(self, command: str, filter_: str) -> dict[str, list[dict]]:
+        assert command == "all"
+        self.filters.append(filter_)
+        match = re.search(r"modified\.after:(\S+)", filter_)
+        since = match.group(1) if match is not None else None
+        tasks = [
+            task
+            for task in self.tasks.values()
+            if "remindme" in task["tags"]
+            and task["status"] != "deleted"
+            and self._modified_after(task, since)
+        ]
+        return {
+            "pending": [dict(task) for task in tasks if task["status"] == "pending"],
+            "completed": [dict(task) for task in tasks if task["status"] == "completed"],
+        }
+
+    def filter_tasks(self, filter_dict: dict[str, str]) -> list[dict]:
+        since = filter_dict["modified.after"]
+        return [
+            dict(task) for task in self.tasks.values() if self._modified_after(task, since)
+        ]
+
+
+@pytest.fixture
+def fake_tw(monkeypatch: pytest.MonkeyPatch) -> _FakeTaskWarrior:
+    fake = _FakeTaskWarrior()
+    monkeypatch.setattr(taskwarrior_side, "TaskWarrior", lambda **_: fake)
+    return fake
+
+
+def _make_side(tmpdir) -> TaskWarriorSide:
+    taskrc = Path(tmpdir) / "taskrc"
+    taskrc.touch()
+    side = TaskWarriorSide(tags=["remindme"], config_file_override=taskrc, incremental=True)
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "tw"))
+    return side
+
+
+def _watermark(tmpdir) -> dt.datetime:
+    return PickleDirSerdesStore(Path(tmpdir) / "tw").load("incremental_state")["watermark"]
+
+
+def test_incremental_loading(fake_tw: _FakeTaskWarrior, tmpdir):
+    long_ago = dt.datetime(2024, 1, 1, tzinfo=dt.UTC)
+    for uuid in ("kept", "modified", "deleted", "retagged"):
+        fake_tw.add(uuid, modified=long_ago)
+
+    side = _make_side(tmpdir)
+    assert {task["uuid"] for task in side.get_all_items()} == {
+        "kept",
+        "modified",
+        "deleted",
+        "retagged",
+    }
+    assert "modified.after" not in fake_tw.filters[-1]
+    watermark = _watermark(tmpdir)
+
+    # changes after the previous run, or shortly before it (e.g., because of clock skew)
+    fake_tw.add("modified", modified=watermark - dt.timedelta(seconds=30), status="completed")
+    fake_tw.add("deleted", modified=watermark, status="deleted")
+    fake_tw.add("retagged", modified=watermark, tags=())
+    fake_tw.add("added", modified=watermark + dt.timedelta(seconds=1))
+    # too far before the previous run to have been missed by it
+    fake_tw.add("stale", modified=watermark - dt.timedelta(minutes=5))
+
+    side = _make_side(tmpdir)
+    items = {task["uuid"]: task for task in side.get_all_items()}
+    overlap = watermark - dt.timedelta(minutes=1)
+    assert f"modified.after:{overlap.strftime(DATE_FORMAT)}" in fake_tw.filters[-1]
+
+    # merged into the snapshot of the previous run, minus the tasks that left the filter
+    assert set(items) == {"kept", "modified", "added"}
+    assert items["modified"]["status"] == "completed"
+    assert _watermark(tmpdir) > watermark
+
+
+def test_filter_change_loads_all_tasks(fake_tw: _FakeTaskWarrior, tmpdir):
+    fake_tw.add("first", modified=dt.datetime(2024, 1, 1, tzinfo=dt.UTC))
+    _make_side(tmpdir).get_all_items()
+
+    taskrc = Path(tmpdir) / "taskrc"
+    side = TaskWarriorSide(
+        tags=["remindme"],
+        project="other",
+        config_file_override=taskrc,
+        incremental=True,
+    )
+    side.attach_cache(PickleDirSerdesStore(Path(tmpdir) / "tw"))
+    assert [task["uuid"] for task in side.get_all_items()] == ["first"]
+    assert "modified.after" not in fake_tw.filters[-1]
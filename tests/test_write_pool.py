@@ -0,0 +1,102 @@
+import threading
+import time
+
+from syncall.write_pool import WritePool
+
+
+class _SlowSide:
+    name = "Slow"
+
+    def __init__(self):
+        self.items = {}
+        self.flushed = False
+
+    def __str__(self) -> str:
+        return self.name
+
+    def add_item(self, item: dict) -> dict:
+        time.sleep(0.05)
+        item = {**item, "id": item["title"]}
+        self.items[item["id"]] = item
+        return item
+
+    def update_item(self, item_id: str, **changes):
+        self.items[item_id].update(changes)
+
+    def delete_single_item(self, item_id: str):
+        del self.items[item_id]
+
+    def flush_writes(self):
+        self.flushed = True
+
+
+def test_write_pool():
+    side = _SlowSide()
+    side.items["existing"] = {"id": "existing"}
+    pool = WritePool(side, max_workers=8)
+
+    results = {}
+
+    def callback(key):
+        def fn(item, exc):
+            assert threading.current_thread() is threading.main_thread()
+            results[key] = (item, exc)
+
+        return fn
+
+    start = time.perf_counter()
+    for i in range(8):
+        pool.queue_add_item({"title": str(i)}, callback=callback(i))
+    pool.queue_update_item("existing", callback=callback("update"), title="kalimera")
+    pool.queue_delete_single_item("missing", callback=callback("delete"))
+    assert not results
+
+    pool.flush_writes()
+    pool.shutdown()
+    assert time.perf_counter() - start < 8 * 0.05
+    assert side.flushed
+
+    assert results[3] == ({"title": "3", "id": "3"}, None)
+    assert results["update"] == (None, None)
+    assert side.items["existing"]["title"] == "kalimera"
+    item, exc = results["delete"]
+    assert item is None
+    assert isinstance(exc, KeyError)
+
+
+class _BatchingSide(_SlowSide):
+    def __init__(self):
+        super().__init__()
+        self.queued_additions = []
+
+    def queue_add_item(self, item: dict, callback):
+        self.queued_additions.append((item, callback))
+
+    def flush_writes(self):
+        for item, callback in self.queued_additions:
+            callback({**item, "id": item["title"]}, None)
+        self.queued_additions.clear()
+
+
+def test_write_pool_keeps_the_operations_the_side_defers():
+    side = _BatchingSide()
+    side.items["existing"] = {"id": "existing"}
+    pool = WritePool(side, max_workers=8)
+
+    results = {}
+    for i in range(3):
+        pool.queue_add_item(
+            {"title": str(i)}, callback=lambda *args, i=i: results.update({i: args})
+        )
+    pool.queue_update_item(
+        "existing",
+        callback=lambda *args: results.update({"update": args}),
+        title="kalimera",
+    )
+    assert len(side.queued_additions) == 3
+
+    pool.flush_writes()
+    pool.shutdown()
+    assert results[2] == ({"title": "2", "id": "2"}, None)
+    assert results["update"] == (None, None)
+    assert not side.queued_additions